@@ -9,11 +9,25 @@ DB_PORT=${DATABASE_PORT}
 DB_NAME=${POSTGRES_DB}
 DB_USER=${POSTGRES_USER}
 DB_PASS=${POSTGRES_PASSWORD}
+RETENTION_DAYS=30
+# Both paths below connect to the same server: localhost on this port
+DB_DUMP_PORT=${DB_PORT:-5432}
 
-# Export database into SQL file
-PGPASSWORD=${DB_PASS} pg_dump -h localhost -U ${DB_USER} ${DB_NAME} > ${DB_BACKUP_PATH}/${DB_NAME}_${DATE}.sql
+PG_BACKUP="$(dirname "$0")/../../py_utils/pg_backup.py"
 
-PGPASSWORD=${DB_PASS} pg_dump -h localhost -U ${DB_USER} ${DB_NAME} | gzip > ${DB_BACKUP_PATH}/${DB_NAME}_${DATE}.sql.gz
+# One pg_dump, teed to .sql and .sql.gz (parallel compression, checksums, retention)
+if command -v python3 >/dev/null && [ -f "${PG_BACKUP}" ]; then
+    exec python3 "${PG_BACKUP}" --host localhost --port "${DB_DUMP_PORT}" --user "${DB_USER}" --db-name "${DB_NAME}" \
+        --backup-dir "${DB_BACKUP_PATH}" --retention-days "${RETENTION_DAYS}"
+fi
 
-## Optional: Remove backups older than 30 days
-#find $DB_BACKUP_PATH/* -mtime +30 -exec rm {} \;
+# Fallback without python: still a single pg_dump, split with tee
+set -o pipefail
+PGPASSWORD=${DB_PASS} pg_dump -h localhost -p ${DB_DUMP_PORT} -U ${DB_USER} ${DB_NAME} \
+    | tee ${DB_BACKUP_PATH}/${DB_NAME}_${DATE}.sql \
+    | gzip > ${DB_BACKUP_PATH}/${DB_NAME}_${DATE}.sql.gz
+
+# Remove backups older than RETENTION_DAYS
+# (exact dbname_YYYY-MM-DD_HH-MM names, so databases sharing the prefix are left alone)
+find ${DB_BACKUP_PATH} -maxdepth 1 -type f -regextype posix-extended \
+    -regex ".*/${DB_NAME}_[0-9]{4}-[0-9]{2}-[0-9]{2}_[0-9]{2}-[0-9]{2}\.sql.*" -mtime +${RETENTION_DAYS} -delete
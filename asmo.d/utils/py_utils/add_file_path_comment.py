@@ -3,23 +3,41 @@
 Add a file-path comment as the first line of supported source files.
 
 Key features:
-- Works with stdin, explicit file list, or entire directory tree.
+- Works with stdin, explicit file list, or entire directory tree (walked on disk or read from the git index).
 - Uses absolute paths internally to avoid "root_dir/root_dir/..." duplication.
 - If --directory is set and --root is not, root defaults to directory.
 - Removes existing path comment(s) on top (up to --max-remove), then inserts a fresh one.
 - Preserves original newline style (LF/CRLF).
+- Reads only a bounded head block; rewrites stream the untouched tail into a temp file and rename it over.
 - Supports dry-run mode and verbose logging.
+- Optional worker pool (--jobs N) for I/O-bound runs over large trees.
+- Persistent stat manifest (mtime/size/inode/root) so untouched files are skipped without being opened;
+  entries under a scanned --directory that no longer exist there are pruned, and --dry-run leaves it untouched.
+- With -v, per-phase timings (discovery, manifest check, per-file processing) are printed at the end.
 """
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+import json
 import os
+import shutil
 import sys
+import tempfile
+from typing import BinaryIO
 from typing import Dict
 from typing import Iterable
 from typing import List
+from typing import Optional
 from typing import Tuple
 from typing import Union
 
+from git_files import list_git_files
+from loggers.timing import timed
+from loggers.timing import timings
+from walker import FileMatcher
+from walker import filter_paths
+from walker import walk_files
+
 # ---------------------------
 # Configuration
 # ---------------------------
@@ -43,6 +61,22 @@
 # Safety limit on how many initial lines we will scan/remove as "existing path comment"
 DEFAULT_MAX_REMOVE = 3
 
+# Only this many leading bytes are read to decide whether a file needs a new header
+HEAD_BLOCK_SIZE = 64 * 1024
+# Buffer size used when streaming the untouched tail into the rewritten file
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Number of worker threads; 1 keeps the original sequential behaviour
+DEFAULT_JOBS = 1
+
+# Manifest of files already stamped, keyed by absolute path
+CACHE_VERSION = 1
+DEFAULT_CACHE_FILE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "add_file_path_comment",
+    "manifest.json",
+)
+
 
 # ---------------------------
 # Helpers: Path & comment detection
@@ -114,16 +148,111 @@ def posix_relpath(path: str, start: str) -> str:
     return rel.replace("\\", "/")
 
 
-def detect_newline(text: str) -> str:
-    """Return newline style used in text; default to '\n'."""
+def detect_newline(data: bytes) -> bytes:
+    """Return newline style used in data; default to b'\n'."""
     # Find first newline occurrence
-    idx = text.find("\n")
+    idx = data.find(b"\n")
     if idx == -1:
-        return "\n"
+        return b"\n"
     # Check preceding \r
-    if idx > 0 and text[idx - 1] == "\r":
-        return "\r\n"
-    return "\n"
+    if idx > 0 and data[idx - 1 : idx] == b"\r":
+        return b"\r\n"
+    return b"\n"
+
+
+def split_head_lines(head: bytes, *, at_eof: bool) -> List[bytes]:
+    """
+    Split a head block into lines keeping their EOLs.
+    A trailing partial line is only kept when the block reaches EOF (otherwise it is cut mid-line).
+    """
+    lines = head.split(b"\n")
+    last = lines.pop()
+    lines = [line + b"\n" for line in lines]
+    if last and at_eof:
+        lines.append(last)
+    return lines
+
+
+def decode_line(line: bytes) -> str:
+    """Decode a raw head line for comment detection (EOL stripped, undecodable bytes replaced)."""
+    return line.rstrip(b"\r\n").decode("utf-8", errors="replace")
+
+
+def rewrite_with_prefix(file_path: str, prefix: bytes, tail: BinaryIO) -> None:
+    """
+    Replace file contents with prefix followed by the rest of the open binary stream tail.
+    Writes into a temp file next to the target and renames it over, so a killed run never
+    leaves a partially written file. Symlinks are resolved and permissions are kept.
+    """
+    target = os.path.realpath(file_path)
+    tmp_prefix = f".{os.path.basename(target)}."
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix=tmp_prefix, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(prefix)
+            shutil.copyfileobj(tail, out, COPY_CHUNK_SIZE)
+        shutil.copymode(target, tmp_path)
+        os.replace(tmp_path, target)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def emit(message: str, *, to_stderr: bool = False, messages: Optional[List[Tuple[str, bool]]] = None) -> None:
+    """Print a message, or buffer it when running inside a worker so output order stays deterministic."""
+    if messages is not None:
+        messages.append((message, to_stderr))
+    else:
+        print(message, file=sys.stderr if to_stderr else sys.stdout)
+
+
+# ---------------------------
+# Helpers: Stat manifest cache
+# ---------------------------
+def load_cache(cache_file: str) -> Dict[str, Dict]:
+    """Load the manifest; a missing, unreadable or outdated file yields an empty cache."""
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return {}
+    files = data.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def save_cache(cache_file: str, cache: Dict[str, Dict]) -> None:
+    """Write the manifest atomically (temp file + rename) so a killed run never leaves it truncated."""
+    cache_dir = os.path.dirname(os.path.abspath(cache_file))
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=".manifest.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "files": cache}, f, separators=(",", ":"))
+        os.replace(tmp_path, cache_file)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def prune_cache(cache: Dict[str, Dict], scanned_dir_abs: str, visited: Iterable[str]) -> int:
+    """Drop entries under a fully scanned directory that this run did not visit (deleted, moved or now ignored)."""
+    prefix = os.path.join(scanned_dir_abs, "")
+    visited = set(visited)
+    stale = [path for path in cache if path.startswith(prefix) and path not in visited]
+    for path in stale:
+        del cache[path]
+    return len(stale)
+
+
+def stat_signature(file_path: str, root_dir_abs: str) -> Optional[Dict]:
+    """Return the manifest entry describing the file as it is on disk now, or None if it cannot be stat'ed."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "ino": st.st_ino, "root": root_dir_abs}
 
 
 # ---------------------------
@@ -137,103 +266,130 @@ def process_single_file(
     dry_run: bool = False,
     max_remove: int = DEFAULT_MAX_REMOVE,
     trim_leading_blank: bool = True,
+    messages: Optional[List[Tuple[str, bool]]] = None,
 ) -> str:
     """
     Process a single file. Returns one of: 'updated', 'unchanged', 'skipped', 'error'.
+    If messages is given, warnings are appended to it as (text, to_stderr) instead of printed.
     """
     try:
         if not os.path.isfile(file_path):
             if verbose:
-                print(f"File not found: {file_path}", file=sys.stderr)
+                emit(f"File not found: {file_path}", to_stderr=True, messages=messages)
             return "error"
 
         file_name = os.path.basename(file_path)
         file_ext = os.path.splitext(file_name)[1].lower()
 
         if not should_process_file(file_name, file_ext):
-            print(f"Warning: Unsupported file type for '{file_path}', skipping.")
+            emit(f"Warning: Unsupported file type for '{file_path}', skipping.", messages=messages)
             return "skipped"
 
         comment_syntax = get_comment_syntax(file_name, file_ext)
         if not comment_syntax:
-            print(f"Warning: No comment syntax for '{file_path}', skipping.")
+            emit(f"Warning: No comment syntax for '{file_path}', skipping.", messages=messages)
             return "skipped"
 
-        # Read file preserving newlines
-        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-            data = f.read()
-
-        if data == "":
-            # Empty file — nothing to do
-            print(f"Warning: Empty file '{file_path}', skipping.")
-            return "skipped"
-
-        newline = detect_newline(data)
-        lines = data.splitlines(keepends=False)  # strip EOLs; we’ll add newline when writing
-
-        # Remove up to max_remove existing file-path comments at the very top
-        removed = 0
-        while lines and removed < max_remove and is_file_path_comment(lines[0], comment_syntax):
-            lines.pop(0)
-            removed += 1
-
-        # Optional trim leading blank lines (common when we removed a header)
-        if trim_leading_blank:
-            while lines and lines[0].strip() == "":
-                lines.pop(0)
-
-        # Create new header comment with relative posix path
-        rel_path = posix_relpath(file_path, root_dir_abs)
-        if isinstance(comment_syntax, tuple):
-            open_tok, close_tok = comment_syntax
-            new_header = f"{open_tok} {rel_path} {close_tok}"
-        else:
-            new_header = f"{comment_syntax} {rel_path}"
-
-        # If the first line already equals our new header (idempotent), nothing to do
-        if lines and lines[0].strip() == new_header.strip():
-            return "unchanged"
-
-        # Insert header
-        new_lines = [new_header] + lines
-
-        if dry_run:
-            # Don't write; just report what would change
-            return "updated"
-
-        # Write back preserving newline style
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(newline.join(new_lines))
-            # Ensure trailing newline if original had it; we cannot know reliably for last line,
-            # but typical source files end with a newline — keep consistent:
-            f.write(newline)
+        # Read only a bounded head block; the rest of the file can never change
+        with open(file_path, "rb") as f:
+            head = f.read(HEAD_BLOCK_SIZE)
+
+            if head == b"":
+                # Empty file — nothing to do
+                emit(f"Warning: Empty file '{file_path}', skipping.", messages=messages)
+                return "skipped"
+
+            newline = detect_newline(head)
+            head_lines = split_head_lines(head, at_eof=len(head) < HEAD_BLOCK_SIZE)
+
+            # Remove up to max_remove existing file-path comments at the very top
+            removed = 0
+            offset = 0
+            idx = 0
+            while idx < len(head_lines) and removed < max_remove:
+                if not is_file_path_comment(decode_line(head_lines[idx]), comment_syntax):
+                    break
+                offset += len(head_lines[idx])
+                idx += 1
+                removed += 1
+
+            # Optional trim leading blank lines (common when we removed a header)
+            if trim_leading_blank:
+                while idx < len(head_lines) and head_lines[idx].strip() == b"":
+                    offset += len(head_lines[idx])
+                    idx += 1
+
+            # Create new header comment with relative posix path
+            rel_path = posix_relpath(file_path, root_dir_abs)
+            if isinstance(comment_syntax, tuple):
+                open_tok, close_tok = comment_syntax
+                new_header = f"{open_tok} {rel_path} {close_tok}"
+            else:
+                new_header = f"{comment_syntax} {rel_path}"
+            new_prefix = new_header.encode("utf-8") + newline
+
+            # Idempotent: the rewrite would reproduce the same bytes, or the first kept line is already our header
+            if head[:offset] == new_prefix:
+                return "unchanged"
+            if removed == 0 and idx < len(head_lines) and decode_line(head_lines[idx]).strip() == new_header.strip():
+                return "unchanged"
+
+            if dry_run:
+                # Don't write; just report what would change
+                return "updated"
+
+            # Stream the untouched tail behind the new header, then atomically swap the file in
+            f.seek(offset)
+            rewrite_with_prefix(file_path, new_prefix, f)
 
         return "updated"
 
     except Exception as e:
-        print(f"Error processing '{file_path}': {e}", file=sys.stderr)
+        emit(f"Error processing '{file_path}': {e}", to_stderr=True, messages=messages)
         return "error"
 
 
-def collect_files_from_directory(root_dir_abs: str, ignore_dirs: Iterable[str]) -> List[str]:
+def file_matcher(ignore_dirs: Iterable[str]) -> FileMatcher:
+    """Precompiled supported-file rules (same as should_process_file) plus ignored dir names."""
+    return FileMatcher(
+        names=SUPPORTED_FILENAMES, extensions=SUPPORTED_EXTENSIONS, ignore=ignore_dirs, fold_ext_case=True
+    )
+
+
+def collect_files_from_directory(root_dir_abs: str, ignore_dirs: Iterable[str], *, threads: int = 1) -> List[str]:
     """
     Walk directory tree and collect absolute paths of processable files.
-    - Returns absolute paths only.
+    - Returns absolute paths only, in sorted top-down order.
     - Ignores directories by simple name match (case-sensitive).
+    - threads > 1 scans directories in parallel (see walker.walk_files).
     """
-    ignore_set = set(ignore_dirs)
-    files: List[str] = []
+    return [entry.path for entry in walk_files(root_dir_abs, file_matcher(ignore_dirs), threads=threads)]
 
-    for dirpath, dirnames, filenames in os.walk(root_dir_abs):
-        # prune ignored dirs in-place
-        dirnames[:] = [d for d in dirnames if d not in ignore_set]
 
-        for filename in filenames:
-            ext = os.path.splitext(filename)[1].lower()
-            if should_process_file(filename, ext):
-                files.append(os.path.join(dirpath, filename))
+def collect_files_from_git(
+    root_dir_abs: str, ignore_dirs: Iterable[str], *, include_untracked: bool = False
+) -> List[str]:
+    """
+    Collect absolute paths of processable files from the git index under root_dir_abs.
+    - One bulk `git ls-files` call; untracked and ignored trees are never walked.
+    - Applies the same ignore-dir and file-type rules as collect_files_from_directory.
+    """
+    files = list_git_files(root_dir_abs, include_untracked=include_untracked)
+    return list(filter_paths(files, root_dir_abs, file_matcher(ignore_dirs)))
 
-    return files
+
+def report_result(result: str, file_path: str, root_dir_abs: str, *, verbose: bool = False) -> None:
+    """Print a per-file status line (errors always, skipped/unchanged only with verbose)."""
+    rel_for_print = posix_relpath(file_path, root_dir_abs)
+    if result == "updated":
+        # print(f"✅ Updated: {rel_for_print}")
+        pass
+    elif result == "error":
+        print(f"❌ Error:   {rel_for_print}")
+    elif verbose and result == "skipped":
+        print(f"⏭️  Skipped: {rel_for_print}")
+    elif verbose and result == "unchanged":
+        print(f"➖ Unchanged: {rel_for_print}")
 
 
 def process_files(
@@ -244,8 +400,16 @@ def process_files(
     dry_run: bool = False,
     max_remove: int = DEFAULT_MAX_REMOVE,
     trim_leading_blank: bool = True,
+    jobs: int = DEFAULT_JOBS,
+    cache: Optional[Dict[str, Dict]] = None,
 ) -> Dict[str, int]:
-    """Process a list of files, return stats dict."""
+    """
+    Process a list of files, return stats dict.
+    - jobs > 1 runs process_single_file in a thread pool (the work is I/O bound).
+    - Results are reported in input order regardless of completion order.
+    - If cache is given, files whose stat matches their manifest entry count as 'unchanged'
+      without being opened; the manifest is updated in place for files known to be stamped.
+    """
     if not file_list:
         print("No files to process.")
         return {"updated": 0, "unchanged": 0, "skipped": 0, "error": 0}
@@ -260,27 +424,54 @@ def process_files(
     # Stats
     stats = {"updated": 0, "unchanged": 0, "skipped": 0, "error": 0}
 
+    def worker(file_path: str) -> Tuple[str, List[Tuple[str, bool]]]:
+        messages: List[Tuple[str, bool]] = []
+        with timed("process_file"):
+            result = process_single_file(
+                file_path,
+                root_dir_abs,
+                verbose=verbose,
+                dry_run=dry_run,
+                max_remove=max_remove,
+                trim_leading_blank=trim_leading_blank,
+                messages=messages,
+            )
+        return result, messages
+
+    # Split off files whose stat still matches the manifest; only the rest need to be opened
+    pending: List[str] = []
+    if cache is not None:
+        with timed("manifest_check"):
+            for file_path in abs_files:
+                signature = stat_signature(file_path, root_dir_abs)
+                if signature is None or cache.get(file_path) != signature:
+                    pending.append(file_path)
+    else:
+        pending = abs_files
+
+    with timed("process"):
+        if jobs > 1 and len(pending) > 1:
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                # executor.map yields in submission order, keeping output deterministic
+                results = dict(zip(pending, executor.map(worker, pending)))
+        else:
+            results = {file_path: worker(file_path) for file_path in pending}
+
     for file_path in abs_files:
-        result = process_single_file(
-            file_path,
-            root_dir_abs,
-            verbose=verbose,
-            dry_run=dry_run,
-            max_remove=max_remove,
-            trim_leading_blank=trim_leading_blank,
-        )
+        result, messages = results.get(file_path, ("unchanged", []))
+        for message, to_stderr in messages:
+            emit(message, to_stderr=to_stderr)
         stats[result] = stats.get(result, 0) + 1
+        report_result(result, file_path, root_dir_abs, verbose=verbose)
 
-        rel_for_print = posix_relpath(file_path, root_dir_abs)
-        if result == "updated":
-            # print(f"✅ Updated: {rel_for_print}")
-            pass
-        elif result == "error":
-            print(f"❌ Error:   {rel_for_print}")
-        elif verbose and result == "skipped":
-            print(f"⏭️  Skipped: {rel_for_print}")
-        elif verbose and result == "unchanged":
-            print(f"➖ Unchanged: {rel_for_print}")
+        if cache is not None and file_path in results:
+            # Remember files that now carry the right header; a dry-run 'updated' was not written
+            if result == "unchanged" or (result == "updated" and not dry_run):
+                signature = stat_signature(file_path, root_dir_abs)
+                if signature is not None:
+                    cache[file_path] = signature
+            else:
+                cache.pop(file_path, None)
 
     return stats
 
@@ -306,6 +497,15 @@ def main():
 
   # Dry run (no writes)
   %(prog)s -d backend/app --dry-run -v
+
+  # Only files tracked by git (skips untracked/ignored trees entirely)
+  %(prog)s -d . --git
+
+  # Large tree with 8 worker threads
+  %(prog)s -d . --jobs 8
+
+  # Ignore the stat manifest and re-check every file
+  %(prog)s -d . --rebuild-cache
         """,
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
@@ -327,6 +527,14 @@ def main():
         default=sorted(DEFAULT_IGNORE_DIRS),
         help="Directory names to ignore when using --directory",
     )
+    parser.add_argument(
+        "--git", action="store_true", help="With --directory, list files from the git index instead of walking the tree"
+    )
+    parser.add_argument(
+        "--git-untracked",
+        action="store_true",
+        help="With --git, also include untracked files not excluded by .gitignore",
+    )
     parser.add_argument(
         "--max-remove", type=int, default=DEFAULT_MAX_REMOVE, help="Max number of existing header lines to remove"
     )
@@ -334,6 +542,20 @@ def main():
         "--no-trim-leading-blank-lines", action="store_true", help="Do not trim blank lines after removing old header"
     )
     parser.add_argument("--dry-run", action="store_true", help="Do not write changes, only report")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help="Number of worker threads for walking and processing (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-file", default=DEFAULT_CACHE_FILE, help="Stat manifest location (default: %(default)s)"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the stat manifest")
+    parser.add_argument(
+        "--rebuild-cache", action="store_true", help="Ignore existing manifest entries and write a fresh manifest"
+    )
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
 
     args = parser.parse_args()
@@ -357,7 +579,19 @@ def main():
             print(f"Error: Directory '{args.directory}' does not exist", file=sys.stderr)
             sys.exit(1)
         directory_abs = os.path.abspath(args.directory)
-        all_files.extend(collect_files_from_directory(directory_abs, args.ignore_dirs))
+        with timed("discover"):
+            if args.git or args.git_untracked:
+                try:
+                    all_files.extend(
+                        collect_files_from_git(directory_abs, args.ignore_dirs, include_untracked=args.git_untracked)
+                    )
+                except RuntimeError as e:
+                    print(f"Error: {e}", file=sys.stderr)
+                    sys.exit(1)
+            else:
+                all_files.extend(
+                    collect_files_from_directory(directory_abs, args.ignore_dirs, threads=max(1, args.jobs))
+                )
 
     if not all_files:
         print("Error: No files to process.", file=sys.stderr)
@@ -381,6 +615,12 @@ def main():
             seen.add(ap)
             unique_abs_files.append(ap)
 
+    # Load stat manifest
+    cache = None
+    if not args.no_cache:
+        with timed("load_cache"):
+            cache = {} if args.rebuild_cache else load_cache(args.cache_file)
+
     # Process
     stats = process_files(
         unique_abs_files,
@@ -389,8 +629,20 @@ def main():
         dry_run=args.dry_run,
         max_remove=max(0, args.max_remove),
         trim_leading_blank=not args.no_trim_leading_blank_lines,
+        jobs=max(1, args.jobs),
+        cache=cache,
     )
 
+    # A dry run wrote nothing, so the manifest must not change either
+    if cache is not None and not args.dry_run:
+        if directory_abs:
+            prune_cache(cache, directory_abs, unique_abs_files)
+        try:
+            with timed("save_cache"):
+                save_cache(args.cache_file, cache)
+        except OSError as e:
+            print(f"Warning: Could not write cache '{args.cache_file}': {e}", file=sys.stderr)
+
     total = sum(stats.values())
     print("\n📊 Summary:")
     print(f"   Updated:   {stats.get('updated', 0)}")
@@ -399,6 +651,11 @@ def main():
     print(f"   Errors:    {stats.get('error', 0)}")
     print(f"   Total:     {total}")
 
+    if args.verbose:
+        print("\n⏱️  Timings:")
+        for line in timings.summary_lines():
+            print(f"   {line}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,270 @@
+# asmo.d/utils/py_utils/benchmarks/bench_file_tools.py
+"""
+Benchmark harness for add_file_path_comment and collect_files_content.
+
+Key features:
+- Builds a synthetic tree in a temp dir: file count, depth, fanout, log-normal size distribution,
+  share of CRLF files and share of files that already carry their path header.
+- Times three phases separately: discovery (walk), process_single_file (dry run) and full collection.
+- Each phase runs cold (page cache dropped per file via posix_fadvise) and warm, in a forked child,
+  so peak RSS is measured per phase.
+- Reports files/sec, MB/sec and peak RSS as JSON; --save writes a baseline, --compare checks against one
+  and exits 1 on regressions beyond --threshold.
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+from pathlib import Path
+from queue import Empty
+import random
+import resource
+import sys
+import tempfile
+import time
+import traceback
+from typing import Callable
+from typing import Dict
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import add_file_path_comment  # noqa: E402
+import collect_files_content  # noqa: E402
+
+EXTENSIONS = [".py", ".ts", ".vue", ".yml"]
+PHASES = ["discovery", "process", "collect"]
+
+
+# ---------------------------
+# Synthetic tree
+# ---------------------------
+def header_for(rel_path: str, ext: str) -> str:
+    if ext == ".vue":
+        return f"<!-- {rel_path} -->"
+    if ext == ".ts":
+        return f"// {rel_path}"
+    return f"# {rel_path}"
+
+
+def build_tree(root: Path, args: argparse.Namespace) -> Dict:
+    """Create the synthetic tree under root and return its totals."""
+    rng = random.Random(args.seed)
+    total_bytes = 0
+    line = "value_{n} = compute({n}, other_value)  # synthetic line\n"
+
+    for i in range(args.files):
+        parts = [f"d{(i // args.fanout**k) % args.fanout}" for k in range(args.depth)]
+        ext = EXTENSIONS[i % len(EXTENSIONS)]
+        rel_path = "/".join(parts + [f"file_{i}{ext}"])
+        size = max(16, int(rng.lognormvariate(0, args.size_sigma) * args.median_size))
+        newline = "\r\n" if rng.random() < args.crlf_ratio else "\n"
+
+        text = []
+        if rng.random() < args.stamped_ratio:
+            text.append(header_for(rel_path, ext) + "\n")
+        written = 0
+        n = 0
+        while written < size:
+            chunk = line.format(n=n)
+            text.append(chunk)
+            written += len(chunk)
+            n += 1
+        data = "".join(text).replace("\n", newline).encode("utf-8")
+
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        total_bytes += len(data)
+
+    return {"files": args.files, "bytes": total_bytes}
+
+
+def drop_page_cache(root: Path) -> None:
+    """Ask the kernel to evict the tree's pages (no root needed for clean pages)."""
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            fd = os.open(os.path.join(dirpath, filename), os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+
+
+# ---------------------------
+# Phases
+# ---------------------------
+def discover(root: Path) -> List[str]:
+    return add_file_path_comment.collect_files_from_directory(str(root), add_file_path_comment.DEFAULT_IGNORE_DIRS)
+
+
+def phase_discovery(root: Path, workdir: Path, files: List[str]) -> None:
+    discover(root)
+
+
+def phase_process(root: Path, workdir: Path, files: List[str]) -> None:
+    for file_path in files:
+        add_file_path_comment.process_single_file(file_path, str(root), dry_run=True, messages=[])
+
+
+def phase_collect(root: Path, workdir: Path, files: List[str]) -> None:
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        collect_files_content.collect_file_contents(
+            root,
+            workdir / "prompt.txt",
+            collect_files_content.DEFAULT_EXTENSIONS,
+            set(),
+            collect_files_content.DEFAULT_IGNORE,
+        )
+
+
+PHASE_FUNCS: Dict[str, Callable[[Path, Path, List[str]], None]] = {
+    "discovery": phase_discovery,
+    "process": phase_process,
+    "collect": phase_collect,
+}
+
+
+def _child(phase: str, root: Path, workdir: Path, files: List[str], queue: multiprocessing.Queue) -> None:
+    try:
+        start = time.perf_counter()
+        PHASE_FUNCS[phase](root, workdir, files)
+        seconds = time.perf_counter() - start
+        queue.put({"seconds": seconds, "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss})
+    except BaseException:
+        queue.put({"error": traceback.format_exc()})
+
+
+def run_phase(phase: str, root: Path, workdir: Path, files: List[str], totals: Dict) -> Dict:
+    """Run one phase in a forked child (the file list is inherited, not re-discovered) and return its metrics."""
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(phase, root, workdir, files, queue))
+    proc.start()
+    # Poll so a child killed without reporting (OOM, signal) fails the run instead of hanging it
+    while True:
+        try:
+            result = queue.get(timeout=1)
+            break
+        except Empty:
+            if not proc.is_alive():
+                raise RuntimeError(f"phase {phase!r}: child exited with code {proc.exitcode} without a result")
+    proc.join()
+    if "error" in result:
+        raise RuntimeError(f"phase {phase!r} failed in the child:\n{result['error']}")
+
+    seconds = max(result["seconds"], 1e-9)
+    return {
+        "seconds": round(seconds, 6),
+        "files_per_sec": round(totals["files"] / seconds, 1),
+        "mb_per_sec": round(totals["bytes"] / seconds / 1e6, 2),
+        "peak_rss_kb": result["peak_rss_kb"],
+    }
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict:
+    with tempfile.TemporaryDirectory(prefix="bench_file_tools_") as tmp:
+        root = Path(tmp) / "tree"
+        workdir = Path(tmp) / "work"
+        workdir.mkdir()
+        totals = build_tree(root, args)
+        files = discover(root)
+
+        results: Dict[str, Dict] = {}
+        for phase in args.phases:
+            best: Dict[str, Dict] = {}
+            for _ in range(args.repeat):
+                for mode in ("cold", "warm"):
+                    if mode == "cold":
+                        drop_page_cache(root)
+                    metrics = run_phase(phase, root, workdir, files, totals)
+                    if mode not in best or metrics["seconds"] < best[mode]["seconds"]:
+                        best[mode] = metrics
+            results[phase] = best
+
+    config = {k: v for k, v in vars(args).items() if k not in ("save", "compare", "threshold", "output")}
+    return {"config": config, "totals": totals, "results": results}
+
+
+# ---------------------------
+# Baseline comparison
+# ---------------------------
+def compare(report: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Return a list of regressions where files/sec dropped by more than threshold (fraction)."""
+    regressions: List[str] = []
+    for phase, modes in report["results"].items():
+        for mode, metrics in modes.items():
+            old = baseline.get("results", {}).get(phase, {}).get(mode)
+            if not old:
+                continue
+            change = metrics["files_per_sec"] / old["files_per_sec"] - 1
+            line = f"{phase:<10} {mode:<5} {old['files_per_sec']:>12.1f} -> {metrics['files_per_sec']:>12.1f} files/s"
+            print(f"{line} ({change:+.1%})", file=sys.stderr)
+            if change < -threshold:
+                regressions.append(f"{phase}/{mode}: {change:+.1%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the py_utils file tools on a synthetic tree",
+        epilog="""Examples:
+  # Default run, JSON to stdout
+  %(prog)s
+
+  # Save a baseline, later compare against it (exit 1 on >10%% regression)
+  %(prog)s --files 20000 --save baseline.json
+  %(prog)s --files 20000 --compare baseline.json --threshold 0.1
+        """,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--files", type=int, default=2000, help="Number of files (default: %(default)s)")
+    parser.add_argument("--depth", type=int, default=3, help="Directory depth (default: %(default)s)")
+    parser.add_argument("--fanout", type=int, default=8, help="Subdirectories per level (default: %(default)s)")
+    parser.add_argument(
+        "--median-size", type=int, default=4096, help="Median file size in bytes (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--size-sigma", type=float, default=1.0, help="Log-normal sigma of sizes (default: %(default)s)"
+    )
+    parser.add_argument("--crlf-ratio", type=float, default=0.1, help="Share of CRLF files (default: %(default)s)")
+    parser.add_argument(
+        "--stamped-ratio", type=float, default=0.9, help="Share of files already stamped (default: %(default)s)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per phase, best is kept (default: %(default)s)")
+    parser.add_argument("--phases", nargs="*", choices=PHASES, default=PHASES, help="Phases to run")
+    parser.add_argument("-o", "--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--save", help="Also save the report as a baseline file")
+    parser.add_argument("--compare", help="Baseline file to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="Allowed files/sec drop vs baseline (default: %(default)s)"
+    )
+
+    args = parser.parse_args()
+    try:
+        report = run_benchmarks(args)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    if args.save:
+        Path(args.save).write_text(text + "\n", encoding="utf-8")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print("Regressions: " + ", ".join(regressions), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# asmo.d/utils/py_utils/benchmarks/bench_generate_howto_deploy.py
+"""
+Benchmark for generate_howto_deploy batch mode.
+
+Key features:
+- Writes a synthetic CSV manifest of --sites entries (alternating GitHub/GitLab repos).
+- Times the CLI end to end as one process (startup included), for a cold run, an unchanged
+  rerun and a rerun after one manifest entry changed.
+- Checks the written/unchanged file counts after each run.
+- Reports wall time per run as JSON and exits 1 if any run exceeds --budget-ms.
+"""
+
+import argparse
+import csv
+import json
+import os
+from pathlib import Path
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict
+from typing import List
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "generate_howto_deploy.py")
+SUMMARY_RE = re.compile(r"(\d+) files written, (\d+) unchanged")
+
+
+def write_manifest(path: Path, sites: int, port_offset: int = 0) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["www_domain", "repo_url", "port"])
+        for i in range(sites):
+            host = "github.com" if i % 2 else "gitlab.com"
+            port = 8000 + i % 1000 + (port_offset if i == 0 else 0)
+            writer.writerow([f"www.site{i}.example.com", f"https://{host}/team/site{i}", port])
+
+
+def run(manifest: Path, output: Path) -> Dict:
+    command = [sys.executable, SCRIPT, "-m", str(manifest), "-o", str(output), "--sites-dir", str(output / "sites")]
+    start = time.perf_counter()
+    result = subprocess.run(command, check=True, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    written, unchanged = map(int, SUMMARY_RE.search(result.stderr).groups())
+    return {"ms": round(elapsed * 1000, 1), "written": written, "unchanged": unchanged}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark generate_howto_deploy manifest mode",
+        epilog="""Examples:
+  %(prog)s --sites 1000 --budget-ms 1000
+        """,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--sites", type=int, default=1000, help="Sites in the manifest (default: %(default)s)")
+    parser.add_argument("--budget-ms", type=float, default=1000, help="Max wall time per run (default: %(default)s)")
+
+    args = parser.parse_args()
+    files = args.sites * 2
+    report = {"sites": args.sites, "runs": {}}
+    failures: List[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = Path(tmp) / "sites.csv"
+        output = Path(tmp) / "out"
+        write_manifest(manifest, args.sites)
+        expected = {"cold": (files, 0), "unchanged": (0, files)}
+        report["runs"]["cold"] = run(manifest, output)
+        report["runs"]["unchanged"] = run(manifest, output)
+        write_manifest(manifest, args.sites, port_offset=1)
+        expected["one_changed"] = (1, files - 1)
+        report["runs"]["one_changed"] = run(manifest, output)
+
+    for name, result in report["runs"].items():
+        if (result["written"], result["unchanged"]) != expected[name]:
+            failures.append(f"{name}: expected written/unchanged {expected[name]}")
+        if result["ms"] > args.budget_ms:
+            failures.append(f"{name}: {result['ms']}ms over budget {args.budget_ms}ms")
+    report["failures"] = failures
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
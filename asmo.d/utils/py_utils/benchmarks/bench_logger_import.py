@@ -0,0 +1,116 @@
+# asmo.d/utils/py_utils/benchmarks/bench_logger_import.py
+"""
+Import-time benchmark for the loggers package.
+
+Key features:
+- Runs `python -X importtime -c "import <module>"` in fresh interpreters and keeps the best
+  cumulative time of the module itself, so interpreter startup and site imports are not counted.
+- Fails if the import pulls in a module that should only load on the first get_logger call
+  (pydantic, pydantic_settings, loguru by default).
+- Also times the first get_logger call, where settings and sinks are set up.
+- Reports JSON; exits 1 when an import exceeds --budget-ms or a deferred module leaks into the import.
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+from typing import Dict
+from typing import List
+
+PY_UTILS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["loggers.logging_logger", "loggers.loguru_logger"]
+DEFERRED = ["pydantic", "pydantic_settings", "loguru"]
+
+FIRST_CALL_SNIPPET = """
+import time
+import {module} as m
+start = time.perf_counter()
+m.get_logger("bench")
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def run_python(args: List[str]) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable] + args, cwd=PY_UTILS_DIR, capture_output=True, text=True, check=True)
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """module -> cumulative import time in microseconds, from -X importtime output."""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def measure(module: str, repeat: int) -> Dict:
+    best_us = None
+    imported = set()
+    for _ in range(repeat):
+        times = parse_importtime(run_python(["-X", "importtime", "-c", f"import {module}"]).stderr)
+        best_us = times[module] if best_us is None else min(best_us, times[module])
+        imported |= set(times)
+
+    first_call_ms = None
+    try:
+        output = run_python(["-c", FIRST_CALL_SNIPPET.format(module=module)]).stdout
+        first_call_ms = round(float(output.strip().splitlines()[-1]), 2)
+    except subprocess.CalledProcessError as e:
+        # e.g. loguru not installed: the import is still measured, the first call cannot be
+        print(f"Warning: get_logger failed for {module}: {e.stderr.strip().splitlines()[-1]}", file=sys.stderr)
+
+    return {
+        "import_ms": round(best_us / 1000, 2),
+        "first_get_logger_ms": first_call_ms,
+        "deferred_imported": sorted(name for name in DEFERRED if name in imported),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the import time of the loggers package against a budget",
+        epilog="""Examples:
+  # Default run, JSON to stdout, exit 1 if over budget
+  %(prog)s
+
+  # Stricter budget, more runs per module
+  %(prog)s --budget-ms 15 --repeat 10
+        """,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--modules", nargs="*", default=MODULES, help="Modules to import (default: both loggers)")
+    parser.add_argument(
+        "--budget-ms", type=float, default=25.0, help="Max cumulative import time per module (default: %(default)s)"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per module, best is kept (default: %(default)s)")
+    parser.add_argument("-o", "--output", help="Write the JSON report to this file instead of stdout")
+
+    args = parser.parse_args()
+    report = {"python": sys.version.split()[0], "budget_ms": args.budget_ms, "modules": {}}
+    failures = []
+    for module in args.modules:
+        result = measure(module, max(1, args.repeat))
+        report["modules"][module] = result
+        if result["import_ms"] > args.budget_ms:
+            failures.append(f"{module} import {result['import_ms']}ms > {args.budget_ms}ms")
+        if result["deferred_imported"]:
+            failures.append(f"{module} imports {', '.join(result['deferred_imported'])}")
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if failures:
+        print("Over budget: " + "; ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
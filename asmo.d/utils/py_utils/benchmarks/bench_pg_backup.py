@@ -0,0 +1,166 @@
+# asmo.d/utils/py_utils/benchmarks/bench_pg_backup.py
+"""
+Benchmark for pg_backup against the two-pass backup_postgres.sh approach.
+
+Key features:
+- --emit-mb prints a synthetic pg_dump (CREATE TABLE + COPY blocks of tab-separated rows) to stdout,
+  so this script is also the stand-in dump process when no Postgres is available.
+- Runs pg_backup with --command pointing at the generator, for each --jobs value, and a legacy
+  baseline that dumps twice (plain file, then single-threaded gzip) like backup_postgres.sh.
+- Verifies that the .sql.gz decompresses to the .sql byte for byte.
+- Reports wall time and MB/sec per run as JSON.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+import random
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict
+from typing import List
+
+PY_UTILS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORDS = ["alpha", "beta", "gamma", "delta", "wallet", "stake", "block", "hotkey", "subnet", "miner", "validator"]
+
+
+# ---------------------------
+# Synthetic dump
+# ---------------------------
+def synthetic_blocks(total_mb: int, seed: int, variants: int = 16):
+    """A few 1 MB COPY blocks with random rows, emitted in random order until total_mb is reached."""
+    rng = random.Random(seed)
+    blocks = []
+    for _ in range(variants):
+        rows = []
+        size = 0
+        while size < 1024 * 1024:
+            row = (
+                f"{rng.randrange(10**9)}\t{rng.choice(WORDS)}_{rng.randrange(10**4)}\t"
+                f"{rng.random() * 1000:.6f}\t2024-0{rng.randrange(1, 10)}-1{rng.randrange(10)} 12:00:00+00\n"
+            )
+            rows.append(row)
+            size += len(row)
+        blocks.append("".join(rows).encode("ascii"))
+
+    yield b"--\n-- PostgreSQL database dump (synthetic)\n--\n\n"
+    for table in range(total_mb):
+        if table % 64 == 0:
+            yield f"\nCREATE TABLE public.t{table} (id bigint, name text, value numeric, ts timestamptz);\n".encode()
+            yield f"COPY public.t{table} (id, name, value, ts) FROM stdin;\n".encode()
+        yield blocks[rng.randrange(variants)]
+        if table % 64 == 63:
+            yield b"\\.\n"
+    yield b"\\.\n\n-- PostgreSQL database dump complete\n"
+
+
+def emit(total_mb: int, seed: int) -> None:
+    out = sys.stdout.buffer
+    for block in synthetic_blocks(total_mb, seed):
+        out.write(block)
+    out.flush()
+
+
+# ---------------------------
+# Runs
+# ---------------------------
+def generator_command(mb: int, seed: int) -> List[str]:
+    return [sys.executable, os.path.abspath(__file__), "--emit-mb", str(mb), "--seed", str(seed)]
+
+
+def run_pg_backup(directory: Path, mb: int, seed: int, jobs: int, sinks: List[str]) -> Dict:
+    command = [
+        sys.executable,
+        os.path.join(PY_UTILS_DIR, "pg_backup.py"),
+        "--db-name",
+        "bench",
+        "--backup-dir",
+        str(directory),
+        "--retention-days",
+        "0",
+        "-j",
+        str(jobs),
+        "--sinks",
+        *sinks,
+        "--command",
+        shlex.join(generator_command(mb, seed)),
+    ]
+    start = time.perf_counter()
+    subprocess.run(command, check=True, capture_output=True)
+    return {"seconds": time.perf_counter() - start}
+
+
+def run_legacy(directory: Path, mb: int, seed: int) -> Dict:
+    """pg_dump > .sql; pg_dump | gzip > .sql.gz"""
+    start = time.perf_counter()
+    with open(directory / "bench_legacy.sql", "wb") as out:
+        subprocess.run(generator_command(mb, seed), stdout=out, check=True)
+    with gzip.open(directory / "bench_legacy.sql.gz", "wb", compresslevel=6) as out:  # gzip CLI default
+        process = subprocess.Popen(generator_command(mb, seed), stdout=subprocess.PIPE)
+        shutil.copyfileobj(process.stdout, out, 1024 * 1024)
+        process.wait()
+    return {"seconds": time.perf_counter() - start}
+
+
+def verify(directory: Path) -> bool:
+    """Every .sql.gz decompresses to the .sql with the same name."""
+    for gz_path in directory.glob("*.sql.gz"):
+        plain = hashlib.sha256(gz_path.with_suffix("").read_bytes()).hexdigest()
+        with gzip.open(gz_path, "rb") as f:
+            if hashlib.sha256(f.read()).hexdigest() != plain:
+                return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark pg_backup against a two-pass dump + gzip",
+        epilog="""Examples:
+  %(prog)s --mb 256 --jobs 1 4 8
+
+  # Synthetic dump to stdout, as a stand-in for pg_dump
+  %(prog)s --emit-mb 100 | head -c 300
+        """,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--mb", type=int, default=128, help="Synthetic dump size (default: %(default)s)")
+    parser.add_argument(
+        "--jobs", type=int, nargs="+", default=[1, os.cpu_count() or 1], help="Thread counts to compare"
+    )
+    parser.add_argument("--sinks", nargs="+", default=["sql", "gz"], help="pg_backup sinks (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=42, help="Generator seed (default: %(default)s)")
+    parser.add_argument("--emit-mb", type=int, help="Only print a synthetic dump of this size to stdout")
+
+    args = parser.parse_args()
+    if args.emit_mb is not None:
+        emit(args.emit_mb, args.seed)
+        return
+
+    report = {"mb": args.mb, "sinks": args.sinks, "runs": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        runs = {"legacy": lambda: run_legacy(directory, args.mb, args.seed)}
+        for jobs in args.jobs:
+            runs[f"pg_backup_j{jobs}"] = lambda jobs=jobs: run_pg_backup(
+                directory, args.mb, args.seed, jobs, args.sinks
+            )
+        for name, run in runs.items():
+            result = run()
+            result["mb_per_sec"] = round(args.mb * 1024 * 1024 / 1e6 / result["seconds"], 1)
+            result["seconds"] = round(result["seconds"], 3)
+            report["runs"][name] = result
+            report["runs"][name]["verified"] = verify(directory)
+            for path in directory.iterdir():
+                path.unlink()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
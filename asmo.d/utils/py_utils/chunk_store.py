@@ -0,0 +1,415 @@
+# asmo.d/utils/py_utils/chunk_store.py
+"""
+Deduplicating backup store with content-defined chunking.
+
+Key features:
+- The stream is cut into chunks at content-defined boundaries: at each newline byte past --min-kb, a
+  window hash (crc32 of the preceding 64 bytes) is checked against a mask, with a hard cut at --max-kb.
+  Boundaries depend only on nearby content, so an insert or delete early in a dump shifts nothing
+  after it and unchanged rows map to the same chunks from one night to the next.
+- Chunks are stored once, zlib-compressed, under chunks/<2 hex>/<sha256>; writes are atomic
+  (temp file + rename) and skipped when the chunk already exists.
+- One small JSON manifest per backup (chunk digests and sizes, total size, sha256 of the stream).
+- Restore streams chunks back in order, verifying each chunk and the whole stream, to a file or stdout.
+- gc drops manifests past retention and deletes chunks no manifest references. It takes an exclusive
+  flock on <store>/.lock, and every open backup holds a shared one, so gc never deletes the chunks of a
+  backup whose manifest is not written yet.
+- Hashing and compression of new chunks run on a thread pool (hashlib and zlib release the GIL).
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import fcntl
+import hashlib
+import json
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+from typing import BinaryIO
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+import zlib
+
+DEFAULT_MIN_KB = 4
+DEFAULT_MAX_KB = 256
+DEFAULT_MASK_BITS = 8  # one in 256 anchors is a boundary: ~16 KB chunks for SQL text, ~64 KB for binary
+DEFAULT_COMPRESS_LEVEL = 6
+DEFAULT_READ_MB = 4
+WINDOW = 64
+ANCHOR = b"\n"
+LOCK_FILE = ".lock"
+
+
+# ---------------------------
+# Chunking
+# ---------------------------
+class Chunker:
+    """Streaming content-defined chunker: feed() blocks of any size, get chunks back."""
+
+    def __init__(
+        self,
+        min_size: int = DEFAULT_MIN_KB * 1024,
+        max_size: int = DEFAULT_MAX_KB * 1024,
+        mask_bits: int = DEFAULT_MASK_BITS,
+    ):
+        if not WINDOW <= min_size < max_size:
+            raise ValueError(f"Need {WINDOW} <= min_size < max_size")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.mask = (1 << mask_bits) - 1
+        self.buffer = bytearray()
+        self._scan = 0  # anchors before this offset (relative to the chunk start) were already rejected
+
+    def _cut(self, view: memoryview, start: int) -> int:
+        """End offset of the chunk starting at start, or -1 if more data is needed."""
+        end = len(view)
+        limit = min(end, start + self.max_size)
+        find = self.buffer.find
+        crc32 = zlib.crc32
+        mask = self.mask
+        i = find(ANCHOR, start + max(self.min_size, self._scan), limit)
+        while i != -1:
+            if not crc32(view[i - WINDOW : i]) & mask:
+                return i + 1
+            i = find(ANCHOR, i + 1, limit)
+        if end - start >= self.max_size:
+            return start + self.max_size
+        self._scan = max(self._scan, end - start)
+        return -1
+
+    def feed(self, data: bytes) -> Iterator[bytes]:
+        self.buffer += data
+        start = 0
+        with memoryview(self.buffer) as view:
+            while True:
+                end = self._cut(view, start)
+                if end < 0:
+                    break
+                yield bytes(view[start:end])
+                start = end
+                self._scan = 0
+        del self.buffer[:start]
+
+    def finish(self) -> Iterator[bytes]:
+        if self.buffer:
+            yield bytes(self.buffer)
+            self.buffer.clear()
+        self._scan = 0
+
+
+# ---------------------------
+# Store
+# ---------------------------
+def atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class ChunkStore:
+    """chunks/ and manifests/ under root."""
+
+    def __init__(self, root: Path, compress_level: int = DEFAULT_COMPRESS_LEVEL, jobs: int = os.cpu_count() or 1):
+        self.root = Path(root)
+        self.chunks_dir = self.root / "chunks"
+        self.manifests_dir = self.root / "manifests"
+        self.compress_level = compress_level
+        self.jobs = jobs
+
+    def chunk_path(self, digest: str) -> Path:
+        return self.chunks_dir / digest[:2] / digest
+
+    def manifest_path(self, name: str) -> Path:
+        return self.manifests_dir / f"{name}.json"
+
+    def lock(self, operation: int) -> int:
+        """Open <root>/.lock and flock it (fcntl.LOCK_SH or LOCK_EX, blocking); returns the fd to close."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.root / LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, operation)
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
+
+    def _store(self, digest: str, chunk: bytes) -> int:
+        """Compress and write one chunk; returns bytes written (0 if it was already stored)."""
+        path = self.chunk_path(digest)
+        if path.exists():
+            return 0
+        data = zlib.compress(chunk, self.compress_level)
+        atomic_write(path, data)
+        return len(data)
+
+    def load_chunk(self, digest: str) -> bytes:
+        chunk = zlib.decompress(self.chunk_path(digest).read_bytes())
+        if hashlib.sha256(chunk).hexdigest() != digest:
+            raise ValueError(f"Chunk {digest} is corrupt")
+        return chunk
+
+    # Backup ----------------------------------------------------------------
+
+    def writer(self, name: str, chunker: Optional[Chunker] = None) -> "BackupWriter":
+        return BackupWriter(self, name, chunker or Chunker())
+
+    def backup(self, stream: BinaryIO, name: str, chunker: Optional[Chunker] = None, read_size: int = 0) -> Dict:
+        writer = self.writer(name, chunker)
+        try:
+            while True:
+                block = stream.read(read_size or DEFAULT_READ_MB * 1024 * 1024)
+                if not block:
+                    break
+                writer.write(block)
+        except BaseException:
+            writer.close()
+            raise
+        return writer.commit()
+
+    # Restore ---------------------------------------------------------------
+
+    def read_manifest(self, name: str) -> Dict:
+        return json.loads(self.manifest_path(name).read_text(encoding="utf-8"))
+
+    def manifests(self) -> List[Dict]:
+        if not self.manifests_dir.is_dir():
+            return []
+        items = [json.loads(p.read_text(encoding="utf-8")) for p in self.manifests_dir.glob("*.json")]
+        return sorted(items, key=lambda m: m["created"])
+
+    def restore(self, name: str, out: BinaryIO) -> Dict:
+        """Write the backup to out in order, verifying every chunk and the stream's sha256."""
+        manifest = self.read_manifest(name)
+        digests = [digest for digest, _ in manifest["chunks"]]
+        sha256 = hashlib.sha256()
+        total = 0
+        window = 4 * self.jobs
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            for i in range(0, len(digests), window):
+                for chunk in executor.map(self.load_chunk, digests[i : i + window]):
+                    out.write(chunk)
+                    sha256.update(chunk)
+                    total += len(chunk)
+        if total != manifest["bytes"] or sha256.hexdigest() != manifest["sha256"]:
+            raise ValueError(f"Restored stream of {name} does not match its manifest")
+        return {"bytes": total, "sha256": sha256.hexdigest(), "chunks": len(digests)}
+
+    # Retention -------------------------------------------------------------
+
+    def gc(self, retention_days: float = 0, now: Optional[float] = None) -> Dict:
+        """
+        Drop manifests older than retention_days (0 keeps all), then chunks nothing references.
+        Waits for open backups to finish: their chunks are not referenced by any manifest yet.
+        """
+        lock_fd = self.lock(fcntl.LOCK_EX)
+        try:
+            return self._gc(retention_days, now)
+        finally:
+            os.close(lock_fd)
+
+    def _gc(self, retention_days: float, now: Optional[float]) -> Dict:
+        cutoff = (now or time.time()) - retention_days * 86400
+        removed_manifests = []
+        live = set()
+        for manifest in self.manifests():
+            if retention_days > 0 and manifest["created"] < cutoff:
+                self.manifest_path(manifest["name"]).unlink()
+                removed_manifests.append(manifest["name"])
+            else:
+                live.update(digest for digest, _ in manifest["chunks"])
+
+        removed_chunks = freed = 0
+        if self.chunks_dir.is_dir():
+            for path in self.chunks_dir.glob("*/*"):
+                if path.name not in live:
+                    freed += path.stat().st_size
+                    path.unlink()
+                    removed_chunks += 1
+        return {"manifests": removed_manifests, "chunks": removed_chunks, "bytes": freed}
+
+
+class BackupWriter:
+    """
+    Incremental backup into a ChunkStore: write() blocks as they arrive, commit() writes the manifest.
+    Holds a shared lock on the store from creation until close(), so gc cannot run meanwhile.
+    """
+
+    def __init__(self, store: ChunkStore, name: str, chunker: Chunker):
+        self._lock_fd = store.lock(fcntl.LOCK_SH)
+        self.store = store
+        self.name = name
+        self.chunker = chunker
+        self.chunks: List[List] = []
+        self.sha256 = hashlib.sha256()
+        self.bytes_in = 0
+        self.bytes_written = 0
+        self.new_chunks = 0
+        self._seen = set()
+        self._executor = ThreadPoolExecutor(max_workers=store.jobs)
+
+    def _add(self, chunks: List[bytes]) -> None:
+        digests = list(self._executor.map(lambda c: hashlib.sha256(c).hexdigest(), chunks))
+        new = []
+        for digest, chunk in zip(digests, chunks):
+            self.chunks.append([digest, len(chunk)])
+            if digest not in self._seen:
+                self._seen.add(digest)
+                new.append((digest, chunk))
+        for written in self._executor.map(lambda item: self.store._store(*item), new):
+            if written:
+                self.new_chunks += 1
+                self.bytes_written += written
+
+    def write(self, data: bytes) -> None:
+        self.sha256.update(data)
+        self.bytes_in += len(data)
+        self._add(list(self.chunker.feed(data)))
+
+    def commit(self) -> Dict:
+        try:
+            return self._commit()
+        finally:
+            # Only now may gc run: the manifest references every chunk written above
+            self.close()
+
+    def _commit(self) -> Dict:
+        self._add(list(self.chunker.finish()))
+        manifest = {
+            "name": self.name,
+            "created": time.time(),
+            "bytes": self.bytes_in,
+            "sha256": self.sha256.hexdigest(),
+            "chunker": {
+                "min_size": self.chunker.min_size,
+                "max_size": self.chunker.max_size,
+                "mask": self.chunker.mask,
+                "window": WINDOW,
+            },
+            "chunks": self.chunks,
+        }
+        atomic_write(self.store.manifest_path(self.name), json.dumps(manifest, separators=(",", ":")).encode())
+        return {
+            "name": self.name,
+            "bytes": self.bytes_in,
+            "sha256": manifest["sha256"],
+            "chunks": len(self.chunks),
+            "new_chunks": self.new_chunks,
+            "bytes_written": self.bytes_written,
+        }
+
+    def close(self) -> None:
+        self._executor.shutdown()
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+
+# ---------------------------
+# CLI
+# ---------------------------
+def main():
+    parser = argparse.ArgumentParser(
+        description="Deduplicating chunk store for nightly dumps",
+        epilog="""Examples:
+  # Back up a dump (or stdin with -); only chunks not already stored are written
+  %(prog)s backup --store /backups/chunks mydb_2024-05-01.sql
+  pg_dump mydb | %(prog)s backup --store /backups/chunks --name mydb_$(date +%%F) -
+
+  # Restore to a file or stdout
+  %(prog)s restore --store /backups/chunks --name mydb_2024-05-01 -o restored.sql
+  %(prog)s restore --store /backups/chunks --name mydb_2024-05-01 | psql mydb
+
+  # List backups; drop those older than 30 days and unreferenced chunks
+  %(prog)s list --store /backups/chunks
+  %(prog)s gc --store /backups/chunks --retention-days 30
+        """,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("action", choices=["backup", "restore", "list", "gc"], help="What to do")
+    parser.add_argument("input", nargs="?", default="-", help="File to back up, - for stdin (default: -)")
+    parser.add_argument("--store", required=True, help="Store directory")
+    parser.add_argument("--name", help="Backup name (default: input file stem, or stdin_<date>)")
+    parser.add_argument("-o", "--output", help="Restore to this file instead of stdout")
+    parser.add_argument("--min-kb", type=int, default=DEFAULT_MIN_KB, help="Min chunk size (default: %(default)s)")
+    parser.add_argument("--max-kb", type=int, default=DEFAULT_MAX_KB, help="Max chunk size (default: %(default)s)")
+    parser.add_argument(
+        "--mask-bits",
+        type=int,
+        default=DEFAULT_MASK_BITS,
+        help="Boundary odds 1/2^bits per anchor (default: %(default)s)",
+    )
+    parser.add_argument("--level", type=int, default=DEFAULT_COMPRESS_LEVEL, help="zlib level (default: %(default)s)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Threads (default: %(default)s)")
+    parser.add_argument("--retention-days", type=float, default=0, help="gc: drop backups older than this (0 = none)")
+
+    # intermixed: the optional input positional may follow --store etc.
+    args = parser.parse_intermixed_args()
+    store = ChunkStore(Path(args.store), args.level, max(1, args.jobs))
+
+    try:
+        if args.action == "backup":
+            name = args.name or (
+                Path(args.input).name.split(".")[0]
+                if args.input != "-"
+                else f"stdin_{datetime.now().strftime('%Y-%m-%d_%H-%M')}"
+            )
+            chunker = Chunker(args.min_kb * 1024, args.max_kb * 1024, args.mask_bits)
+            start = time.perf_counter()
+            if args.input == "-":
+                stats = store.backup(sys.stdin.buffer, name, chunker)
+            else:
+                with open(args.input, "rb") as f:
+                    stats = store.backup(f, name, chunker)
+            elapsed = time.perf_counter() - start
+            mb = stats["bytes"] / 1e6
+            print(f"📊 {name}: {mb:,.1f} MB in {elapsed:.2f}s ({mb / max(elapsed, 1e-9):,.1f} MB/s)", file=sys.stderr)
+            print(
+                f"✅ {stats['chunks']} chunks, {stats['new_chunks']} new, "
+                f"{stats['bytes_written'] / 1e6:,.2f} MB written, sha256 {stats['sha256']}",
+                file=sys.stderr,
+            )
+
+        elif args.action == "restore":
+            if not args.name:
+                parser.error("restore needs --name")
+            if args.output:
+                try:
+                    with open(args.output, "wb") as out:
+                        stats = store.restore(args.name, out)
+                except BaseException:
+                    os.unlink(args.output)
+                    raise
+            else:
+                stats = store.restore(args.name, sys.stdout.buffer)
+                sys.stdout.flush()
+            print(f"✅ Restored {args.name}: {stats['bytes'] / 1e6:,.1f} MB, sha256 OK", file=sys.stderr)
+
+        elif args.action == "list":
+            for manifest in store.manifests():
+                created = datetime.fromtimestamp(manifest["created"]).strftime("%Y-%m-%d %H:%M")
+                print(f"{manifest['name']}\t{created}\t{manifest['bytes']:,} bytes\t{len(manifest['chunks'])} chunks")
+
+        else:
+            result = store.gc(args.retention_days)
+            print(
+                f"🗑️  Removed {len(result['manifests'])} backups and {result['chunks']} chunks "
+                f"({result['bytes'] / 1e6:,.1f} MB)"
+            )
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
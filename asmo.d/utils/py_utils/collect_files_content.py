@@ -1,6 +1,32 @@
 # asmo.d/utils/py_utils/collect_files_content.py
 import argparse
+import codecs
+from functools import partial
+import json
+import os
 from pathlib import Path
+import shutil
+import sys
+
+from content_filters import DEFAULT_MAX_ENTROPY
+from content_filters import DEFAULT_MAX_LINE_LENGTH
+from content_filters import DEFAULT_SNIFF_BYTES
+from content_filters import find_duplicates
+from content_filters import hash_file
+from content_filters import sniff_file
+from git_files import list_changed_files
+from git_files import list_git_files
+from loggers.timing import timed
+from loggers.timing import timings
+from prompt_cache import PromptCache
+from prompt_cache import default_cache_dir
+from prompt_shards import ShardWriter
+from prompt_shards import estimate_tokens
+from prompt_shards import load_token_counter
+from prompt_shards import manifest_path
+from walker import FileMatcher
+from walker import filter_paths
+from walker import walk_files
 
 DEFAULT_IGNORE = {
     ".idea",
@@ -32,18 +58,77 @@
 }
 
 
-def should_include(file: Path, include_exts, exclude_exts):
-    name = file.name
-    suffix = file.suffix
+# Files are copied in chunks of this size, so memory use does not depend on file size
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def copy_validated(src, out):
+    # Chunked copy that rejects invalid UTF-8 (same contract as read_text) without decoding whole files
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    while True:
+        chunk = src.read(COPY_CHUNK_SIZE)
+        if not chunk:
+            decoder.decode(b"", final=True)
+            return
+        decoder.decode(chunk)
+        out.write(chunk)
+
+
+def copy_raw(src, out):
+    # Kernel-side copy (copy_file_range, then sendfile), falling back to a buffered copy
+    out.flush()
+    in_fd, out_fd = src.fileno(), out.fileno()
+    for syscall in ("copy_file_range", "sendfile"):
+        copy = getattr(os, syscall, None)
+        if copy is None:
+            continue
+        try:
+            if syscall == "sendfile":
+                while copy(out_fd, in_fd, None, COPY_CHUNK_SIZE):
+                    pass
+            else:
+                while copy(in_fd, out_fd, COPY_CHUNK_SIZE):
+                    pass
+            # Resync the buffered writer with the fd position moved by the kernel
+            out.seek(0, os.SEEK_END)
+            return
+        except OSError:
+            # Unsupported for this pair of files; nothing was written if it failed on the first call
+            if src.tell() != 0:
+                raise
+    shutil.copyfileobj(src, out, COPY_CHUNK_SIZE)
+
 
-    if name in include_exts or suffix in include_exts:
-        if name not in exclude_exts and suffix not in exclude_exts:
-            return True
-    return False
+def write_file_block(out, file_path, rel_path, validate_utf8=True):
+    # Header, content and separator are streamed; on failure the partial block is truncated away
+    start = out.tell()
+    try:
+        out.write(f"{rel_path}:\n".encode("utf-8"))
+        with open(file_path, "rb") as src:
+            if validate_utf8:
+                copy_validated(src, out)
+            else:
+                copy_raw(src, out)
+        out.write(b"\n\n")
+    except BaseException:
+        out.seek(start)
+        out.truncate()
+        raise
 
 
-def is_ignored(path: Path, ignore_patterns):
-    return any(part in ignore_patterns for part in path.parts)
+def cached_block_path(cache, file_path, rel_path, validate_utf8=True):
+    # Reuse the rendered block when the file is unchanged, otherwise render it into the cache first
+    block = cache.cached_block(file_path)
+    if block is None:
+        block = cache.store_block(
+            file_path, lambda f: write_file_block(f, file_path, rel_path, validate_utf8=validate_utf8)
+        )
+    return block
+
+
+def write_cached_block(out, cache, file_path, rel_path, validate_utf8=True):
+    with open(cached_block_path(cache, file_path, rel_path, validate_utf8=validate_utf8), "rb") as src:
+        copy_raw(src, out)
 
 
 def collect_file_contents(
@@ -52,25 +137,115 @@ def collect_file_contents(
     include_exts,
     exclude_exts,
     ignore_patterns,
+    use_git=False,
+    include_untracked=False,
+    validate_utf8=True,
+    max_bytes=None,
+    max_tokens=None,
+    count_tokens=None,
+    dedup=True,
+    sniff=True,
+    sniff_bytes=DEFAULT_SNIFF_BYTES,
+    max_line_length=DEFAULT_MAX_LINE_LENGTH,
+    max_entropy=DEFAULT_MAX_ENTROPY,
+    cache=None,
+    walk_threads=1,
 ):
-    with open(output_file, "w", encoding="utf-8") as out:
-        for file_path in root_path.rglob("*"):
-            if not file_path.is_file():
-                continue
+    # Include entries are matched against both the file name and its suffix
+    matcher = FileMatcher(names=include_exts, extensions=include_exts, exclude=exclude_exts, ignore=ignore_patterns)
+    if use_git:
+        # Bulk listing from the git index: ignored/untracked trees are never walked
+        listed = list_git_files(str(root_path), include_untracked=include_untracked)
+        files = [Path(p) for p in filter_paths(listed, str(root_path), matcher)]
+    else:
+        # Streaming walk: the sniff pass below starts while directories are still being scanned
+        files = (Path(entry.path) for entry in walk_files(str(root_path), matcher, threads=walk_threads))
 
-            if is_ignored(file_path, ignore_patterns):
-                continue
+    # Pre-pass: drop binary/minified files by sniffing their head, then find content duplicates
+    skipped = {}
+    with timed("scan"):
+        if sniff:
+            kept = []
+            for file_path in files:
+                try:
+                    sniff_func = partial(
+                        sniff_file, sniff_bytes=sniff_bytes, max_line_length=max_line_length, max_entropy=max_entropy
+                    )
+                    with timed("sniff_file"):
+                        reason = cache.sniff(file_path, sniff_func) if cache else sniff_func(str(file_path))
+                except OSError:
+                    reason = None  # reported when the file is read below
+                if reason:
+                    skipped.setdefault(reason, []).append(file_path)
+                    print(f"Skipped ({reason}): {file_path.relative_to(root_path)}")
+                else:
+                    kept.append(file_path)
+            files = kept
+        files = list(files)
+    with timed("dedup"):
+        hash_func = partial(cache.digest, hash_func=hash_file) if cache else hash_file
+        duplicates = find_duplicates((str(file_path) for file_path in files), hash_func) if dedup else {}
 
-            if should_include(file_path, include_exts, exclude_exts):
+    def reference(file_path):
+        first = Path(duplicates[str(file_path)]).relative_to(root_path)
+        skipped.setdefault("duplicate", []).append(file_path)
+        print(f"Duplicate: {file_path.relative_to(root_path)} -> {first}")
+        return f"(duplicate of {first})\n".encode("utf-8")
+
+    if max_bytes or max_tokens:
+        # Budgeted mode: numbered shards plus a JSON manifest next to output_file
+        writer = ShardWriter(
+            output_file,
+            max_bytes=max_bytes,
+            max_tokens=max_tokens,
+            count_tokens=count_tokens or estimate_tokens,
+            validate_utf8=validate_utf8,
+        )
+        for file_path in files:
+            try:
+                rel_path = file_path.relative_to(root_path)
+                if str(file_path) in duplicates:
+                    writer.add_text(str(rel_path), reference(file_path))
+                    continue
+                with timed("write_file"):
+                    if cache:
+                        block = cached_block_path(cache, file_path, rel_path, validate_utf8=validate_utf8)
+                        writer.add_block(block, file_path, str(rel_path))
+                    else:
+                        writer.add_file(file_path, str(rel_path))
+                print(f"Included: {rel_path}")
+            except Exception as e:
+                print(f"Error reading {file_path}: {e}")
+        writer.close()
+    else:
+        with open(output_file, "wb") as out:
+            for file_path in files:
                 try:
                     rel_path = file_path.relative_to(root_path)
-                    out.write(f"{rel_path}:\n")
-                    out.write(file_path.read_text(encoding="utf-8"))
-                    out.write("\n\n")
+                    if str(file_path) in duplicates:
+                        out.write(f"{rel_path}:\n".encode("utf-8") + reference(file_path) + b"\n\n")
+                        continue
+                    with timed("write_file"):
+                        if cache:
+                            write_cached_block(out, cache, file_path, rel_path, validate_utf8=validate_utf8)
+                        else:
+                            write_file_block(out, file_path, rel_path, validate_utf8=validate_utf8)
                     print(f"Included: {rel_path}")
                 except Exception as e:
                     print(f"Error reading {file_path}: {e}")
 
+    if skipped:
+        print("Skipped: " + ", ".join(f"{reason}={len(paths)}" for reason, paths in sorted(skipped.items())))
+    return skipped
+
+
+def tokenizer_arg(spec):
+    """argparse type for --tokenizer: load the counter up front so a bad spec is a usage error, not a traceback."""
+    try:
+        return load_token_counter(spec)
+    except (ValueError, ImportError, AttributeError) as e:
+        raise argparse.ArgumentTypeError(f"cannot load tokenizer {spec!r}: {e}")
+
 
 def main():
     parser = argparse.ArgumentParser(description="Generate a text file containing contents of project files.")
@@ -79,6 +254,45 @@ def main():
     parser.add_argument("-i", "--ignore", nargs="*", help="Additional ignore patterns")
     parser.add_argument("-e", "--include", help="Comma-separated extensions to include")
     parser.add_argument("-x", "--exclude", help="Comma-separated extensions to exclude")
+    parser.add_argument(
+        "--no-validate",
+        action="store_true",
+        help="Copy files as raw bytes (zero-copy where supported) without checking they are valid UTF-8",
+    )
+    parser.add_argument("--max-bytes", type=int, help="Split output into numbered shards of at most this many bytes")
+    parser.add_argument("--max-tokens", type=int, help="Split output into numbered shards of at most this many tokens")
+    parser.add_argument(
+        "--tokenizer",
+        type=tokenizer_arg,
+        help="Exact token counter for --max-tokens: 'tiktoken[:encoding]' or 'module:function' (default: estimate)",
+    )
+    parser.add_argument("--no-dedup", action="store_true", help="Write duplicate files in full instead of a reference")
+    parser.add_argument("--no-sniff", action="store_true", help="Do not skip binary/minified files")
+    parser.add_argument(
+        "--sniff-bytes", type=int, default=DEFAULT_SNIFF_BYTES, help="Bytes inspected per file (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--max-line-length",
+        type=int,
+        default=DEFAULT_MAX_LINE_LENGTH,
+        help="Longer lines in the sniffed head mark a file as minified; 0 disables (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-entropy",
+        type=float,
+        default=DEFAULT_MAX_ENTROPY,
+        help="Bits/byte above which the sniffed head counts as binary; 0 disables (default: %(default)s)",
+    )
+    parser.add_argument("--cache-dir", help="Incremental cache directory (default: per-root dir under ~/.cache)")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the incremental cache")
+    parser.add_argument("--rebuild-cache", action="store_true", help="Ignore cached entries and rebuild the cache")
+    parser.add_argument("--since", metavar="GIT_REV", help="Only re-check files changed since this git revision")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Threads used to walk the directory tree")
+    parser.add_argument("--git", action="store_true", help="List files from the git index instead of walking the tree")
+    parser.add_argument(
+        "--git-untracked", action="store_true", help="With --git, also include untracked files not in .gitignore"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print per-phase timings at the end")
 
     args = parser.parse_args()
 
@@ -101,13 +315,70 @@ def main():
 
     output_file.parent.mkdir(parents=True, exist_ok=True)
 
-    collect_file_contents(path, output_file, include_exts, exclude_exts, ignore_patterns)
+    try:
+        cache = None
+        if not args.no_cache:
+            with timed("load_cache"):
+                cache = PromptCache(
+                    Path(args.cache_dir).resolve() if args.cache_dir else default_cache_dir(path),
+                    path,
+                    settings={
+                        "sniff": None if args.no_sniff else [args.sniff_bytes, args.max_line_length, args.max_entropy],
+                        "validate_utf8": not args.no_validate,
+                    },
+                    changed=list_changed_files(str(path), args.since) if args.since else None,
+                    rebuild=args.rebuild_cache,
+                )
+
+        with timed("collect"):
+            collect_file_contents(
+                path,
+                output_file,
+                include_exts,
+                exclude_exts,
+                ignore_patterns,
+                use_git=args.git or args.git_untracked,
+                include_untracked=args.git_untracked,
+                validate_utf8=not args.no_validate,
+                max_bytes=args.max_bytes,
+                max_tokens=args.max_tokens,
+                count_tokens=args.tokenizer,
+                dedup=not args.no_dedup,
+                sniff=not args.no_sniff,
+                sniff_bytes=args.sniff_bytes,
+                max_line_length=args.max_line_length,
+                max_entropy=args.max_entropy,
+                cache=cache,
+                walk_threads=max(1, args.jobs),
+            )
 
-    print(f"\n✅ Written to: {output_file}")
+        if cache:
+            with timed("save_cache"):
+                cache.save()
+            print(f"Cache: {cache.hits} reused, {cache.misses} rendered ({cache.cache_dir})")
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.max_bytes or args.max_tokens:
+        # No file is written at output_file itself, only numbered shards listed in the manifest
+        manifest = manifest_path(output_file)
+        shards = json.loads(manifest.read_text(encoding="utf-8"))["shards"]
+        print(
+            f"\n✅ Written {len(shards)} shards to: {output_file.parent} "
+            f"({output_file.stem}.NNN{output_file.suffix}, manifest: {manifest.name})"
+        )
+    else:
+        print(f"\n✅ Written to: {output_file}")
     print(f"Ignored: {sorted(ignore_patterns)}")
     print(f"Included: {sorted(include_exts)}")
     print(f"Excluded: {sorted(exclude_exts)}")
 
+    if args.verbose:
+        print("\n⏱️  Timings:")
+        for line in timings.summary_lines():
+            print(f"   {line}")
+
 
 if __name__ == "__main__":
     main()
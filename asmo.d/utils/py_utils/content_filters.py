@@ -0,0 +1,124 @@
+# asmo.d/utils/py_utils/content_filters.py
+"""
+Pre-pass filters for collect_files_content.
+
+Key features:
+- Sniffs the first few KB of each file and rejects binary (NUL bytes, control bytes, high entropy)
+  and minified (very long lines) content before it is copied.
+- Finds duplicate files by content: files are grouped by size first, and only same-size files are hashed.
+- Hashing uses xxhash (xxh3_128) when installed, otherwise hashlib.blake2b; both are fast and collision-safe
+  enough for dedup.
+"""
+
+from collections import Counter
+import hashlib
+import math
+import os
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+try:
+    import xxhash
+except ImportError:  # optional dependency
+    xxhash = None
+
+DEFAULT_SNIFF_BYTES = 8 * 1024
+DEFAULT_MAX_LINE_LENGTH = 1000
+DEFAULT_MAX_ENTROPY = 6.5
+# Share of control bytes (other than tab/CR/LF/FF) above which a sample counts as binary
+MAX_CONTROL_RATIO = 0.1
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_CONTROL_BYTES = bytes(b for b in range(32) if b not in (9, 10, 12, 13)) + b"\x7f"
+
+
+def _new_hasher():
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+
+def hash_file(file_path: str) -> bytes:
+    """Return a 128-bit content digest, reading the file in chunks."""
+    hasher = _new_hasher()
+    with open(file_path, "rb") as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.digest()
+
+
+def shannon_entropy(data: bytes) -> float:
+    """Bits per byte of data (0.0 for empty input, 8.0 for uniformly random bytes)."""
+    if not data:
+        return 0.0
+    total = len(data)
+    return -sum(n / total * math.log2(n / total) for n in Counter(data).values())
+
+
+def sniff_file(
+    file_path: str,
+    *,
+    sniff_bytes: int = DEFAULT_SNIFF_BYTES,
+    max_line_length: int = DEFAULT_MAX_LINE_LENGTH,
+    max_entropy: float = DEFAULT_MAX_ENTROPY,
+) -> Optional[str]:
+    """
+    Inspect the head of a file and return a skip reason ('binary' or 'minified'), or None to keep it.
+    A limit <= 0 disables that check.
+    """
+    with open(file_path, "rb") as f:
+        sample = f.read(sniff_bytes)
+    if not sample:
+        return None
+
+    if b"\0" in sample:
+        return "binary"
+    control = len(sample) - len(sample.translate(None, _CONTROL_BYTES))
+    if control / len(sample) > MAX_CONTROL_RATIO:
+        return "binary"
+    if max_entropy > 0 and shannon_entropy(sample) > max_entropy:
+        return "binary"
+
+    if max_line_length > 0:
+        # A sample without any newline that is longer than the limit is one giant line
+        longest = max(len(line) for line in sample.split(b"\n"))
+        if longest > max_line_length:
+            return "minified"
+
+    return None
+
+
+def find_duplicates(file_paths: Iterable[str], hash_func: Callable[[str], bytes] = hash_file) -> Dict[str, str]:
+    """
+    Map each duplicate file to the first file (in input order) with identical content.
+    Only files that share their size with another file are hashed (with hash_func, e.g. a cached hash_file).
+    """
+    by_size: Dict[int, List[str]] = {}
+    for path in file_paths:
+        try:
+            by_size.setdefault(os.path.getsize(path), []).append(path)
+        except OSError:
+            continue
+
+    duplicates: Dict[str, str] = {}
+    for size, paths in by_size.items():
+        # Empty files cost nothing to include, so they are never reported as duplicates
+        if size == 0 or len(paths) < 2:
+            continue
+        first_by_digest: Dict[bytes, str] = {}
+        for path in paths:
+            try:
+                digest = hash_func(path)
+            except OSError:
+                continue
+            first = first_by_digest.setdefault(digest, path)
+            if first != path:
+                duplicates[path] = first
+    return duplicates
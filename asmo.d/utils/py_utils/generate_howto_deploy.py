@@ -1,13 +1,23 @@
 # asmo.d/utils/py_utils/generate_howto_deploy.py
 # version 2025-01-09
 import argparse
+import csv
+import hashlib
 import os
 from pathlib import Path
+import re
+import sys
+import tempfile
+import time
+from typing import Dict
+from typing import List
+from typing import Tuple
 
 from loguru import logger
 
 RUN_SAMPLE = """
 python generate_howto_deploy.py -w www.url.to.site -r https://github.com/path/to/repo [-o output_directory]
+python generate_howto_deploy.py -m sites.csv [-o output_directory] [--sites-dir output_directory/sites]
 """
 
 HOWTO_TEMPLATE = """
@@ -54,6 +64,15 @@
 systemctl restart nginx
 """
 
+# The nginx example lives in the repo's asmo.d/sites/; batch mode renders one config per site from it,
+# replacing its domain and port, into <output>/sites/ unless --sites-dir says otherwise. Operators then
+# copy them into asmo.d/sites/ on the server, where HOWTO_TEMPLATE expects them.
+NGINX_TEMPLATE_PATH = Path(__file__).resolve().parents[2] / "sites" / "pure_html.example"
+NGINX_DOMAIN = "server_name your-domain.com;"
+NGINX_PORT = "proxy_pass http://localhost:8080;"
+DEFAULT_PORT = 8080
+DOMAIN_RE = re.compile(r"^(?=.{1,253}$)([a-z0-9]([a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}$", re.IGNORECASE)
+
 
 def validate_repo_url(repo_url):
     if not repo_url.startswith(("https://gitlab.com/", "https://github.com/")):
@@ -71,6 +90,151 @@ def validate_output_dir(directory):
         raise argparse.ArgumentTypeError(f"Error creating directory {directory}: {str(e)}")
 
 
+def render_howto(www_domain, repo_url):
+    project_name = repo_url.strip("/").split("/")[-1]
+
+    if "gitlab" in repo_url:
+        git_url = repo_url.replace("https://gitlab.com/", "git@gitlab.com:") + ".git"
+    elif "github" in repo_url:
+        git_url = repo_url.replace("https://github.com/", "git@github.com:") + ".git"
+    else:
+        raise ValueError("unsupported repo_url")
+
+    return HOWTO_TEMPLATE.format(
+        www_domain=www_domain,
+        repo_url=repo_url,
+        project_name=project_name,
+        git_url=git_url,
+    )
+
+
+# ---------------------------
+# Batch mode
+# ---------------------------
+def load_manifest(path) -> List[Dict]:
+    """Sites from a .csv (header: www_domain,repo_url[,port]) or .yaml/.yml (list of mappings, or {sites: [...]})."""
+    suffix = Path(path).suffix.lower()
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if suffix == ".csv":
+            try:
+                return [row for row in csv.DictReader(f)]
+            except (csv.Error, UnicodeDecodeError) as e:
+                raise argparse.ArgumentTypeError(f"Cannot parse {path}: {e}")
+        if suffix in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise argparse.ArgumentTypeError("YAML manifests need PyYAML (pip install pyyaml)")
+            try:
+                data = yaml.safe_load(f) or []
+            except (yaml.YAMLError, UnicodeDecodeError) as e:
+                raise argparse.ArgumentTypeError(f"Cannot parse {path}: {e}")
+            if isinstance(data, dict):
+                data = data.get("sites") or []
+            if not isinstance(data, list):
+                raise argparse.ArgumentTypeError(f"{path}: expected a list of sites, got {type(data).__name__}")
+            return data
+    raise argparse.ArgumentTypeError(f"Unsupported manifest type {suffix!r}: use .csv, .yaml or .yml")
+
+
+def validate_sites(entries: List[Dict]) -> Tuple[List[Dict], List[str]]:
+    """Check every entry before anything is written; returns (sites, errors)."""
+    sites = []
+    errors = []
+    seen = {}
+    for number, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict):
+            errors.append(f"site {number}: expected a mapping, got {entry!r}")
+            continue
+        www_domain = str(entry.get("www_domain") or "").strip()
+        repo_url = str(entry.get("repo_url") or "").strip()
+        port = entry.get("port")
+        if port is None or port == "":
+            port = DEFAULT_PORT
+        problems = []
+        if not DOMAIN_RE.match(www_domain):
+            problems.append(f"invalid www_domain {www_domain!r}")
+        elif www_domain in seen:
+            problems.append(f"duplicate www_domain {www_domain!r} (also site {seen[www_domain]})")
+        try:
+            validate_repo_url(repo_url)
+        except argparse.ArgumentTypeError as e:
+            problems.append(f"{e} (got {repo_url!r})")
+        # Only integers or digit strings: int() would silently truncate a YAML float like 8.5
+        is_int = isinstance(port, int) and not isinstance(port, bool)
+        if (is_int or (isinstance(port, str) and port.strip().isdigit())) and 0 < int(port) < 65536:
+            port = int(port)
+        else:
+            problems.append(f"invalid port {port!r}")
+        if problems:
+            errors.append(f"site {number}: " + "; ".join(problems))
+            continue
+        seen[www_domain] = number
+        sites.append({"www_domain": www_domain, "repo_url": repo_url, "port": port})
+    return sites, errors
+
+
+def render_nginx(template, www_domain, port):
+    return template.replace(NGINX_DOMAIN, f"server_name {www_domain};").replace(
+        NGINX_PORT, f"proxy_pass http://localhost:{port};"
+    )
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """Write content atomically unless the file already has the same sha256; returns True if written."""
+    data = content.encode("utf-8")
+    try:
+        if hashlib.sha256(path.read_bytes()).digest() == hashlib.sha256(data).digest():
+            return False
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return True
+
+
+def render_sites(sites: List[Dict], output_dir, sites_dir, nginx_template) -> Dict[str, int]:
+    """<output_dir>/<www_domain>/howto.deploy.txt and <sites_dir>/<www_domain> for every site."""
+    stats = {"written": 0, "unchanged": 0}
+    for site in sites:
+        www_domain = site["www_domain"]
+        outputs = [(Path(output_dir) / www_domain / "howto.deploy.txt", render_howto(www_domain, site["repo_url"]))]
+        if nginx_template is not None:
+            outputs.append((Path(sites_dir) / www_domain, render_nginx(nginx_template, www_domain, site["port"])))
+        for path, content in outputs:
+            stats["written" if write_if_changed(path, content) else "unchanged"] += 1
+    return stats
+
+
+def run_batch(manifest, output_dir, sites_dir, nginx_template_path):
+    start = time.perf_counter()
+    sites, errors = validate_sites(load_manifest(manifest))
+    if errors:
+        for error in errors:
+            logger.error(error)
+        logger.error(f"{len(errors)} invalid sites in {manifest}, nothing written")
+        sys.exit(1)
+
+    nginx_template = None
+    if nginx_template_path:
+        nginx_template = Path(nginx_template_path).read_text(encoding="utf-8")
+        if NGINX_DOMAIN not in nginx_template or NGINX_PORT not in nginx_template:
+            logger.warning(f"{nginx_template_path} lacks '{NGINX_DOMAIN}' or '{NGINX_PORT}'; copied as is")
+
+    stats = render_sites(sites, output_dir, sites_dir, nginx_template)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.success(
+        f"{len(sites)} sites: {stats['written']} files written, {stats['unchanged']} unchanged ({elapsed_ms:.0f}ms)"
+    )
+
+
 def parse_args():
     parser = argparse.ArgumentParser(description="Process a domain and a Git URL.")
 
@@ -83,34 +247,40 @@ def parse_args():
         default=".",
         help="Output directory (default: current directory)",
     )
+    parser.add_argument("-m", "--manifest", help="Batch mode: CSV/YAML of sites (www_domain, repo_url, optional port)")
+    parser.add_argument(
+        "--sites-dir",
+        help="Batch mode: where nginx site configs go (default: <output>/sites)",
+    )
+    parser.add_argument(
+        "--nginx-template",
+        default=str(NGINX_TEMPLATE_PATH),
+        help="Batch mode: nginx config template; empty string skips configs (default: asmo.d/sites/pure_html.example)",
+    )
 
-    args = parser.parse_args()
-    return args.www_domain, args.repo_url, args.output
+    return parser.parse_args()
 
 
 def main():
-    www_domain, repo_url, output_dir = parse_args()
+    args = parse_args()
+    www_domain, repo_url, output_dir = args.www_domain, args.repo_url, args.output
+
+    if args.manifest:
+        try:
+            sites_dir = args.sites_dir or os.path.join(output_dir, "sites")
+            run_batch(args.manifest, output_dir, sites_dir, args.nginx_template)
+        except (OSError, argparse.ArgumentTypeError) as e:
+            logger.error(str(e))
+            sys.exit(1)
+        return
+
     logger.info(f"{(www_domain, repo_url, output_dir)=}")
 
     if not repo_url:
         print(RUN_SAMPLE)
         return
 
-    project_name = repo_url.strip("/").split("/")[-1]
-
-    if "gitlab" in repo_url:
-        git_url = repo_url.replace("https://gitlab.com/", "git@gitlab.com:") + ".git"
-    elif "github" in repo_url:
-        git_url = repo_url.replace("https://github.com/", "git@github.com:") + ".git"
-    else:
-        raise ValueError("unsupported repo_url")
-
-    template = HOWTO_TEMPLATE.format(
-        www_domain=www_domain,
-        repo_url=repo_url,
-        project_name=project_name,
-        git_url=git_url,
-    )
+    template = render_howto(www_domain, repo_url)
 
     output_file = os.path.join(output_dir, "howto.deploy.txt")
     with open(output_file, "w") as f:
@@ -1,6 +1,207 @@
 # asmo.d/utils/py_utils/generate_password.py
-# from uuid import uuid4; print("\n".join(f"{str(uuid4())}-{str(uuid4()).upper()}" for _ in range(20)))
+"""
+Generate random secrets in bulk.
 
-from uuid import uuid4
+Key features:
+- Formats: uuid-pair (default, "<uuid4>-<UUID4>"), uuid, hex, base32, base64 (URL-safe) and a custom --alphabet.
+- Randomness comes from os.urandom in large buffers (one call per batch, not per secret).
+- Encoding is done per batch with C-level primitives: bytes.hex, base64.urlsafe_b64encode, and bytes.translate
+  for base32 and alphabets (rejection sampling via translate's delete set, so there is no modulo bias).
+- UUIDs are built from the same buffers: version/variant bits are set with strided translate, not uuid4() per line.
+- Output is streamed batch by batch to stdout or a file, so millions of secrets use constant memory.
+"""
 
-print("\n".join(f"{str(uuid4())}-{str(uuid4()).upper()}" for _ in range(20)))
+import argparse
+import base64
+import os
+import string
+import sys
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import TextIO
+
+DEFAULT_COUNT = 20
+DEFAULT_LENGTH = 32
+DEFAULT_BATCH = 65536
+
+UUID_BYTES = 16
+# Byte 6 carries the version nibble (4), byte 8 the RFC 4122 variant bits (10xx)
+UUID_VERSION_TABLE = bytes((b & 0x0F) | 0x40 for b in range(256))
+UUID_VARIANT_TABLE = bytes((b & 0x3F) | 0x80 for b in range(256))
+
+
+# ---------------------------
+# Encoders: (count, length) -> list of secrets
+# ---------------------------
+def random_uuids(count: int, upper: bool = False) -> List[str]:
+    data = bytearray(os.urandom(count * UUID_BYTES))
+    data[6::UUID_BYTES] = data[6::UUID_BYTES].translate(UUID_VERSION_TABLE)
+    data[8::UUID_BYTES] = data[8::UUID_BYTES].translate(UUID_VARIANT_TABLE)
+    h = data.hex().upper() if upper else data.hex()
+    return [
+        f"{h[i : i + 8]}-{h[i + 8 : i + 12]}-{h[i + 12 : i + 16]}-{h[i + 16 : i + 20]}-{h[i + 20 : i + 32]}"
+        for i in range(0, len(h), 2 * UUID_BYTES)
+    ]
+
+
+def split_chars(chars: str, count: int, length: int) -> List[str]:
+    return [chars[i : i + length] for i in range(0, count * length, length)]
+
+
+def gen_uuid(count: int, length: int) -> List[str]:
+    return random_uuids(count)
+
+
+def gen_uuid_pair(count: int, length: int) -> List[str]:
+    return [f"{low}-{high}" for low, high in zip(random_uuids(count), random_uuids(count, upper=True))]
+
+
+def gen_hex(count: int, length: int) -> List[str]:
+    # 2 chars per byte
+    return split_chars(os.urandom((count * length + 1) // 2).hex(), count, length)
+
+
+def gen_base64(count: int, length: int) -> List[str]:
+    # 4 chars per 3 bytes; whole 3-byte groups, so there is no padding
+    groups = -(-count * length // 4)
+    return split_chars(base64.urlsafe_b64encode(os.urandom(groups * 3)).decode("ascii"), count, length)
+
+
+def alphabet_encoder(alphabet: str) -> Callable[[int, int], List[str]]:
+    """
+    Encoder for an ASCII alphabet of 2..256 distinct characters. Each random byte maps to
+    alphabet[byte % size]; bytes in the incomplete top range are deleted first (rejection sampling).
+    """
+    if len(set(alphabet)) != len(alphabet) or not 2 <= len(alphabet) <= 256 or not alphabet.isascii():
+        raise ValueError("Alphabet must be 2-256 distinct ASCII characters")
+    size = len(alphabet)
+    limit = 256 - 256 % size
+    table = bytes(ord(alphabet[b % size]) for b in range(256))
+    rejected = bytes(range(limit, 256))
+    accept_ratio = limit / 256
+
+    def encode(count: int, length: int) -> List[str]:
+        needed = count * length
+        chunks = []
+        have = 0
+        while have < needed:
+            # Ask for a little more than the expected need so one round usually suffices
+            chunk = os.urandom(int((needed - have) / accept_ratio * 1.05) + 16).translate(table, rejected)
+            chunks.append(chunk)
+            have += len(chunk)
+        return split_chars(b"".join(chunks)[:needed].decode("ascii"), count, length)
+
+    return encode
+
+
+FORMATS: Dict[str, Callable[[int, int], List[str]]] = {
+    "uuid-pair": gen_uuid_pair,
+    "uuid": gen_uuid,
+    "hex": gen_hex,
+    # RFC 4648 alphabet; 32 divides 256, so one byte per char with no rejections (b32encode is slower)
+    "base32": alphabet_encoder(string.ascii_uppercase + "234567"),
+    "base64": gen_base64,
+}
+
+ALPHABETS = {
+    "alnum": string.ascii_letters + string.digits,
+    "lower": string.ascii_lowercase + string.digits,
+    "safe": "abcdefghjkmnpqrstuvwxyzABCDEFGHJKMNPQRSTUVWXYZ23456789",  # no 0/O, 1/l/I
+}
+
+
+# ---------------------------
+# Generation
+# ---------------------------
+def generate_batches(
+    encoder: Callable[[int, int], List[str]], count: int, length: int, batch: int = DEFAULT_BATCH
+) -> Iterator[List[str]]:
+    remaining = count
+    while remaining > 0:
+        n = min(batch, remaining)
+        yield encoder(n, length)
+        remaining -= n
+
+
+def write_secrets(out: TextIO, encoder, count: int, length: int, batch: int = DEFAULT_BATCH) -> int:
+    """Stream count secrets to out, one per line; returns the number written."""
+    written = 0
+    for secrets_batch in generate_batches(encoder, count, length, batch):
+        out.write("\n".join(secrets_batch))
+        out.write("\n")
+        written += len(secrets_batch)
+    return written
+
+
+def get_encoder(fmt: str, alphabet: str = None) -> Callable[[int, int], List[str]]:
+    if alphabet:
+        return alphabet_encoder(ALPHABETS.get(alphabet, alphabet))
+    return FORMATS[fmt]
+
+
+# ---------------------------
+# CLI
+# ---------------------------
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate random secrets in bulk",
+        epilog=f"""Examples:
+  # 20 uuid pairs (the classic output)
+  %(prog)s
+
+  # One million 40-char URL-safe secrets into a file
+  %(prog)s -n 1000000 -f base64 -l 40 -o secrets.txt
+
+  # 16-char passwords without look-alike characters
+  %(prog)s -n 50 -a safe -l 16
+
+Named alphabets: {", ".join(sorted(ALPHABETS))}; any other --alphabet value is used as the character set.
+        """,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "-n", "--count", type=int, default=DEFAULT_COUNT, help="Number of secrets (default: %(default)s)"
+    )
+    parser.add_argument(
+        "-f", "--format", choices=list(FORMATS), default="uuid-pair", help="Secret format (default: %(default)s)"
+    )
+    parser.add_argument(
+        "-l",
+        "--length",
+        type=int,
+        default=DEFAULT_LENGTH,
+        help="Characters per secret for hex/base32/base64/alphabet (default: %(default)s)",
+    )
+    parser.add_argument("-a", "--alphabet", help="Named alphabet or explicit characters; overrides --format")
+    parser.add_argument("-o", "--output", help="Write to this file instead of stdout (created with mode 0600)")
+    parser.add_argument(
+        "--batch", type=int, default=DEFAULT_BATCH, help="Secrets generated per buffer (default: %(default)s)"
+    )
+
+    args = parser.parse_args()
+    if args.count < 0 or args.length < 1 or args.batch < 1:
+        parser.error("--count must be >= 0, --length and --batch >= 1")
+
+    try:
+        encoder = get_encoder(args.format, args.alphabet)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.output:
+        fd = os.open(args.output, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, "w", encoding="ascii", buffering=1024 * 1024) as out:
+            written = write_secrets(out, encoder, args.count, args.length, args.batch)
+        print(f"✅ {written} secrets written to {args.output}", file=sys.stderr)
+    else:
+        try:
+            write_secrets(sys.stdout, encoder, args.count, args.length, args.batch)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # e.g. piped into head; silence the second error when Python flushes stdout at exit
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# asmo.d/utils/py_utils/git_files.py
+"""
+File discovery from the git index instead of walking the directory tree.
+
+One `git ls-files -z` call returns every tracked path under a directory, so giant
+untracked or ignored trees (data dirs, build output, virtualenvs) are never visited.
+Optionally untracked files that are not excluded by .gitignore are listed as well.
+list_changed_files answers "what changed since <rev>" for incremental reruns.
+"""
+
+import os
+import subprocess
+from typing import List
+from typing import Set
+
+
+def _run_git(directory_abs: str, args: List[str]) -> bytes:
+    try:
+        result = subprocess.run(["git", "-C", directory_abs] + args, capture_output=True, check=False)
+    except OSError as e:
+        raise RuntimeError(f"Cannot run git: {e}") from e
+    if result.returncode != 0:
+        message = result.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"git {args[0]} failed in '{directory_abs}': {message}")
+    return result.stdout
+
+
+def list_git_files(directory: str, *, include_untracked: bool = False) -> List[str]:
+    """
+    Return absolute paths of files known to git under directory.
+    - Tracked files come from the index; entries deleted from the working tree are dropped.
+    - include_untracked adds new files not matched by .gitignore/.git/info/exclude.
+    - Raises RuntimeError if git is missing or directory is not inside a work tree.
+    """
+    directory_abs = os.path.abspath(directory)
+    args = ["ls-files", "-z", "--cached"]
+    if include_untracked:
+        args += ["--others", "--exclude-standard"]
+    output = _run_git(directory_abs, args)
+
+    files: List[str] = []
+    seen = set()
+    for raw in output.split(b"\0"):
+        if not raw or raw in seen:
+            continue
+        seen.add(raw)
+        path = os.path.join(directory_abs, os.fsdecode(raw))
+        # Skip index entries removed from disk and submodule gitlinks (directories)
+        if os.path.isfile(path):
+            files.append(path)
+    return files
+
+
+def list_changed_files(directory: str, rev: str) -> Set[str]:
+    """
+    Return absolute paths under directory that may differ from rev: committed, staged and
+    unstaged changes since rev, plus untracked files not excluded by .gitignore.
+    Deleted paths are included too; callers only look up paths they discovered on disk.
+    """
+    directory_abs = os.path.abspath(directory)
+    changed = _run_git(directory_abs, ["diff", "--name-only", "-z", "--relative", rev, "--"])
+    untracked = _run_git(directory_abs, ["ls-files", "-z", "--others", "--exclude-standard"])
+    return {os.path.join(directory_abs, os.fsdecode(raw)) for raw in (changed + b"\0" + untracked).split(b"\0") if raw}
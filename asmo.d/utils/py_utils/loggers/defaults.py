@@ -0,0 +1,16 @@
+# asmo.d/utils/py_utils/loggers/defaults.py
+# Defaults shared by LoggingSettings and the sink modules; no imports, so loading settings stays cheap
+
+# queueing
+DEFAULT_QUEUE_SIZE = 10000
+
+# json_sink
+DEFAULT_MAX_MB = 10
+DEFAULT_ROTATE_HOURS = 24
+DEFAULT_RETENTION_DAYS = 7
+
+# rate_limit
+DEFAULT_RATE = 10.0
+DEFAULT_BURST = 20
+DEFAULT_SAMPLE_RATE = 1.0
+DEFAULT_SUMMARY_SECONDS = 60.0
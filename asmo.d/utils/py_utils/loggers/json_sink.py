@@ -0,0 +1,231 @@
+# asmo.d/utils/py_utils/loggers/json_sink.py
+"""
+Structured JSON-lines log file shared by logging_logger and loguru_logger.
+
+Key features:
+- One JSON object per line (timestamp, level, message, name, line, extra, exception).
+- Serialized with orjson when installed, otherwise with a json.JSONEncoder built once at import.
+- Rotation by size and by age; rotated files are gzip-compressed on a background thread and
+  removed after the retention period.
+- The log directory is checked for writability up front, with a fallback under the temp directory;
+  if neither is writable the sink is disabled with a warning instead of failing the application.
+"""
+
+from datetime import datetime
+from datetime import timezone
+import glob
+import gzip
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from .defaults import DEFAULT_MAX_MB
+from .defaults import DEFAULT_RETENTION_DAYS
+from .defaults import DEFAULT_ROTATE_HOURS
+
+try:
+    import orjson
+
+    def dumps(obj: Dict) -> bytes:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_APPEND_NEWLINE)
+
+except ImportError:
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str)
+
+    def dumps(obj: Dict) -> bytes:
+        return (_encoder.encode(obj) + "\n").encode("utf-8")
+
+
+DEFAULT_FILE_NAME = "app.json"
+ROTATED_SUFFIX_FORMAT = "%Y%m%d-%H%M%S"
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+def writable_log_dir(log_dir: str) -> Optional[str]:
+    """log_dir if it can be created and written, else a fallback under the temp directory, else None."""
+    fallback = os.path.join(tempfile.gettempdir(), f"logs-{os.getuid()}" if hasattr(os, "getuid") else "logs")
+    for candidate in (log_dir, fallback):
+        try:
+            os.makedirs(candidate, exist_ok=True)
+            with tempfile.TemporaryFile(dir=candidate):
+                pass
+        except OSError:
+            continue
+        if candidate != log_dir:
+            print(f"Warning: log directory {log_dir} is not writable, using {candidate}", file=sys.stderr)
+        return candidate
+    print(f"Warning: log directory {log_dir} is not writable, JSON log disabled", file=sys.stderr)
+    return None
+
+
+class RotatingFile:
+    """
+    Append-only binary file rotated when it exceeds max_bytes or is older than max_age seconds,
+    its age counted from the timestamp of its first record.
+    Rotated files get a timestamp suffix and are compressed in the background.
+    """
+
+    def __init__(self, path: str, max_bytes: int, max_age: float, retention: float):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._compress_lock = threading.Lock()
+        self._compressors: List[threading.Thread] = []
+        self._open()
+
+    def _open(self) -> None:
+        self._file = open(self.path, "ab", buffering=0)
+        stat = os.fstat(self._file.fileno())
+        self._size = stat.st_size
+        # An existing file keeps its age across restarts: it was created when its first record was written
+        # (its mtime moves with every append, so it would never age out)
+        self._opened_at = (self._first_record_time() if stat.st_size else None) or time.time()
+
+    def _first_record_time(self) -> Optional[float]:
+        try:
+            with open(self.path, "rb") as f:
+                return datetime.fromisoformat(json.loads(f.readline())["timestamp"]).timestamp()
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+    def write(self, data: bytes) -> None:
+        with self._lock:
+            if self._size and (self._size + len(data) > self.max_bytes or time.time() - self._opened_at > self.max_age):
+                self._rotate()
+            self._file.write(data)
+            self._size += len(data)
+
+    def _rotate(self) -> None:
+        self._file.close()
+        rotated = f"{self.path}.{datetime.now().strftime(ROTATED_SUFFIX_FORMAT)}"
+        suffix = 1
+        while os.path.exists(rotated) or os.path.exists(rotated + ".gz"):
+            rotated = f"{self.path}.{datetime.now().strftime(ROTATED_SUFFIX_FORMAT)}.{suffix}"
+            suffix += 1
+        os.replace(self.path, rotated)
+        self._open()
+        # A plain thread rather than an executor: rotations can happen while a queue drains at exit,
+        # when executors refuse new work. close() joins whatever is still running.
+        self._compressors = [t for t in self._compressors if t.is_alive()]
+        thread = threading.Thread(target=self._compress_and_prune, args=(rotated,), name="log-compress")
+        try:
+            thread.start()
+        except RuntimeError:  # interpreter shutting down
+            self._compress_and_prune(rotated)
+        else:
+            self._compressors.append(thread)
+
+    def _compress_and_prune(self, rotated: str) -> None:
+        with self._compress_lock:
+            self._compress(rotated)
+
+    def _compress(self, rotated: str) -> None:
+        try:
+            with open(rotated, "rb") as src, gzip.open(rotated + ".gz.tmp", "wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.replace(rotated + ".gz.tmp", rotated + ".gz")
+            os.remove(rotated)
+            cutoff = time.time() - self.retention
+            for old in glob.glob(glob.escape(self.path) + ".*.gz"):
+                if os.path.getmtime(old) < cutoff:
+                    os.remove(old)
+        except OSError as e:
+            print(f"Warning: could not compress {rotated}: {e}", file=sys.stderr)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+            compressors = list(self._compressors)
+        for thread in compressors:
+            thread.join()
+
+
+def open_log_file(
+    log_dir: str,
+    file_name: str = DEFAULT_FILE_NAME,
+    max_mb: float = DEFAULT_MAX_MB,
+    rotate_hours: float = DEFAULT_ROTATE_HOURS,
+    retention_days: float = DEFAULT_RETENTION_DAYS,
+) -> Optional[RotatingFile]:
+    """RotatingFile in a writable log directory, or None if there is none."""
+    directory = writable_log_dir(log_dir)
+    if directory is None:
+        return None
+    return RotatingFile(
+        os.path.join(directory, file_name), int(max_mb * 1024 * 1024), rotate_hours * 3600, retention_days * 86400
+    )
+
+
+# ---------------------------
+# stdlib logging
+# ---------------------------
+class JsonFileHandler(logging.Handler):
+    def __init__(self, log_file: RotatingFile, level=logging.NOTSET):
+        super().__init__(level)
+        self.log_file = log_file
+
+    def to_dict(self, record: logging.LogRecord) -> Dict:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "name": record.name,
+            "line": record.lineno,
+            "extra": {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS},
+        }
+        if record.exc_info:
+            entry["exception"] = "".join(traceback.format_exception(*record.exc_info))
+        return entry
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.log_file.write(dumps(self.to_dict(record)))
+        except Exception:
+            self.handleError(record)
+
+    def close(self) -> None:
+        self.log_file.close()
+        super().close()
+
+
+# ---------------------------
+# loguru
+# ---------------------------
+class JsonLoguruSink:
+    """File-like loguru sink; add it with format="{message}", the JSON is built from message.record."""
+
+    def __init__(self, log_file: RotatingFile):
+        self.log_file = log_file
+
+    def write(self, message) -> None:
+        record = message.record
+        entry = {
+            "timestamp": record["time"].isoformat(),
+            "level": record["level"].name,
+            "message": record["message"],
+            "name": record["name"],
+            "line": record["line"],
+            "extra": record["extra"],
+        }
+        if record["exception"] is not None:
+            entry["exception"] = "".join(traceback.format_exception(*record["exception"]))
+        self.log_file.write(dumps(entry))
+
+    def flush(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        self.log_file.close()
@@ -1,18 +1,82 @@
 # asmo.d/utils/py_utils/loggers/logging_logger.py
+"""
+Settings, handlers and filters are set up on the first get_logger call and shared afterwards,
+so importing this module stays cheap (no pydantic, no sink modules).
+"""
+
 import logging
 import sys
+import threading
+from typing import List
+from typing import Optional
+
+# Shared by every logger, so there is one JSON file and (in queue mode) one listener thread
+_settings = None
+_handlers: Optional[List[logging.Handler]] = None
+_rate_limit_filter: Optional[logging.Filter] = None
+_setup_lock = threading.Lock()
+
+
+def create_handlers(logging_settings) -> List[logging.Handler]:
+    """Console handler, JSON file handler if LOGGING_JSON_LOG is set, both behind a queue if LOGGING_QUEUE is set"""
+    # Create a formatter
+    formatter = logging.Formatter("%(asctime)s | %(name)s | %(levelname)s | %(message)s")
+
+    # Create a console handler
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    handlers = [console_handler]
+
+    if logging_settings.json_log:
+        from .json_sink import JsonFileHandler
+        from .json_sink import open_log_file
+
+        log_file = open_log_file(
+            logging_settings.json_log_dir,
+            max_mb=logging_settings.json_log_max_mb,
+            rotate_hours=logging_settings.json_log_rotate_hours,
+            retention_days=logging_settings.json_log_retention_days,
+        )
+        if log_file is not None:
+            handlers.append(JsonFileHandler(log_file, level=logging_settings.json_log_level))
 
-from pydantic_settings import BaseSettings
+    if logging_settings.queue:
+        from .queueing import queue_handler
 
+        handlers = [queue_handler(handlers, logging_settings.queue_size, logging_settings.queue_policy)]
 
-class LoggingSettings(BaseSettings):
-    level: str = "WARNING"
+    return handlers
 
-    class Config:
-        env_prefix = "LOGGING_"
 
+def create_rate_limit_filter(logging_settings) -> Optional[logging.Filter]:
+    if not logging_settings.rate_limit:
+        return None
 
-logging_settings = LoggingSettings()
+    from .rate_limit import RateLimiter
+    from .rate_limit import RateLimitFilter
+
+    return RateLimitFilter(
+        RateLimiter(
+            rate=logging_settings.rate_limit_rate,
+            burst=logging_settings.rate_limit_burst,
+            sample_rate=logging_settings.sample_rate,
+            summary_seconds=logging_settings.rate_limit_summary_seconds,
+        )
+    )
+
+
+def setup():
+    """Load settings and build the shared handlers and filter, once."""
+    global _settings, _handlers, _rate_limit_filter
+    with _setup_lock:
+        if _settings is None:
+            from .settings import get_settings
+
+            logging_settings = get_settings()
+            _rate_limit_filter = create_rate_limit_filter(logging_settings)
+            _handlers = create_handlers(logging_settings)
+            _settings = logging_settings
+    return _settings, _handlers, _rate_limit_filter
 
 
 def get_logger(name: str = __name__, level: str = None) -> logging.Logger:
@@ -20,16 +84,15 @@ def get_logger(name: str = __name__, level: str = None) -> logging.Logger:
     logger = logging.getLogger(name)
 
     if not logger.handlers:
+        logging_settings, handlers, rate_limit_filter = setup()
+
         # Set log level, using local level if provided, otherwise global
         logger_level = level or getattr(logging, logging_settings.level)
         logger.setLevel(logger_level)
-
-        # Create a formatter
-        formatter = logging.Formatter("%(asctime)s | %(name)s | %(levelname)s | %(message)s")
-
-        # Create a console handler
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        for handler in handlers:
+            logger.addHandler(handler)
+        # On the logger rather than the handlers, so suppressed records never reach a formatter
+        if rate_limit_filter is not None:
+            logger.addFilter(rate_limit_filter)
 
     return logger
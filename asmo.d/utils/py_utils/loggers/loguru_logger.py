@@ -1,21 +1,15 @@
 # asmo.d/utils/py_utils/loggers/loguru_logger.py
-import sys
-
-from loguru import logger
-from pydantic_settings import BaseSettings
-
-
-class LoggingSettings(BaseSettings):
-    level: str = "WARNING"
-
-    class Config:
-        env_prefix = "LOGGING_"
+"""
+loguru and the settings are imported, and the sinks added, on the first get_logger call,
+so importing this module stays cheap (no loguru, no pydantic).
+"""
 
+import sys
+import threading
+from typing import TYPE_CHECKING
 
-logging_settings = LoggingSettings()
-
-# Remove default logger
-logger.remove()
+if TYPE_CHECKING:
+    from loguru import Logger
 
 # Log format for console and files
 log_format = (
@@ -26,51 +20,83 @@ class Config:
     "{extra}"
 )
 
-# Add colorized output to console
-logger.add(
-    sys.stdout,
-    format=log_format,
-    level=logging_settings.level,
-    colorize=True,
-    backtrace=True,
-    diagnose=True,
-)
+_logger = None
+_setup_lock = threading.Lock()
+
+
+def configure(logger, logging_settings) -> None:
+    """Replace loguru's default sink with ours, according to LoggingSettings."""
+    from .queueing import QueueWriter
+
+    # Remove default logger
+    logger.remove()
+
+    # One limiter shared by all sinks, so each record is counted once
+    rate_limit_filter = None
+    if logging_settings.rate_limit:
+        from .rate_limit import LoguruRateLimitFilter
+        from .rate_limit import RateLimiter
+
+        rate_limit_filter = LoguruRateLimitFilter(
+            RateLimiter(
+                rate=logging_settings.rate_limit_rate,
+                burst=logging_settings.rate_limit_burst,
+                sample_rate=logging_settings.sample_rate,
+                summary_seconds=logging_settings.rate_limit_summary_seconds,
+            ),
+            logger,
+        )
+
+    # Add colorized output to console
+    console_sink = (
+        QueueWriter(sys.stdout, logging_settings.queue_size, logging_settings.queue_policy)
+        if logging_settings.queue
+        else sys.stdout
+    )
+    logger.add(
+        console_sink,
+        format=log_format,
+        level=logging_settings.level,
+        filter=rate_limit_filter,
+        colorize=True,
+        backtrace=True,
+        diagnose=True,
+    )
+
+    # Add JSON formatted logs to file with rotation; skipped with a warning if no log directory is writable
+    if logging_settings.json_log:
+        from .json_sink import JsonLoguruSink
+        from .json_sink import open_log_file
+
+        log_file = open_log_file(
+            logging_settings.json_log_dir,
+            max_mb=logging_settings.json_log_max_mb,
+            rotate_hours=logging_settings.json_log_rotate_hours,
+            retention_days=logging_settings.json_log_retention_days,
+        )
+        if log_file is not None:
+            json_sink = JsonLoguruSink(log_file)
+            logger.add(
+                QueueWriter(json_sink, logging_settings.queue_size, logging_settings.queue_policy)
+                if logging_settings.queue
+                else json_sink,
+                # The JSON line is built from message.record, so skip formatting the text message
+                format="{message}",
+                level=logging_settings.json_log_level,
+                filter=rate_limit_filter,
+                colorize=False,
+            )
+
+
+def get_logger(name: str) -> "Logger":
+    global _logger
+    if _logger is None:
+        with _setup_lock:
+            if _logger is None:
+                from loguru import logger
+
+                from .settings import get_settings
 
-# commented due to missing permissions to create a dir and write log to files
-# Create logs directory if it doesn't exist
-# LOG_DIR = Path("logs")
-# LOG_DIR.mkdir(exist_ok=True)
-#
-# # Add JSON formatted logs to file with rotation
-# logger.add(
-#     LOG_DIR / "app.json",
-#     format=lambda record: json.dumps(
-#         {
-#             "timestamp": record["time"].isoformat(),
-#             "level": record["level"].name,
-#             "message": record["message"],
-#             "name": record["name"],
-#             "line": record["line"],
-#             "extra": record["extra"],
-#         }
-#     ),
-#     level="INFO",
-#     rotation="10 MB",
-#     retention="1 week",
-#     compression="zip",
-# )
-#
-# # Add error logs to separate file
-# logger.add(
-#     LOG_DIR / "error.log",
-#     format=log_format,
-#     level="ERROR",
-#     rotation="10 MB",
-#     retention="1 week",
-#     backtrace=True,
-#     diagnose=True,
-# )
-
-
-def get_logger(name: str) -> logger:
-    return logger.bind(name=name)
+                configure(logger, get_settings())
+                _logger = logger
+    return _logger.bind(name=name)
@@ -0,0 +1,140 @@
+# asmo.d/utils/py_utils/loggers/queueing.py
+"""
+Bounded, non-blocking log delivery shared by logging_logger and loguru_logger.
+
+Key features:
+- BoundedQueueHandler / BoundedQueueListener: stdlib QueueHandler/QueueListener over a bounded queue;
+  formatting and the stream write happen on the listener thread, not in the caller.
+- QueueWriter: file-like loguru sink that hands formatted messages to a background writer thread.
+- Policy when the queue is full: "drop" (count and discard, never blocks the caller) or "block" (wait for room).
+- Everything queued is flushed at interpreter exit (or on stop()), then a wrapped sink's stop() is called;
+  dropped records are reported on stderr.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from typing import List
+from typing import TextIO
+
+from .defaults import DEFAULT_QUEUE_SIZE
+
+POLICIES = ("drop", "block")
+
+
+def check_policy(policy: str) -> str:
+    if policy not in POLICIES:
+        raise ValueError(f"Invalid queue policy {policy!r}, expected one of {POLICIES}")
+    return policy
+
+
+def put_record(q: queue.Queue, item, policy: str) -> bool:
+    """Enqueue item according to policy; returns False if it was dropped."""
+    if policy == "block":
+        q.put(item)
+        return True
+    try:
+        q.put_nowait(item)
+        return True
+    except queue.Full:
+        return False
+
+
+def report_dropped(source: str, dropped: int) -> None:
+    if dropped:
+        print(f"{source}: dropped {dropped} log records (queue full)", file=sys.stderr)
+
+
+# ---------------------------
+# stdlib logging
+# ---------------------------
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, q: queue.Queue, policy: str = "drop"):
+        super().__init__(q)
+        self.policy = check_policy(policy)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue never leaves the process, so the record is passed as is and the listener's
+        # handler formats it. Unlike the base class, nothing is formatted on the caller's thread.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if not put_record(self.queue, record, self.policy):
+            self.dropped += 1
+
+
+class BoundedQueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Wait for room instead of raising queue.Full when stopping with a full queue
+        self.queue.put(self._sentinel)
+
+
+def queue_handler(handlers: List[logging.Handler], queue_size: int = DEFAULT_QUEUE_SIZE, policy: str = "drop"):
+    """
+    Return a BoundedQueueHandler whose records a listener thread passes to handlers.
+    At exit the listener drains the queue and stops, and dropped records are reported.
+    """
+    q = queue.Queue(maxsize=queue_size)
+    listener = BoundedQueueListener(q, *handlers, respect_handler_level=True)
+    listener.start()
+    bounded_handler = BoundedQueueHandler(q, policy)
+
+    def stop():
+        listener.stop()
+        report_dropped("logging_logger", bounded_handler.dropped)
+
+    atexit.register(stop)
+    return bounded_handler
+
+
+# ---------------------------
+# loguru
+# ---------------------------
+class QueueWriter:
+    """File-like sink: write() only enqueues, a daemon thread writes to stream."""
+
+    _sentinel = None
+
+    def __init__(self, stream: TextIO, queue_size: int = DEFAULT_QUEUE_SIZE, policy: str = "drop"):
+        self.stream = stream
+        self.policy = check_policy(policy)
+        self.dropped = 0
+        self.queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="log-queue-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def write(self, message: str) -> None:
+        if not put_record(self.queue, message, self.policy):
+            self.dropped += 1
+
+    def flush(self) -> None:
+        # Called by loguru after every write; the writer thread flushes once the queue runs dry
+        pass
+
+    def isatty(self) -> bool:
+        return getattr(self.stream, "isatty", lambda: False)()
+
+    def _run(self) -> None:
+        while True:
+            message = self.queue.get()
+            if message is self._sentinel:
+                break
+            self.stream.write(message)
+            if self.queue.empty():
+                self.stream.flush()
+        self.stream.flush()
+
+    def stop(self) -> None:
+        """Drain the queue, then stop the wrapped sink (e.g. JsonLoguruSink closes its file; sys.stdout has no stop)."""
+        if self._thread.is_alive():
+            self.queue.put(self._sentinel)
+            self._thread.join()
+            report_dropped("loguru_logger", self.dropped)
+            stop = getattr(self.stream, "stop", None)
+            if callable(stop):
+                stop()
@@ -0,0 +1,151 @@
+# asmo.d/utils/py_utils/loggers/rate_limit.py
+"""
+Rate limiting and sampling for hot-path logging, shared by logging_logger and loguru_logger.
+
+Key features:
+- One token bucket per call site, keyed by (logger name, line): a loop that logs the same line
+  thousands of times per second is cut down to `rate` records per second after an initial `burst`.
+- Probabilistic sampling of DEBUG/INFO records (WARNING and above are only rate limited).
+- Suppressed records are counted per call site; a "suppressed N messages" summary is logged
+  at most once per summary interval, on the next record that gets through.
+- Decisions are made on the raw record, before any handler or sink formats it.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+from .defaults import DEFAULT_BURST
+from .defaults import DEFAULT_RATE
+from .defaults import DEFAULT_SAMPLE_RATE
+from .defaults import DEFAULT_SUMMARY_SECONDS
+
+# Numeric levels shared by logging and loguru
+SAMPLED_MAX_LEVEL = 20  # DEBUG and INFO
+
+# Records carrying this attribute (stdlib) or extra key (loguru) bypass the limiter
+SUMMARY_MARKER = "rate_limit_summary"
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        sample_rate: float = DEFAULT_SAMPLE_RATE,
+        summary_seconds: float = DEFAULT_SUMMARY_SECONDS,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.sample_rate = sample_rate
+        self.summary_seconds = summary_seconds
+        # (name, line) -> [tokens, last refill time]
+        self._buckets: Dict[Tuple[str, int], list] = {}
+        self._suppressed: Dict[Tuple[str, int], int] = {}
+        self._last_summary = time.monotonic()
+        self._lock = threading.Lock()
+
+    def allow(self, name: str, line: int, levelno: int) -> bool:
+        if levelno <= SAMPLED_MAX_LEVEL and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self._count((name, line))
+            return False
+
+        key = (name, line)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now]
+            else:
+                bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                return True
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return False
+
+    def _count(self, key: Tuple[str, int]) -> None:
+        with self._lock:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+
+    def take_summary(self) -> Optional[str]:
+        """Summary of suppressed records if the interval has elapsed and anything was suppressed, else None."""
+        now = time.monotonic()
+        if now - self._last_summary < self.summary_seconds:
+            return None
+        with self._lock:
+            self._last_summary = now
+            suppressed, self._suppressed = self._suppressed, {}
+        if not suppressed:
+            return None
+        top = sorted(suppressed.items(), key=lambda item: item[1], reverse=True)[:5]
+        sites = ", ".join(f"{name}:{line} x{count}" for (name, line), count in top)
+        return f"Suppressed {sum(suppressed.values())} log messages in the last {self.summary_seconds:g}s ({sites})"
+
+
+# ---------------------------
+# stdlib logging
+# ---------------------------
+class RateLimitFilter(logging.Filter):
+    """Logger filter: runs in Logger.handle, before any handler formats the record."""
+
+    def __init__(self, limiter: RateLimiter):
+        super().__init__()
+        self.limiter = limiter
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, SUMMARY_MARKER, False):
+            return True
+        if not self.limiter.allow(record.name, record.lineno, record.levelno):
+            return False
+        summary = self.limiter.take_summary()
+        if summary:
+            logger = logging.getLogger(record.name)
+            summary_record = logger.makeRecord(
+                record.name,
+                logging.WARNING,
+                record.pathname,
+                record.lineno,
+                summary,
+                None,
+                None,
+                extra={SUMMARY_MARKER: True},
+            )
+            # Straight to the handlers, the filters have already run
+            logger.callHandlers(summary_record)
+        return True
+
+
+# ---------------------------
+# loguru
+# ---------------------------
+class LoguruRateLimitFilter:
+    """
+    Sink filter (logger.add(..., filter=...)); loguru checks it before formatting for the sink.
+    The same record dict is passed to every sink, so the decision is memoized per thread
+    and each record is counted once however many sinks share this filter.
+    """
+
+    def __init__(self, limiter: RateLimiter, logger):
+        self.limiter = limiter
+        self.logger = logger
+        self._last = threading.local()
+
+    def __call__(self, record: Dict) -> bool:
+        if getattr(self._last, "record", None) is record:
+            return self._last.decision
+        if record["extra"].get(SUMMARY_MARKER):
+            return True
+        decision = self.limiter.allow(record["name"], record["line"], record["level"].no)
+        if decision:
+            summary = self.limiter.take_summary()
+            if summary:
+                self.logger.bind(**{SUMMARY_MARKER: True}).warning(summary)
+        # Set after logging the summary, which passes through this filter too
+        self._last.record, self._last.decision = record, decision
+        return decision
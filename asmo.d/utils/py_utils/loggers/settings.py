@@ -0,0 +1,82 @@
+# asmo.d/utils/py_utils/loggers/settings.py
+"""
+LoggingSettings shared by logging_logger and loguru_logger (LOGGING_ env prefix).
+
+Imported lazily by the first get_logger call, so importing a logger module does not pull in
+pydantic. When pydantic-settings is not installed, a minimal env-only reader with the same fields
+is used instead.
+"""
+
+import os
+import threading
+from typing import get_type_hints
+
+from .defaults import DEFAULT_BURST
+from .defaults import DEFAULT_MAX_MB
+from .defaults import DEFAULT_QUEUE_SIZE
+from .defaults import DEFAULT_RATE
+from .defaults import DEFAULT_RETENTION_DAYS
+from .defaults import DEFAULT_ROTATE_HOURS
+from .defaults import DEFAULT_SAMPLE_RATE
+from .defaults import DEFAULT_SUMMARY_SECONDS
+
+
+class EnvSettings:
+    """Env-only stand-in for pydantic_settings.BaseSettings: class defaults overridden by <env_prefix><FIELD>."""
+
+    class Config:
+        env_prefix = ""
+
+    def __init__(self):
+        prefix = self.Config.env_prefix
+        for name, field_type in get_type_hints(type(self)).items():
+            value = os.environ.get(f"{prefix}{name}".upper())
+            if value is None:
+                continue
+            if field_type is bool:
+                setattr(self, name, value.strip().lower() in ("1", "true", "yes", "on"))
+            else:
+                setattr(self, name, field_type(value))
+
+
+try:
+    from pydantic_settings import BaseSettings
+except ImportError:
+    BaseSettings = EnvSettings
+
+
+class LoggingSettings(BaseSettings):
+    level: str = "WARNING"
+    # Format and write on a background thread instead of in the caller
+    queue: bool = False
+    queue_size: int = DEFAULT_QUEUE_SIZE
+    queue_policy: str = "drop"  # drop | block: what to do when the queue is full
+    # Structured JSON-lines file with rotation; for logging_logger json_log_level applies on top of the logger level
+    json_log: bool = False
+    json_log_dir: str = "logs"
+    json_log_level: str = "INFO"
+    json_log_max_mb: float = DEFAULT_MAX_MB
+    json_log_rotate_hours: float = DEFAULT_ROTATE_HOURS
+    json_log_retention_days: float = DEFAULT_RETENTION_DAYS
+    # Per call site token buckets (rate per second, burst) and DEBUG/INFO sampling (fraction kept)
+    rate_limit: bool = False
+    rate_limit_rate: float = DEFAULT_RATE
+    rate_limit_burst: int = DEFAULT_BURST
+    rate_limit_summary_seconds: float = DEFAULT_SUMMARY_SECONDS
+    sample_rate: float = DEFAULT_SAMPLE_RATE
+
+    class Config:
+        env_prefix = "LOGGING_"
+
+
+_settings = None
+_settings_lock = threading.Lock()
+
+
+def get_settings() -> LoggingSettings:
+    """LoggingSettings read from the environment once, on first use."""
+    global _settings
+    with _settings_lock:
+        if _settings is None:
+            _settings = LoggingSettings()
+        return _settings
@@ -0,0 +1,222 @@
+# asmo.d/utils/py_utils/loggers/timing.py
+"""
+Low-overhead latency histograms for code that logs through get_logger.
+
+Key features:
+- timed("name") works as a decorator and as a context manager; a measurement is two
+  perf_counter_ns() calls and one bucket increment.
+- Histogram is HDR-style: log-linear buckets with 32 sub-buckets per power of two, so any
+  percentile is within ~3% of the true value whatever the range (ns .. hours), in constant memory.
+- Timings collects histograms by name; with summary_seconds set it periodically logs one
+  "name: n=.. p50=.. p95=.. p99=.. max=.." line per histogram through the configured logger
+  and optionally writes a Prometheus text dump to a file or a unix socket.
+- Nothing heavy is imported here; the default logger is only resolved when a summary is due.
+"""
+
+import functools
+import os
+import socket
+import tempfile
+import threading
+import time
+from typing import Dict
+from typing import List
+from typing import Optional
+
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+PERCENTILES = (50, 95, 99)
+
+
+def bucket_index(value: int) -> int:
+    """Log-linear bucket of a non-negative integer: exact below 64, then 32 buckets per power of two."""
+    shift = max(value.bit_length() - SUB_BUCKET_BITS - 1, 0)
+    return (shift << SUB_BUCKET_BITS) + (value >> shift)
+
+
+def bucket_bounds(index: int):
+    """Inclusive lower and exclusive upper value of a bucket."""
+    if index < 2 * SUB_BUCKETS:
+        return index, index + 1
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    lower = (index - (shift << SUB_BUCKET_BITS)) << shift
+    return lower, lower + (1 << shift)
+
+
+class Histogram:
+    """Durations in nanoseconds."""
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self._lock = threading.Lock()
+
+    def record(self, value_ns: int) -> None:
+        index = bucket_index(value_ns)
+        with self._lock:
+            self.counts[index] = self.counts.get(index, 0) + 1
+            self.count += 1
+            self.total += value_ns
+            if value_ns > self.max:
+                self.max = value_ns
+
+    def percentile(self, p: float) -> float:
+        """Value at percentile p (0-100), as the midpoint of its bucket; 0 if empty."""
+        with self._lock:
+            if not self.count:
+                return 0
+            rank = max(1, round(p / 100 * self.count))
+            seen = 0
+            for index in sorted(self.counts):
+                seen += self.counts[index]
+                if seen >= rank:
+                    lower, upper = bucket_bounds(index)
+                    return min((lower + upper - 1) / 2, self.max)
+        return self.max
+
+
+def format_ns(value: float) -> str:
+    if value >= 1e9:
+        return f"{value / 1e9:.2f}s"
+    if value >= 1e6:
+        return f"{value / 1e6:.1f}ms"
+    if value >= 1e3:
+        return f"{value / 1e3:.1f}us"
+    return f"{value:.0f}ns"
+
+
+class Timings:
+    """
+    Named histograms. summary_seconds > 0 enables the periodic summary (checked when a
+    measurement is recorded); logger defaults to logging_logger.get_logger("timing").
+    prometheus_target is a file path or "unix:/path/to.sock", written with every summary.
+    """
+
+    def __init__(self, summary_seconds: float = 0.0, logger=None, prometheus_target: Optional[str] = None):
+        self.histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        self.configure(summary_seconds, logger, prometheus_target)
+
+    def configure(self, summary_seconds: float = 0.0, logger=None, prometheus_target: Optional[str] = None) -> None:
+        self.summary_seconds = summary_seconds
+        self.logger = logger
+        self.prometheus_target = prometheus_target
+        self._next_summary = time.monotonic() + summary_seconds
+
+    def histogram(self, name: str) -> Histogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, Histogram())
+        return histogram
+
+    def record(self, name: str, elapsed_ns: int) -> None:
+        self.histogram(name).record(elapsed_ns)
+        if self.summary_seconds and time.monotonic() >= self._next_summary:
+            self._next_summary = time.monotonic() + self.summary_seconds
+            self.emit_summary()
+
+    def summary_lines(self) -> List[str]:
+        """One line per histogram, in the order they were first recorded."""
+        lines = []
+        for name, histogram in list(self.histograms.items()):
+            if not histogram.count:
+                continue
+            if histogram.count == 1:
+                lines.append(f"{name}: {format_ns(histogram.total)}")
+                continue
+            stats = " ".join(f"p{p}={format_ns(histogram.percentile(p))}" for p in PERCENTILES)
+            lines.append(
+                f"{name}: n={histogram.count} total={format_ns(histogram.total)} {stats} max={format_ns(histogram.max)}"
+            )
+        return lines
+
+    def emit_summary(self) -> None:
+        logger = self.logger
+        if logger is None:
+            from .logging_logger import get_logger
+
+            logger = self.logger = get_logger("timing")
+        for line in self.summary_lines():
+            logger.info(line)
+        if self.prometheus_target:
+            try:
+                dump_prometheus(self, self.prometheus_target)
+            except OSError as e:
+                logger.warning(f"Prometheus dump to {self.prometheus_target} failed: {e}")
+
+    def prometheus_text(self, prefix: str = "timed") -> str:
+        """Prometheus text exposition: one summary metric with quantile labels per histogram, in seconds."""
+        lines = [f"# TYPE {prefix}_seconds summary"]
+        for name, histogram in sorted(self.histograms.items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            for p in PERCENTILES:
+                value = histogram.percentile(p) / 1e9
+                lines.append(f'{prefix}_seconds{{name="{label}",quantile="{p / 100:g}"}} {value:.9f}')
+            lines.append(f'{prefix}_seconds_sum{{name="{label}"}} {histogram.total / 1e9:.9f}')
+            lines.append(f'{prefix}_seconds_count{{name="{label}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+
+def dump_prometheus(timings: Timings, target: str) -> None:
+    """Write the Prometheus text to a file (atomically, for node_exporter's textfile collector) or a unix socket."""
+    data = timings.prometheus_text().encode("utf-8")
+    if target.startswith("unix:"):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(target[len("unix:") :])
+            sock.sendall(data)
+        return
+    directory = os.path.dirname(os.path.abspath(target))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".timings.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, target)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+# Process-wide registry used by timed() unless another one is passed
+timings = Timings()
+
+
+class timed:
+    """
+    Record the duration of a block or of every call:
+
+        with timed("db.query"):
+            ...
+
+        @timed("handler")
+        def handler(...): ...
+    """
+
+    __slots__ = ("name", "registry", "_start")
+
+    def __init__(self, name: str, registry: Optional[Timings] = None):
+        self.name = name
+        self.registry = registry
+        self._start = 0
+
+    def __enter__(self) -> "timed":
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        (self.registry or timings).record(self.name, time.perf_counter_ns() - self._start)
+
+    def __call__(self, func):
+        name, registry = self.name, self.registry
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                (registry or timings).record(name, time.perf_counter_ns() - start)
+
+        return wrapper
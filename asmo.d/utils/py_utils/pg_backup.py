@@ -0,0 +1,384 @@
+# asmo.d/utils/py_utils/pg_backup.py
+"""
+Single-pass Postgres backup: one pg_dump stream teed to several sinks.
+
+Key features:
+- pg_dump runs once; its output is read in blocks and fanned out to every sink (plain .sql,
+  .sql.gz, .sql.zst), instead of one pg_dump per output file.
+- Compression is parallel block compression on a thread pool (zlib and zstandard release the GIL):
+  each block becomes an independent gzip member / zstd frame, concatenated in order, so the
+  result is a normal file for gunzip / zstd -d.
+- Reports raw and per-sink throughput and SHA-256 checksums, and writes a sha256sum-compatible
+  <name>.sha256 next to the outputs.
+- Outputs are written to temp files and renamed only when the dump succeeds.
+- Built-in retention: backups of the same database older than --retention-days are removed.
+- The chunks sink adds the dump to a deduplicating chunk_store (only chunks not stored by an earlier
+  night are written); its gc follows the same retention.
+- --command runs any stand-in process instead of pg_dump (e.g. a synthetic dump generator); --stdin reads the dump
+  from a pipe.
+"""
+
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import gzip
+import hashlib
+import os
+from pathlib import Path
+import re
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from typing import BinaryIO
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from chunk_store import ChunkStore
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_BACKUP_DIR = "/backups"
+DEFAULT_BLOCK_MB = 4
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_ZSTD_LEVEL = 3
+DATE_FORMAT = "%Y-%m-%d_%H-%M"  # dbname_2023-04-12_15-30.sql, as backup_postgres.sh names them
+SINK_SUFFIXES = {"sql": ".sql", "gz": ".sql.gz", "zst": ".sql.zst"}
+SINKS = list(SINK_SUFFIXES) + ["chunks"]
+
+
+# ---------------------------
+# Sinks
+# ---------------------------
+def gzip_block(level: int) -> Callable[[bytes], bytes]:
+    def compress(block: bytes) -> bytes:
+        return gzip.compress(block, compresslevel=level, mtime=0)
+
+    return compress
+
+
+def zstd_block(level: int) -> Callable[[bytes], bytes]:
+    if zstandard is None:
+        raise RuntimeError("zst sink needs the zstandard package (pip install zstandard)")
+    # ZstdCompressor is not thread-safe; one per worker thread
+    local = threading.local()
+
+    def compress(block: bytes) -> bytes:
+        compressor = getattr(local, "compressor", None)
+        if compressor is None:
+            compressor = local.compressor = zstandard.ZstdCompressor(level=level, write_content_size=True)
+        return compressor.compress(block)
+
+    return compress
+
+
+class Sink:
+    """One output file, written to <path>.tmp and renamed by commit()."""
+
+    def __init__(self, path: Path, compress: Optional[Callable[[bytes], bytes]] = None):
+        self.path = path
+        self.tmp_path = path.with_name(path.name + ".tmp")
+        self.compress = compress
+        self.file: BinaryIO = open(self.tmp_path, "wb")
+        self.sha256 = hashlib.sha256()
+        self.bytes_out = 0
+        self.busy_seconds = 0.0
+
+    def write(self, data: bytes) -> None:
+        self.file.write(data)
+        self.sha256.update(data)
+        self.bytes_out += len(data)
+
+    def commit(self) -> None:
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self) -> None:
+        self.file.close()
+        try:
+            os.unlink(self.tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+class ChunkSink:
+    """The raw stream added to a ChunkStore under the backup's name; path is its manifest."""
+
+    compress = None
+    busy_seconds = 0.0
+
+    def __init__(self, store: ChunkStore, name: str):
+        self.writer = store.writer(name)
+        self.path = store.manifest_path(name)
+
+    @property
+    def sha256(self):
+        return self.writer.sha256
+
+    @property
+    def bytes_out(self) -> int:
+        """Bytes of new chunks written; chunks already in the store cost nothing."""
+        return self.writer.bytes_written
+
+    def write(self, data: bytes) -> None:
+        self.writer.write(data)
+
+    def commit(self) -> None:
+        self.writer.commit()
+
+    def abort(self) -> None:
+        self.writer.close()
+
+
+def make_sinks(base: Path, kinds: List[str], gzip_level: int, zstd_level: int, chunk_store: Optional[ChunkStore]):
+    factories = {
+        "sql": lambda: None,
+        "gz": lambda: gzip_block(gzip_level),
+        "zst": lambda: zstd_block(zstd_level),
+    }
+    return [
+        ChunkSink(chunk_store, base.name)
+        if kind == "chunks"
+        else Sink(base.with_name(base.name + SINK_SUFFIXES[kind]), factories[kind]())
+        for kind in kinds
+    ]
+
+
+# ---------------------------
+# Streaming
+# ---------------------------
+def timed_compress(compress: Callable[[bytes], bytes], block: bytes):
+    start = time.perf_counter()
+    data = compress(block)
+    return data, time.perf_counter() - start
+
+
+def tee_stream(stream: BinaryIO, sinks: List[Sink], workers: int, block_size: int) -> Dict:
+    """
+    Read stream to EOF in blocks (a buffered pipe returns full blocks until EOF) and write each block
+    to every sink, compressing on a thread pool. At most 2 x workers blocks per compressed sink are
+    in flight, so memory stays bounded. Returns the raw byte count and SHA-256.
+    """
+    raw_sha256 = hashlib.sha256()
+    raw_bytes = 0
+    pending = deque()
+    max_pending = 2 * workers * max(1, sum(1 for s in sinks if s.compress))
+
+    def drain(limit: int) -> None:
+        while len(pending) > limit:
+            sink, future = pending.popleft()
+            data, seconds = future.result()
+            sink.busy_seconds += seconds
+            sink.write(data)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            block = stream.read(block_size)
+            if not block:
+                break
+            raw_sha256.update(block)
+            raw_bytes += len(block)
+            for sink in sinks:
+                if sink.compress is None:
+                    sink.write(block)
+                else:
+                    pending.append((sink, executor.submit(timed_compress, sink.compress, block)))
+            drain(max_pending)
+        drain(0)
+
+    return {"bytes": raw_bytes, "sha256": raw_sha256.hexdigest()}
+
+
+# ---------------------------
+# Retention
+# ---------------------------
+def prune_backups(backup_dir: Path, db_name: str, days: float, now: Optional[float] = None) -> List[Path]:
+    """Delete <db_name>_<date>.sql* backups (and their .sha256) older than days; returns removed paths."""
+    if days <= 0:
+        return []
+    cutoff = (now or time.time()) - days * 86400
+    # Exact names only: a glob on "<db_name>_*" would also match databases sharing the prefix (app vs app_x)
+    suffixes = "|".join(re.escape(suffix) for suffix in list(SINK_SUFFIXES.values()) + [".sha256"])
+    pattern = re.compile(rf"{re.escape(db_name)}_\d{{4}}-\d{{2}}-\d{{2}}_\d{{2}}-\d{{2}}({suffixes})")
+    removed = []
+    for path in backup_dir.glob(f"{db_name}_*"):
+        if not path.is_file() or not pattern.fullmatch(path.name):
+            continue
+        if path.stat().st_mtime < cutoff:
+            path.unlink()
+            removed.append(path)
+    return removed
+
+
+# ---------------------------
+# Backup
+# ---------------------------
+def dump_command(args) -> List[str]:
+    if args.command:
+        return shlex.split(args.command)
+    return ["pg_dump", "-h", args.host, "-p", str(args.port), "-U", args.user, args.db_name]
+
+
+def write_checksums(base: Path, sinks: List[Sink]) -> Optional[Path]:
+    # Chunk store manifests carry their own stream checksum
+    lines = [f"{sink.sha256.hexdigest()}  {sink.path.name}\n" for sink in sinks if isinstance(sink, Sink)]
+    if not lines:
+        return None
+    path = base.with_name(base.name + ".sha256")
+    path.write_text("".join(lines), encoding="utf-8")
+    return path
+
+
+def run_backup(args) -> Dict:
+    backup_dir = Path(args.backup_dir)
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    base = backup_dir / f"{args.db_name}_{datetime.now().strftime(DATE_FORMAT)}"
+    chunk_store = ChunkStore(Path(args.chunk_store or backup_dir / "chunks"), jobs=args.jobs)
+    sinks = make_sinks(base, args.sinks, args.gzip_level, args.zstd_level, chunk_store)
+
+    process = None
+    start = time.perf_counter()
+    try:
+        if args.stdin:
+            stream = sys.stdin.buffer
+        else:
+            env = dict(os.environ)
+            if args.password and "PGPASSWORD" not in env:
+                env["PGPASSWORD"] = args.password
+            process = subprocess.Popen(dump_command(args), stdout=subprocess.PIPE, env=env)
+            stream = process.stdout
+        raw = tee_stream(stream, sinks, args.jobs, args.block_mb * 1024 * 1024)
+        if process is not None and process.wait() != 0:
+            raise RuntimeError(f"{dump_command(args)[0]} exited with status {process.returncode}")
+    except BaseException:
+        if process is not None and process.poll() is None:
+            process.kill()
+        for sink in sinks:
+            sink.abort()
+        raise
+    elapsed = time.perf_counter() - start
+
+    for sink in sinks:
+        sink.commit()
+    checksums = write_checksums(base, sinks)
+    removed = prune_backups(backup_dir, args.db_name, args.retention_days)
+    if "chunks" in args.sinks and args.retention_days > 0:
+        removed += [chunk_store.manifest_path(name) for name in chunk_store.gc(args.retention_days)["manifests"]]
+
+    return {
+        "raw": dict(raw, seconds=elapsed),
+        "sinks": [
+            {
+                "path": str(sink.path),
+                "bytes": sink.bytes_out,
+                "ratio": sink.bytes_out / raw["bytes"] if raw["bytes"] else 0.0,
+                "sha256": sink.sha256.hexdigest(),
+                "compress_seconds": sink.busy_seconds,
+            }
+            for sink in sinks
+        ],
+        "checksums": str(checksums) if checksums else None,
+        "removed": [str(p) for p in removed],
+    }
+
+
+def print_report(report: Dict) -> None:
+    raw = report["raw"]
+    mb = raw["bytes"] / 1e6
+    print(f"📊 Dumped {mb:,.1f} MB in {raw['seconds']:.2f}s ({mb / max(raw['seconds'], 1e-9):,.1f} MB/s)")
+    print(f"   sha256 {raw['sha256']}  (raw stream)")
+    for sink in report["sinks"]:
+        line = f"✅ {sink['path']}: {sink['bytes'] / 1e6:,.1f} MB"
+        if sink["compress_seconds"]:
+            line += f" (ratio {sink['ratio']:.3f}, {sink['compress_seconds']:.2f}s compression CPU)"
+        print(line)
+        print(f"   sha256 {sink['sha256']}")
+    if report["checksums"]:
+        print(f"🔐 Checksums: {report['checksums']}")
+    if report["removed"]:
+        print(f"🗑️  Removed {len(report['removed'])} backups past retention")
+
+
+# ---------------------------
+# CLI
+# ---------------------------
+def main():
+    parser = argparse.ArgumentParser(
+        description="Back up a Postgres database with one pg_dump, teed to plain and compressed files",
+        epilog="""Examples:
+  # What backup_postgres.sh does: .sql and .sql.gz, 30-day retention, connection from the environment
+  %(prog)s
+
+  # Only zstd, 8 threads, keep two weeks
+  %(prog)s --sinks zst -j 8 --retention-days 14
+
+  # Stand-in process instead of pg_dump
+  %(prog)s --db-name synthetic --backup-dir /tmp/backups --command "python make_dump.py"
+
+  # Deduplicated nightly copy next to a compressed one
+  %(prog)s --sinks gz chunks
+
+  # Dump from a pipe
+  pg_dump mydb | %(prog)s --stdin --db-name mydb
+
+Environment: DATABASE_HOST, DATABASE_PORT, POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD
+        """,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--host", default=os.environ.get("DATABASE_HOST", "localhost"), help="Database host")
+    parser.add_argument("--port", default=os.environ.get("DATABASE_PORT", "5432"), help="Database port")
+    parser.add_argument("--db-name", default=os.environ.get("POSTGRES_DB"), help="Database name (also the file prefix)")
+    parser.add_argument("--user", default=os.environ.get("POSTGRES_USER", "postgres"), help="Database user")
+    parser.add_argument("--password", default=os.environ.get("POSTGRES_PASSWORD"), help="Password (sets PGPASSWORD)")
+    parser.add_argument("--backup-dir", default=DEFAULT_BACKUP_DIR, help="Output directory (default: %(default)s)")
+    parser.add_argument(
+        "--sinks",
+        nargs="+",
+        choices=SINKS,
+        default=["sql", "gz"],
+        help="Outputs to write (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Compression threads (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--block-mb", type=int, default=DEFAULT_BLOCK_MB, help="Compression block size (default: %(default)s)"
+    )
+    parser.add_argument("--gzip-level", type=int, default=DEFAULT_GZIP_LEVEL, help="gzip level (default: %(default)s)")
+    parser.add_argument("--zstd-level", type=int, default=DEFAULT_ZSTD_LEVEL, help="zstd level (default: %(default)s)")
+    parser.add_argument(
+        "--retention-days",
+        type=float,
+        default=DEFAULT_RETENTION_DAYS,
+        help="Remove this database's backups older than this; 0 keeps everything (default: %(default)s)",
+    )
+    parser.add_argument("--chunk-store", help="Store for the chunks sink (default: <backup-dir>/chunks)")
+    parser.add_argument("--command", help="Run this instead of pg_dump; its stdout is the dump")
+    parser.add_argument("--stdin", action="store_true", help="Read the dump from stdin")
+
+    args = parser.parse_args()
+    if not args.db_name:
+        parser.error("--db-name (or POSTGRES_DB) is required")
+    if args.jobs < 1 or args.block_mb < 1:
+        parser.error("--jobs and --block-mb must be >= 1")
+    if "zst" in args.sinks and zstandard is None:
+        parser.error("the zst sink needs the zstandard package (pip install zstandard)")
+
+    try:
+        report = run_backup(args)
+    except (OSError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# asmo.d/utils/py_utils/prompt_cache.py
+"""
+Persistent incremental cache for collect_files_content.
+
+Key features:
+- One cache directory per scanned root (under ~/.cache/collect_files_content by default).
+- index.json maps each relative path to its mtime_ns/size plus everything derived from the content:
+  the rendered block file ("<path>:\\n<content>\\n\\n"), the sniff verdict and the content digest.
+- An entry is reused only while the file's mtime_ns and size match; otherwise it is dropped and recomputed.
+- With a set of changed files (e.g. from `git diff <rev>`), files outside that set reuse their entry without a stat.
+- The index is written atomically; entries and blocks of files not seen in a run are pruned.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import tempfile
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Set
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_ROOT = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "collect_files_content"
+
+
+def default_cache_dir(root_path: Path) -> Path:
+    """Cache directory for one scanned root."""
+    return DEFAULT_CACHE_ROOT / hashlib.sha1(str(root_path).encode("utf-8")).hexdigest()[:16]
+
+
+class PromptCache:
+    def __init__(
+        self,
+        cache_dir: Path,
+        root_path: Path,
+        *,
+        settings: Optional[Dict] = None,
+        changed: Optional[Set[str]] = None,
+        rebuild: bool = False,
+    ):
+        """
+        settings: anything that changes derived data (e.g. sniff limits); a mismatch discards the index.
+        changed: absolute paths that may have changed; when given, all other indexed files are trusted as-is.
+        """
+        self.cache_dir = cache_dir
+        self.blocks_dir = cache_dir / "blocks"
+        self.root_path = root_path
+        self.settings = settings or {}
+        self.changed = changed
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: Dict[str, Dict] = {} if rebuild else self._load()
+        self._checked: Set[str] = set()
+
+    # ---------------------------
+    # Index persistence
+    # ---------------------------
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.cache_dir / "index.json", "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != CACHE_VERSION
+            or data.get("root") != str(self.root_path)
+            or data.get("settings") != self.settings
+        ):
+            return {}
+        entries = data.get("files")
+        return entries if isinstance(entries, dict) else {}
+
+    def save(self) -> None:
+        """Drop entries not seen in this run, delete their blocks and write the index atomically."""
+        for rel in set(self._entries) - self._checked:
+            self._drop(rel)
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        data = {"version": CACHE_VERSION, "root": str(self.root_path), "settings": self.settings, "files": {}}
+        data["files"] = {rel: self._entries[rel] for rel in sorted(self._entries)}
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".index.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_dir / "index.json")
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _drop(self, rel: str) -> None:
+        entry = self._entries.pop(rel, None)
+        if entry and entry.get("block"):
+            try:
+                os.unlink(self._block_file(rel))
+            except OSError:
+                pass
+
+    # ---------------------------
+    # Entries
+    # ---------------------------
+    def _rel(self, file_path: Path) -> str:
+        return str(Path(file_path).relative_to(self.root_path))
+
+    def _block_file(self, rel: str) -> Path:
+        return self.blocks_dir / hashlib.sha1(rel.encode("utf-8")).hexdigest()
+
+    def entry(self, file_path: Path) -> Dict:
+        """Return the (possibly fresh, empty) entry for file_path, validating it once per run."""
+        rel = self._rel(file_path)
+        if rel in self._checked:
+            return self._entries[rel]
+        self._checked.add(rel)
+
+        entry = self._entries.get(rel)
+        if entry is not None and self.changed is not None and str(file_path) not in self.changed:
+            return entry
+
+        st = os.stat(file_path)
+        if entry is None or entry.get("mtime_ns") != st.st_mtime_ns or entry.get("size") != st.st_size:
+            self._drop(rel)
+            entry = self._entries[rel] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+        return entry
+
+    def sniff(self, file_path: Path, sniff_func: Callable[[str], Optional[str]]) -> Optional[str]:
+        """Cached sniff verdict (None keeps the file)."""
+        entry = self.entry(file_path)
+        if "skip" not in entry:
+            entry["skip"] = sniff_func(str(file_path))
+        return entry["skip"]
+
+    def digest(self, file_path: str, hash_func: Callable[[str], bytes]) -> bytes:
+        """Cached content digest."""
+        entry = self.entry(Path(file_path))
+        if "digest" not in entry:
+            entry["digest"] = hash_func(file_path).hex()
+        return bytes.fromhex(entry["digest"])
+
+    def cached_block(self, file_path: Path) -> Optional[Path]:
+        """Path of the rendered block for file_path if it is still valid, else None."""
+        entry = self.entry(file_path)
+        block = self._block_file(self._rel(file_path))
+        if entry.get("block") and block.is_file():
+            self.hits += 1
+            return block
+        self.misses += 1
+        return None
+
+    def store_block(self, file_path: Path, render: Callable) -> Path:
+        """Render a block via render(binary_file) into the cache and return its path."""
+        entry = self.entry(file_path)
+        block = self._block_file(self._rel(file_path))
+        self.blocks_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.blocks_dir, prefix=".block.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                render(f)
+            os.replace(tmp_path, block)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        entry["block"] = True
+        return block
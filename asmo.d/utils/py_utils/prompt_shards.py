@@ -0,0 +1,282 @@
+# asmo.d/utils/py_utils/prompt_shards.py
+"""
+Token/byte-budgeted, sharded prompt output for collect_files_content.
+
+Key features:
+- Splits output into numbered shards (prompt.001.txt, prompt.002.txt, ...) at file boundaries.
+- Files larger than a whole shard are split at line boundaries with a "(continued)" header.
+- Writes a JSON manifest mapping each file to its shard(s) and byte/token offsets.
+- Default token counter is an approximate byte-class estimator (bytes.translate + count, no per-byte Python loop).
+- Exact counting through a plugin: "tiktoken[:encoding]" or "module:function" taking a str and returning an int.
+- Blocks already rendered by the incremental cache are appended as-is, without re-validating their UTF-8.
+"""
+
+import codecs
+from contextlib import nullcontext
+import importlib
+import json
+import os
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+TokenCounter = Callable[[bytes], int]
+
+READ_CHUNK_SIZE = 1024 * 1024
+# Files up to this size are kept from the measuring pass and written from memory; larger ones are re-read
+MAX_BUFFERED_BYTES = 16 * 1024 * 1024
+SEPARATOR = b"\n\n"
+
+# Map every byte to its class: word characters, whitespace, punctuation, non-ASCII
+_WORD, _SPACE, _PUNCT, _HIGH = b"w", b" ", b"p", b"h"
+_BYTE_CLASSES = bytes(
+    (_HIGH if b >= 0x80 else _WORD if chr(b).isalnum() or b == ord("_") else _SPACE if chr(b).isspace() else _PUNCT)[0]
+    for b in range(256)
+)
+
+
+def estimate_tokens(data: bytes) -> int:
+    """
+    Approximate BPE token count: ~4 word bytes per token, one token per punctuation byte,
+    ~3 bytes per token for non-ASCII text; whitespace is assumed to merge into neighbours.
+    """
+    classes = data.translate(_BYTE_CLASSES)
+    word = classes.count(_WORD)
+    punct = classes.count(_PUNCT)
+    high = classes.count(_HIGH)
+    return (word + 3) // 4 + punct + (high + 2) // 3
+
+
+def load_token_counter(spec: Optional[str]) -> TokenCounter:
+    """Return a bytes -> token count function for a tokenizer spec (None means the estimator)."""
+    if not spec:
+        return estimate_tokens
+
+    if spec == "tiktoken" or spec.startswith("tiktoken:"):
+        import tiktoken
+
+        encoding = tiktoken.get_encoding(spec.partition(":")[2] or "cl100k_base")
+        return lambda data: len(encoding.encode(data.decode("utf-8", errors="replace"), disallowed_special=()))
+
+    module_name, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError(f"Tokenizer spec must be 'tiktoken[:encoding]' or 'module:function', got '{spec}'")
+    count = getattr(importlib.import_module(module_name), attr)
+    return lambda data: int(count(data.decode("utf-8", errors="replace")))
+
+
+def shard_path(output_file: Path, index: int) -> Path:
+    """prompt.txt -> prompt.001.txt"""
+    return output_file.with_name(f"{output_file.stem}.{index:03d}{output_file.suffix}")
+
+
+def manifest_path(output_file: Path) -> Path:
+    """prompt.txt -> prompt.manifest.json"""
+    return output_file.with_name(f"{output_file.stem}.manifest.json")
+
+
+class ShardWriter:
+    """Write file blocks ("<path>:\\n<content>\\n\\n") into budgeted shards and record a manifest."""
+
+    def __init__(
+        self,
+        output_file: Path,
+        *,
+        max_bytes: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        count_tokens: TokenCounter = estimate_tokens,
+        validate_utf8: bool = True,
+    ):
+        self.output_file = output_file
+        self.max_bytes = max_bytes
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens
+        self.validate_utf8 = validate_utf8
+
+        self.shards: List[Dict] = []
+        self.files: Dict[str, List[Dict]] = {}
+        self._out = None
+        self._bytes = 0
+        self._tokens = 0
+
+    # ---------------------------
+    # Budget bookkeeping
+    # ---------------------------
+    def _fits(self, n_bytes: int, n_tokens: int) -> bool:
+        if self.max_bytes is not None and self._bytes + n_bytes > self.max_bytes:
+            return False
+        if self.max_tokens is not None and self._tokens + n_tokens > self.max_tokens:
+            return False
+        return True
+
+    def _fits_empty(self, n_bytes: int, n_tokens: int) -> bool:
+        return (self.max_bytes is None or n_bytes <= self.max_bytes) and (
+            self.max_tokens is None or n_tokens <= self.max_tokens
+        )
+
+    def _close_shard(self) -> None:
+        if self._out is not None:
+            self._out.close()
+            self.shards[-1].update(bytes=self._bytes, tokens=self._tokens)
+            self._out = None
+
+    def _open_shard(self) -> None:
+        self._close_shard()
+        path = shard_path(self.output_file, len(self.shards) + 1)
+        self._out = open(path, "wb")
+        self.shards.append({"path": path.name})
+        self._bytes = 0
+        self._tokens = 0
+
+    def _ensure_room(self, n_bytes: int, n_tokens: int) -> None:
+        if self._out is None or (self._bytes and not self._fits(n_bytes, n_tokens)):
+            self._open_shard()
+
+    def _write(self, data: bytes, n_tokens: int) -> None:
+        self._out.write(data)
+        self._bytes += len(data)
+        self._tokens += n_tokens
+
+    def _record(self, rel_path: str, byte_start: int, token_start: int) -> None:
+        self.files.setdefault(rel_path, []).append(
+            {
+                "shard": self.shards[-1]["path"],
+                "byte_start": byte_start,
+                "byte_end": self._bytes,
+                "token_start": token_start,
+                "token_end": self._tokens,
+            }
+        )
+
+    # ---------------------------
+    # Public API
+    # ---------------------------
+    def measure(self, file_path: Path, validate_utf8: Optional[bool] = None) -> Tuple[int, Optional[List[bytes]]]:
+        """
+        Stream the file once in chunks: validate UTF-8 (if enabled) and count its tokens.
+        Returns (tokens, chunks); chunks is None when the file exceeds MAX_BUFFERED_BYTES.
+        """
+        if validate_utf8 is None:
+            validate_utf8 = self.validate_utf8
+        decoder = codecs.getincrementaldecoder("utf-8")() if validate_utf8 else None
+        tokens = 0
+        chunks: Optional[List[bytes]] = []
+        size = 0
+        with open(file_path, "rb") as src:
+            while True:
+                chunk = src.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if decoder is not None:
+                    decoder.decode(chunk)
+                tokens += self.count_tokens(chunk)
+                size += len(chunk)
+                if size > MAX_BUFFERED_BYTES:
+                    chunks = None
+                elif chunks is not None:
+                    chunks.append(chunk)
+        if decoder is not None:
+            decoder.decode(b"", final=True)
+        return tokens, chunks
+
+    @staticmethod
+    def _read_chunks(file_path: Path, chunks: Optional[List[bytes]]) -> Iterator[bytes]:
+        if chunks is not None:
+            yield from chunks
+            return
+        with open(file_path, "rb") as src:
+            while True:
+                chunk = src.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    def add_file(self, file_path: Path, rel_path: str) -> None:
+        """Append one file as a block, starting a new shard or splitting by lines when the budget demands it."""
+        content_tokens, chunks = self.measure(file_path)
+        header = f"{rel_path}:\n".encode("utf-8")
+        content_bytes = sum(map(len, chunks)) if chunks is not None else os.path.getsize(file_path)
+        block_bytes = len(header) + content_bytes + len(SEPARATOR)
+        block_tokens = self.count_tokens(header) + content_tokens + self.count_tokens(SEPARATOR)
+
+        if self._fits_empty(block_bytes, block_tokens):
+            self._ensure_room(block_bytes, block_tokens)
+            byte_start, token_start = self._bytes, self._tokens
+            self._write(header, self.count_tokens(header))
+            for chunk in self._read_chunks(file_path, chunks):
+                self._write(chunk, 0)
+            self._tokens += content_tokens
+            self._write(SEPARATOR, self.count_tokens(SEPARATOR))
+            self._record(rel_path, byte_start, token_start)
+            return
+
+        self._add_oversized(file_path, rel_path, header, chunks)
+
+    def add_block(self, block_path: Path, file_path: Path, rel_path: str) -> None:
+        """
+        Append a block rendered by the cache ("<path>:\\n<content>\\n\\n", validated when it was rendered).
+        A block that can never fit a single shard is re-added from file_path so it is split at line boundaries.
+        """
+        block_tokens, chunks = self.measure(block_path, validate_utf8=False)
+        block_bytes = sum(map(len, chunks)) if chunks is not None else os.path.getsize(block_path)
+        if not self._fits_empty(block_bytes, block_tokens):
+            self.add_file(file_path, rel_path)
+            return
+
+        self._ensure_room(block_bytes, block_tokens)
+        byte_start, token_start = self._bytes, self._tokens
+        for chunk in self._read_chunks(block_path, chunks):
+            self._write(chunk, 0)
+        self._tokens += block_tokens
+        self._record(rel_path, byte_start, token_start)
+
+    def add_text(self, rel_path: str, content: bytes) -> None:
+        """Append a small in-memory block (e.g. a duplicate reference) under rel_path."""
+        block = f"{rel_path}:\n".encode("utf-8") + content + SEPARATOR
+        n_tokens = self.count_tokens(block)
+        self._ensure_room(len(block), n_tokens)
+        byte_start, token_start = self._bytes, self._tokens
+        self._write(block, n_tokens)
+        self._record(rel_path, byte_start, token_start)
+
+    def _add_oversized(self, file_path: Path, rel_path: str, header: bytes, chunks: Optional[List[bytes]]) -> None:
+        """Split a file that can never fit a single shard at line boundaries."""
+        if self._out is None or self._bytes:
+            self._open_shard()
+        byte_start, token_start = self._bytes, self._tokens
+        self._write(header, self.count_tokens(header))
+
+        with open(file_path, "rb") if chunks is None else nullcontext() as src:
+            lines = src if chunks is None else b"".join(chunks).splitlines(keepends=True)
+            for line in lines:
+                n_tokens = self.count_tokens(line)
+                if self._bytes > len(header) and not self._fits(len(line), n_tokens):
+                    # Close this part and continue in a fresh shard; a single oversized line is written as-is
+                    self._record(rel_path, byte_start, token_start)
+                    self._open_shard()
+                    byte_start, token_start = self._bytes, self._tokens
+                    header = f"{rel_path} (continued):\n".encode("utf-8")
+                    self._write(header, self.count_tokens(header))
+                self._write(line, n_tokens)
+
+        self._write(SEPARATOR, self.count_tokens(SEPARATOR))
+        self._record(rel_path, byte_start, token_start)
+
+    def close(self) -> Path:
+        """Close the last shard and write the manifest; returns the manifest path."""
+        self._close_shard()
+        path = manifest_path(self.output_file)
+        manifest = {
+            "max_bytes": self.max_bytes,
+            "max_tokens": self.max_tokens,
+            "shards": self.shards,
+            "files": self.files,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+            f.write("\n")
+        return path
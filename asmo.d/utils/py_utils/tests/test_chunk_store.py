@@ -0,0 +1,85 @@
+# asmo.d/utils/py_utils/tests/test_chunk_store.py
+import io
+import json
+import os
+import random
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chunk_store import ChunkStore  # noqa: E402
+
+DAY = 86400
+
+
+def dump(rows: int, seed: int = 0) -> bytes:
+    """SQL-like text: one INSERT per line with pseudo-random values."""
+    rng = random.Random(seed)
+    lines = [f"INSERT INTO items VALUES ({i}, '{rng.getrandbits(64):x}', {rng.random():.6f});\n" for i in range(rows)]
+    return "".join(lines).encode("utf-8")
+
+
+def restored(store: ChunkStore, name: str) -> bytes:
+    out = io.BytesIO()
+    store.restore(name, out)
+    return out.getvalue()
+
+
+def test_backup_restores_byte_for_byte(tmp_path):
+    store = ChunkStore(tmp_path / "store", jobs=2)
+    data = dump(20000)
+    stats = store.backup(io.BytesIO(data), "night1", read_size=100_000)
+
+    assert stats["bytes"] == len(data)
+    assert stats["chunks"] > 10
+    assert restored(store, "night1") == data
+
+
+def test_insert_early_in_the_dump_only_adds_nearby_chunks(tmp_path):
+    store = ChunkStore(tmp_path / "store", jobs=2)
+    data = dump(20000)
+    first = store.backup(io.BytesIO(data), "night1")
+
+    cut = data.index(b"\n", 1000) + 1
+    changed = data[:cut] + b"INSERT INTO items VALUES (-1, 'new', 0.5);\n" + data[cut:]
+    second = store.backup(io.BytesIO(changed), "night2")
+
+    assert second["new_chunks"] <= 2
+    assert second["bytes_written"] < first["bytes_written"] / 10
+    assert restored(store, "night2") == changed
+    assert restored(store, "night1") == data
+
+
+def test_gc_drops_expired_backups_and_keeps_shared_chunks(tmp_path):
+    store = ChunkStore(tmp_path / "store", jobs=2)
+    old = dump(5000, seed=1)
+    new = dump(5000, seed=2)
+    store.backup(io.BytesIO(old + new), "old")
+    store.backup(io.BytesIO(new), "new")
+    manifest = store.read_manifest("old")
+    manifest["created"] -= 40 * DAY
+    store.manifest_path("old").write_text(json.dumps(manifest))
+
+    result = store.gc(retention_days=30)
+
+    assert result["manifests"] == ["old"]
+    assert result["chunks"] > 0
+    assert [m["name"] for m in store.manifests()] == ["new"]
+    assert restored(store, "new") == new
+
+
+def test_gc_waits_for_an_open_backup(tmp_path):
+    store = ChunkStore(tmp_path / "store", jobs=2)
+    writer = store.writer("running")
+    writer.write(dump(5000))
+
+    done = threading.Event()
+    thread = threading.Thread(target=lambda: (store.gc(), done.set()))
+    thread.start()
+    assert not done.wait(0.3), "gc ran while a backup was still open"
+
+    writer.commit()
+    thread.join(5)
+    assert done.is_set()
+    assert restored(store, "running") == dump(5000)
@@ -0,0 +1,103 @@
+# asmo.d/utils/py_utils/tests/test_generate_howto_deploy.py
+import argparse
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_howto_deploy as howto  # noqa: E402
+
+TEMPLATE = f"server {{\n    {howto.NGINX_DOMAIN}\n    location / {{ {howto.NGINX_PORT} }}\n}}\n"
+
+
+def site(www_domain="www.one.example.com", repo_url="https://github.com/team/one", **extra):
+    return {"www_domain": www_domain, "repo_url": repo_url, **extra}
+
+
+def test_validate_sites_defaults_port_only_when_missing():
+    sites, errors = howto.validate_sites(
+        [site(), site("www.two.example.com", port=""), site("www.three.example.com", port="9000")]
+    )
+    assert errors == []
+    assert [s["port"] for s in sites] == [howto.DEFAULT_PORT, howto.DEFAULT_PORT, 9000]
+
+
+@pytest.mark.parametrize(
+    "entry, problem",
+    [
+        (site(port=0), "invalid port 0"),
+        (site(port=8.5), "invalid port 8.5"),
+        (site(port=True), "invalid port True"),
+        (site(port="70000"), "invalid port '70000'"),
+        (site(www_domain="not a domain"), "invalid www_domain"),
+        (site(repo_url="https://example.com/team/one"), "Repo URL must start with"),
+        ("www.one.example.com", "expected a mapping"),
+    ],
+)
+def test_validate_sites_reports_errors(entry, problem):
+    sites, errors = howto.validate_sites([entry])
+    assert sites == []
+    assert len(errors) == 1 and problem in errors[0]
+
+
+def test_validate_sites_rejects_duplicate_domains():
+    _, errors = howto.validate_sites([site(), site(repo_url="https://gitlab.com/team/other")])
+    assert errors == ["site 2: duplicate www_domain 'www.one.example.com' (also site 1)"]
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        ("sites:\n", []),
+        ("- www_domain: www.one.example.com\n", [{"www_domain": "www.one.example.com"}]),
+        ("sites:\n  - www_domain: www.one.example.com\n", [{"www_domain": "www.one.example.com"}]),
+    ],
+)
+def test_load_manifest_yaml(tmp_path, content, expected):
+    manifest = tmp_path / "sites.yaml"
+    manifest.write_text(content)
+    assert howto.load_manifest(manifest) == expected
+
+
+@pytest.mark.parametrize("content", [b"sites: [unclosed\n", b"just a string\n", b"- \xff\xfe\n"])
+def test_load_manifest_rejects_bad_yaml(tmp_path, content):
+    manifest = tmp_path / "sites.yml"
+    manifest.write_bytes(content)
+    with pytest.raises(argparse.ArgumentTypeError):
+        howto.load_manifest(manifest)
+
+
+def test_rerun_leaves_unchanged_files_alone(tmp_path):
+    sites, _ = howto.validate_sites([site(port=8001), site("www.two.example.com", "https://gitlab.com/team/two")])
+    args = (tmp_path / "out", tmp_path / "out" / "sites", TEMPLATE)
+    assert howto.render_sites(sites, *args) == {"written": 4, "unchanged": 0}
+    assert howto.render_sites(sites, *args) == {"written": 0, "unchanged": 4}
+    sites[0]["port"] = 8002
+    assert howto.render_sites(sites, *args) == {"written": 1, "unchanged": 3}
+
+
+def test_batch_substitutes_nginx_domain_and_port_into_output_sites(tmp_path, monkeypatch):
+    manifest = tmp_path / "sites.csv"
+    manifest.write_text("www_domain,repo_url,port\nwww.one.example.com,https://github.com/team/one,8123\n")
+    template = tmp_path / "pure_html.example"
+    template.write_text(TEMPLATE)
+    output = tmp_path / "out"
+    argv = ["generate_howto_deploy.py", "-m", str(manifest), "-o", str(output), "--nginx-template", str(template)]
+    monkeypatch.setattr(sys, "argv", argv)
+    howto.main()
+
+    config = (output / "sites" / "www.one.example.com").read_text()
+    assert "server_name www.one.example.com;" in config
+    assert "proxy_pass http://localhost:8123;" in config
+    assert howto.NGINX_DOMAIN not in config and howto.NGINX_PORT not in config
+    assert "git@github.com:team/one.git" in (output / "www.one.example.com" / "howto.deploy.txt").read_text()
+
+
+def test_batch_with_invalid_sites_writes_nothing(tmp_path):
+    manifest = tmp_path / "sites.csv"
+    manifest.write_text("www_domain,repo_url,port\nwww.one.example.com,https://github.com/team/one,x\n")
+    with pytest.raises(SystemExit):
+        howto.run_batch(manifest, tmp_path / "out", tmp_path / "out" / "sites", None)
+    assert not (tmp_path / "out").exists()
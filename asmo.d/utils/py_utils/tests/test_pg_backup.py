@@ -0,0 +1,44 @@
+# asmo.d/utils/py_utils/tests/test_pg_backup.py
+import os
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pg_backup  # noqa: E402
+
+DAY = 86400
+
+
+def touch(path: Path, age_days: float, now: float) -> Path:
+    path.write_text("-- dump\n")
+    os.utime(path, (now - age_days * DAY, now - age_days * DAY))
+    return path
+
+
+def test_prune_backups_keeps_databases_sharing_the_prefix(tmp_path):
+    now = time.time()
+    old = [
+        touch(tmp_path / f"app_2020-01-01_00-00{suffix}", 40, now)
+        for suffix in (".sql", ".sql.gz", ".sql.zst", ".sha256")
+    ]
+    fresh = touch(tmp_path / "app_2024-01-01_00-00.sql", 1, now)
+    other_db = [
+        touch(tmp_path / "app_x_2020-01-01_00-00.sql", 40, now),
+        touch(tmp_path / "app_x_2020-01-01_00-00.sql.gz", 40, now),
+        touch(tmp_path / "app_2020-01-01_00-00.sql.bak", 40, now),
+    ]
+
+    removed = pg_backup.prune_backups(tmp_path, "app", 30, now=now)
+
+    assert sorted(removed) == sorted(old)
+    assert fresh.exists()
+    assert all(path.exists() for path in other_db)
+
+
+def test_prune_backups_disabled(tmp_path):
+    now = time.time()
+    path = touch(tmp_path / "app_2020-01-01_00-00.sql", 400, now)
+    assert pg_backup.prune_backups(tmp_path, "app", 0, now=now) == []
+    assert path.exists()
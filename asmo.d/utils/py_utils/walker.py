@@ -0,0 +1,113 @@
+# asmo.d/utils/py_utils/walker.py
+"""
+Shared file-tree walker for the py_utils file tools.
+
+Key features:
+- os.scandir based; yields os.DirEntry objects so callers reuse the cached type/stat data.
+- Ignore and include rules are precompiled once into frozensets (FileMatcher).
+- Streaming generator: consumers start working while the walk is still running.
+- Optional thread pool scans directories ahead of the consumer; output order is the same
+  deterministic top-down order (entries sorted by name) for any thread count.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Tuple
+
+
+class FileMatcher:
+    """
+    Precompiled file/dir rules.
+    - A file matches if its name is in names or its extension is in extensions, and neither is excluded.
+    - A directory (or file) whose name is in ignore is skipped entirely.
+    - fold_ext_case compares extensions case-insensitively.
+    """
+
+    __slots__ = ("names", "extensions", "exclude", "ignore", "fold_ext_case")
+
+    def __init__(
+        self,
+        *,
+        names: Iterable[str] = (),
+        extensions: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        ignore: Iterable[str] = (),
+        fold_ext_case: bool = False,
+    ):
+        self.fold_ext_case = fold_ext_case
+        self.names = frozenset(names)
+        self.extensions = frozenset(ext.lower() for ext in extensions) if fold_ext_case else frozenset(extensions)
+        self.exclude = frozenset(exclude)
+        self.ignore = frozenset(ignore)
+
+    def matches(self, name: str) -> bool:
+        if name in self.ignore:
+            return False
+        ext = os.path.splitext(name)[1]
+        if name in self.exclude or ext in self.exclude:
+            return False
+        if self.fold_ext_case:
+            ext = ext.lower()
+        return name in self.names or ext in self.extensions
+
+    def is_ignored(self, name: str) -> bool:
+        return name in self.ignore
+
+
+def scan_dir(path: str, matcher: FileMatcher) -> Tuple[List[os.DirEntry], List[str]]:
+    """Scan one directory: return (matching files, subdirectories to descend into), both sorted by name."""
+    files: List[os.DirEntry] = []
+    subdirs: List[str] = []
+    try:
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError:
+        return files, subdirs
+
+    for entry in entries:
+        if entry.name in matcher.ignore:
+            continue
+        try:
+            # d_type from readdir answers these without a stat syscall on most filesystems
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file() and matcher.matches(entry.name):
+                files.append(entry)
+        except OSError:
+            continue
+    return files, subdirs
+
+
+def walk_files(root: str, matcher: FileMatcher, *, threads: int = 1) -> Iterator[os.DirEntry]:
+    """
+    Yield matching files under root in top-down order (like os.walk, sorted by name).
+    threads > 1 scans directories in a thread pool ahead of the consumer.
+    """
+    if threads <= 1:
+        stack = [root]
+        while stack:
+            files, subdirs = scan_dir(stack.pop(), matcher)
+            yield from files
+            stack.extend(reversed(subdirs))
+        return
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        stack = [executor.submit(scan_dir, root, matcher)]
+        while stack:
+            files, subdirs = stack.pop().result()
+            yield from files
+            # Children start scanning right away; the stack keeps the sequential order
+            stack.extend(reversed([executor.submit(scan_dir, d, matcher) for d in subdirs]))
+
+
+def filter_paths(paths: Iterable[str], root: str, matcher: FileMatcher) -> Iterator[str]:
+    """Apply the same ignore/include rules to already listed absolute paths (e.g. from git ls-files)."""
+    for path in paths:
+        parts = os.path.relpath(path, root).split(os.sep)
+        if any(matcher.is_ignored(part) for part in parts[:-1]):
+            continue
+        if matcher.matches(parts[-1]):
+            yield path
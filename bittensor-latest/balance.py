@@ -1,14 +1,297 @@
 # bittensor-latest/balance.py
+"""
+Balance and stake report for many wallets/hotkeys across many subnets.
+
+Key features:
+- Input is a matrix: wallets (name[:hotkey]) and/or raw ss58 addresses, crossed with netuids,
+  from the command line or a JSON file.
+- One Subtensor connection serves the whole report, and every read goes through one snapshot
+  (client.at(block)), so all numbers come from the same block.
+- Three batched requests, issued concurrently, regardless of matrix size: free balances of all
+  coldkeys, stake positions of all coldkeys (valued at spot price) and the total stake of every
+  hotkey x netuid pair.
+- Hotkey totals and the balances of coldkeys owning a uid are served from the memory-mapped
+  metagraph_cache snapshots (refreshed when older than --ttl), so only the rest is read from the
+  chain; stake positions are not part of a snapshot and are always read. The report runs at the block
+  most snapshots share; subnets whose snapshot is at another block are read from the chain at that
+  block like uncached ones. --no-cache bypasses the cache.
+- Output as an aligned table or JSON.
+- --network accepts a name (finney, test, local) or a ws:// endpoint, e.g. a local mock substrate node.
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+from dataclasses import asdict
+from dataclasses import dataclass
+import json
+from pathlib import Path
+import sys
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
 import bittensor
 
-wallet = bittensor.wallet(name="dojo_test_98", hotkey="dojo_test_98_hotkey")
-subtensor = bittensor.subtensor()
+from metagraph_cache import DEFAULT_CACHE_DIR
+from metagraph_cache import DEFAULT_TTL
+from metagraph_cache import MetagraphSnapshot
+from metagraph_cache import SnapshotCache
+
+DEFAULT_WALLET = "dojo_test_98:dojo_test_98_hotkey"
+DEFAULT_NETUID = 98
+
+
+@dataclass
+class Target:
+    label: str
+    coldkey_ss58: Optional[str]
+    hotkey_ss58: Optional[str]
+    netuids: List[int]
+
+
+@dataclass
+class Row:
+    label: str
+    coldkey_ss58: Optional[str]
+    hotkey_ss58: Optional[str]
+    netuid: Optional[int]
+    balance_tao: Optional[float]  # free balance of the coldkey
+    stake_alpha: Optional[float]  # coldkey's stake on the hotkey, in the subnet's alpha (TAO on netuid 0)
+    stake_value_tao: Optional[float]  # the same stake at spot price
+    hotkey_total_alpha: Optional[float]  # all stake on the hotkey in the subnet
+
+
+# ---------------------------
+# Matrix
+# ---------------------------
+def wallet_target(spec: str, netuids: List[int], wallet_path: Optional[str] = None) -> Target:
+    """name[:hotkey] -> Target with the wallet's coldkey and (if given) hotkey addresses."""
+    name, _, hotkey = spec.partition(":")
+    kwargs = {"path": wallet_path} if wallet_path else {}
+    wallet = bittensor.Wallet(name, hotkey or "default", **kwargs)
+    return Target(
+        label=spec,
+        coldkey_ss58=wallet.coldkeypub.ss58_address,
+        hotkey_ss58=wallet.hotkey.ss58_address if hotkey else None,
+        netuids=netuids,
+    )
+
+
+def load_matrix(path: str, default_netuids: List[int], wallet_path: Optional[str] = None) -> List[Target]:
+    """
+    JSON list of entries; each has either "wallet" ("name" or "name:hotkey") or raw
+    "coldkey"/"hotkey" ss58 addresses, plus optional "netuids" (default: --netuids) and "label".
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    targets = []
+    for entry in entries:
+        netuids = [int(n) for n in entry.get("netuids", default_netuids)]
+        if "wallet" in entry:
+            target = wallet_target(entry["wallet"], netuids, wallet_path)
+        else:
+            target = Target("", entry.get("coldkey"), entry.get("hotkey"), netuids)
+        target.label = entry.get("label") or target.label or target.hotkey_ss58 or target.coldkey_ss58
+        targets.append(target)
+    return targets
+
+
+# ---------------------------
+# Queries
+# ---------------------------
+async def collect_rows(
+    client, targets: List[Target], block: Optional[int] = None, snapshots: Optional[Dict[int, MetagraphSnapshot]] = None
+) -> Tuple[int, List[Row]]:
+    """
+    Read every (target, netuid) pair from one snapshot, in three batched requests issued concurrently:
+    free balances (one System.Account batch), stake positions valued at spot price (one runtime call for
+    all coldkeys) and hotkey totals (one TotalHotkeyAlpha batch). Balances and hotkey totals found in
+    snapshots (netuid -> MetagraphSnapshot) are taken from there and left out of the batches.
+    Returns (block, rows).
+    """
+    snapshots = snapshots or {}
+    snapshot = await client.at(block)
+    coldkeys = sorted({t.coldkey_ss58 for t in targets if t.coldkey_ss58})
+    hotkey_netuids = sorted({(t.hotkey_ss58, n) for t in targets if t.hotkey_ss58 for n in t.netuids})
+
+    cached_free = {}
+    for coldkey in coldkeys:
+        for cached in snapshots.values():
+            if cached.balance(coldkey) is not None:
+                cached_free[coldkey] = cached.balance(coldkey)
+                break
+    cached_totals = {
+        (hotkey, netuid): snapshots[netuid].alpha(hotkey)
+        for hotkey, netuid in hotkey_netuids
+        if netuid in snapshots and snapshots[netuid].alpha(hotkey) is not None
+    }
+    uncached_coldkeys = [c for c in coldkeys if c not in cached_free]
+    uncached_pairs = [pair for pair in hotkey_netuids if pair not in cached_totals]
+
+    async def balances() -> dict:
+        return await snapshot.balances.balances(uncached_coldkeys) if uncached_coldkeys else {}
+
+    async def valuations() -> dict:
+        return await snapshot.staking.stake_value_for_coldkeys(coldkeys) if coldkeys else {}
+
+    async def hotkey_totals() -> list:
+        if not uncached_pairs:
+            return []
+        return await snapshot.query_batch(
+            bittensor.storage.SubtensorModule.TotalHotkeyAlpha, [list(pair) for pair in uncached_pairs]
+        )
+
+    free, valued, totals = await asyncio.gather(balances(), valuations(), hotkey_totals())
+
+    free_tao = dict(cached_free, **{coldkey: balance.tao for coldkey, balance in free.items()})
+    total_by_pair = dict(cached_totals)
+    for (hotkey, netuid), value in zip(uncached_pairs, totals):
+        total_by_pair[(hotkey, netuid)] = snapshot.balance(int(value or 0), netuid).amount
+    stake_by_key = {}
+    for coldkey, valuation in valued.items():
+        for position in valuation.positions:
+            key = (coldkey, position.hotkey, position.netuid)
+            stake_by_key[key] = (position.stake.amount, valuation.spot_value(position.stake).tao)
+
+    rows = []
+    for target in targets:
+        for netuid in target.netuids if target.hotkey_ss58 else [None]:
+            stake, value = None, None
+            if target.coldkey_ss58 and netuid is not None:
+                stake, value = stake_by_key.get((target.coldkey_ss58, target.hotkey_ss58, netuid), (0.0, 0.0))
+            rows.append(
+                Row(
+                    label=target.label,
+                    coldkey_ss58=target.coldkey_ss58,
+                    hotkey_ss58=target.hotkey_ss58,
+                    netuid=netuid,
+                    balance_tao=free_tao.get(target.coldkey_ss58),
+                    stake_alpha=stake,
+                    stake_value_tao=value,
+                    hotkey_total_alpha=total_by_pair.get((target.hotkey_ss58, netuid)),
+                )
+            )
+    return snapshot.block, rows
+
+
+async def load_snapshots(client, cache: SnapshotCache, netuids: List[int]) -> Dict[int, MetagraphSnapshot]:
+    """Fresh snapshots of the given subnets; subnets that cannot be cached are left to the chain queries."""
+    loaded = await asyncio.gather(*(cache.get_async(client, netuid) for netuid in netuids), return_exceptions=True)
+    return {netuid: s for netuid, s in zip(netuids, loaded) if isinstance(s, MetagraphSnapshot)}
+
+
+async def run_report(
+    network: str, targets: List[Target], block: Optional[int] = None, cache: Optional[SnapshotCache] = None
+) -> Tuple[int, List[Row]]:
+    async with bittensor.Subtensor(network) as client:
+        snapshots = {}
+        if cache is not None and block is None:
+            netuids = sorted({n for t in targets if t.hotkey_ss58 for n in t.netuids})
+            snapshots = await load_snapshots(client, cache, netuids)
+            if snapshots:
+                # Snapshots refreshed at different times sit on different blocks: keep the block most of them
+                # share (the newest on a tie) and read the other subnets from the chain at that same block
+                counts = Counter(s.block for s in snapshots.values())
+                block = max(counts, key=lambda b: (counts[b], b))
+                snapshots = {netuid: s for netuid, s in snapshots.items() if s.block == block}
+        return await collect_rows(client, targets, block, snapshots)
+
+
+# ---------------------------
+# Output
+# ---------------------------
+def format_table(block: int, rows: List[Row]) -> str:
+    def cell(value) -> str:
+        if value is None:
+            return "-"
+        if isinstance(value, float):
+            return f"{value:,.4f}"
+        return str(value)
+
+    headers = ["label", "netuid", "balance τ", "stake α", "stake value τ", "hotkey total α", "hotkey"]
+    numeric = range(1, 6)
+    table = [
+        [
+            cell(r.label),
+            cell(r.netuid),
+            cell(r.balance_tao),
+            cell(r.stake_alpha),
+            cell(r.stake_value_tao),
+            cell(r.hotkey_total_alpha),
+            cell(r.hotkey_ss58),
+        ]
+        for r in rows
+    ]
+    widths = [max([len(h)] + [len(line[i]) for line in table]) for i, h in enumerate(headers)]
+    lines = [f"Block: {block}", ""]
+    for line in [headers] + table:
+        cells = [v.rjust(widths[i]) if i in numeric else v.ljust(widths[i]) for i, v in enumerate(line)]
+        lines.append("  ".join(cells).rstrip())
+    return "\n".join(lines)
+
+
+def format_json(block: int, rows: List[Row]) -> str:
+    return json.dumps({"block": block, "rows": [asdict(r) for r in rows]}, indent=2)
+
+
+# ---------------------------
+# CLI
+# ---------------------------
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report TAO balances and stakes for a wallet/hotkey x netuid matrix",
+        epilog="""Examples:
+  # The classic check: one wallet, netuid 98
+  %(prog)s
+
+  # Several wallets across subnets on testnet, as JSON
+  %(prog)s -w dojo_test_98:dojo_test_98_hotkey -w other:hk1 -n 98 12 --network test --json
+
+  # Matrix file against a local node, bypassing the snapshot cache
+  %(prog)s --matrix wallets.json --network ws://127.0.0.1:9944 --no-cache
+
+Matrix file: [{"wallet": "name:hotkey", "netuids": [98]}, {"hotkey": "5F...", "label": "validator"}]
+        """,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("-w", "--wallet", action="append", default=[], help="Wallet name[:hotkey], repeatable")
+    parser.add_argument("--hotkey-ss58", action="append", default=[], help="Raw hotkey address, repeatable")
+    parser.add_argument("--coldkey-ss58", action="append", default=[], help="Raw coldkey address, repeatable")
+    parser.add_argument("-n", "--netuids", nargs="+", type=int, default=[DEFAULT_NETUID], help="Subnets to check")
+    parser.add_argument("--matrix", help="JSON file of wallet/address entries")
+    parser.add_argument("--wallet-path", help="Wallet directory (default: ~/.bittensor/wallets)")
+    parser.add_argument("--network", default="finney", help="Network name or ws:// endpoint (default: %(default)s)")
+    parser.add_argument("--block", type=int, help="Report at this block instead of the chain head (implies --no-cache)")
+    parser.add_argument("--no-cache", action="store_true", help="Read everything from the chain")
+    parser.add_argument(
+        "--cache-dir", default=str(DEFAULT_CACHE_DIR), help="metagraph_cache directory (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--ttl", type=float, default=DEFAULT_TTL, help="Max snapshot age in seconds (default: %(default)s)"
+    )
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+
+    args = parser.parse_args()
+
+    targets = load_matrix(args.matrix, args.netuids, args.wallet_path) if args.matrix else []
+    wallets = args.wallet
+    if not (wallets or targets or args.hotkey_ss58 or args.coldkey_ss58):
+        wallets = [DEFAULT_WALLET]
+    targets += [wallet_target(spec, args.netuids, args.wallet_path) for spec in wallets]
+    targets += [Target(address, None, address, args.netuids) for address in args.hotkey_ss58]
+    targets += [Target(address, address, None, []) for address in args.coldkey_ss58]
+
+    try:
+        cache = None if args.no_cache else SnapshotCache(args.network, Path(args.cache_dir), args.ttl)
+        block, rows = asyncio.run(run_report(args.network, targets, args.block, cache))
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(format_json(block, rows) if args.json else format_table(block, rows))
 
-# Check TAO balance
-balance = subtensor.get_balance(wallet.coldkeypub.ss58_address)
-print(f"Wallet TAO Balance: {balance}")
 
-# Check stake in netuid 98
-netuid = 98
-stake = subtensor.get_stake_for_hotkey(netuid=netuid, hotkey_ss58=wallet.hotkey.ss58_address)
-print(f"Stake in netuid {netuid}: {stake}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+# bittensor-latest/metagraph_cache.py
+"""
+Local snapshot cache of a subnet's metagraph, stakes and coldkey balances.
+
+Key features:
+- One snapshot per (network, netuid): uid-aligned NumPy arrays (uids, hotkeys, coldkeys, alpha/tao/total
+  stake and the coldkey's free balance, amounts in rao) saved as .npy and opened memory-mapped.
+- Keyed by block height: each snapshot lives in its own v<block>.<pid>.<n>/ and a `current` symlink is
+  swapped atomically before anything old is removed, so readers never see a half-written or missing snapshot.
+- TTL (default: one block, 12s): lookups within the TTL never touch the chain; hotkey/coldkey/uid
+  lookups are dict + array indexing, i.e. microseconds.
+- Incremental refresh: nothing is fetched beyond the head block number when the chain has not moved;
+  balances of already-known coldkeys are fetched concurrently with the metagraph and only new coldkeys
+  need a second batch; arrays that did not change are hard-linked from the previous snapshot
+  instead of rewritten.
+- --watch refreshes once per TTL, for dashboards polling the same questions every few seconds.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+from pathlib import Path
+import re
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import bittensor
+import numpy as np
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "bittensor-snapshots"
+DEFAULT_TTL = 12.0  # one block
+KEEP_VERSIONS = 2
+RAO_PER_TAO = 1e9
+
+# name -> dtype of the uid-aligned arrays; amounts are rao (int64 holds the whole TAO supply)
+ARRAYS = {
+    "uids": np.int32,
+    "hotkeys": np.bytes_,
+    "coldkeys": np.bytes_,
+    "alpha_stake": np.int64,
+    "tao_stake": np.int64,
+    "total_stake": np.int64,
+    "balances": np.int64,
+}
+
+
+class MetagraphSnapshot:
+    """A memory-mapped snapshot of one subnet at one block."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        self.block: int = self.meta["block"]
+        self.netuid: int = self.meta["netuid"]
+        self.arrays: Dict[str, np.ndarray] = {
+            name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in ARRAYS
+        }
+        self.uids = self.arrays["uids"]
+        self.hotkeys = self.arrays["hotkeys"]
+        self.coldkeys = self.arrays["coldkeys"]
+        self.alpha_stake = self.arrays["alpha_stake"]
+        self.tao_stake = self.arrays["tao_stake"]
+        self.total_stake = self.arrays["total_stake"]
+        self.balances = self.arrays["balances"]
+        # Index once per load; a subnet has at most a few thousand uids
+        self._uid_by_hotkey = {hotkey.decode(): i for i, hotkey in enumerate(self.hotkeys.tolist())}
+        self._balance_by_coldkey = dict(zip((c.decode() for c in self.coldkeys.tolist()), self.balances.tolist()))
+
+    @property
+    def fetched_at(self) -> float:
+        return self.meta["fetched_at"]
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def __len__(self) -> int:
+        return len(self.uids)
+
+    def uid(self, hotkey: str) -> Optional[int]:
+        return self._uid_by_hotkey.get(hotkey)
+
+    def stake(self, hotkey: str) -> Optional[float]:
+        """Total stake on a registered hotkey in the subnet's alpha; None if not registered."""
+        uid = self._uid_by_hotkey.get(hotkey)
+        return None if uid is None else int(self.total_stake[uid]) / RAO_PER_TAO
+
+    def alpha(self, hotkey: str) -> Optional[float]:
+        """Alpha staked on a registered hotkey (TotalHotkeyAlpha); None if not registered."""
+        uid = self._uid_by_hotkey.get(hotkey)
+        return None if uid is None else int(self.alpha_stake[uid]) / RAO_PER_TAO
+
+    def balance(self, coldkey: str) -> Optional[float]:
+        """Free TAO balance of a coldkey owning a uid on the subnet; None for other coldkeys."""
+        rao = self._balance_by_coldkey.get(coldkey)
+        return None if rao is None else rao / RAO_PER_TAO
+
+    def neuron(self, uid: int) -> Dict:
+        return {
+            "uid": int(self.uids[uid]),
+            "hotkey": self.hotkeys[uid].decode(),
+            "coldkey": self.coldkeys[uid].decode(),
+            "alpha_stake": int(self.alpha_stake[uid]) / RAO_PER_TAO,
+            "tao_stake": int(self.tao_stake[uid]) / RAO_PER_TAO,
+            "total_stake": int(self.total_stake[uid]) / RAO_PER_TAO,
+            "balance": int(self.balances[uid]) / RAO_PER_TAO,
+        }
+
+
+class SnapshotCache:
+    """Snapshots under <cache_dir>/<network>/<netuid>/, refreshed from the chain when older than ttl."""
+
+    def __init__(self, network: str = "finney", cache_dir: Path = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_TTL):
+        self.network = network
+        self.root = Path(cache_dir) / re.sub(r"[^A-Za-z0-9_.-]+", "_", network)
+        self.ttl = ttl
+        self._loaded: Dict[int, MetagraphSnapshot] = {}
+
+    def subnet_dir(self, netuid: int) -> Path:
+        return self.root / str(netuid)
+
+    def load(self, netuid: int) -> Optional[MetagraphSnapshot]:
+        """Current snapshot from disk (reused while the `current` link points at the same directory), or None."""
+        current = self.subnet_dir(netuid) / "current"
+        try:
+            target = os.readlink(current)
+        except OSError:
+            return None
+        loaded = self._loaded.get(netuid)
+        if loaded is not None and loaded.directory.name == target:
+            # Another process may have refreshed the TTL of the same block
+            loaded.meta = json.loads((loaded.directory / "meta.json").read_text(encoding="utf-8"))
+            return loaded
+        self._loaded[netuid] = MetagraphSnapshot(current.parent / target)
+        return self._loaded[netuid]
+
+    def get(self, netuid: int, force: bool = False) -> MetagraphSnapshot:
+        """Snapshot no older than ttl: from disk if fresh, otherwise refreshed from the chain."""
+        snapshot = self.load(netuid)
+        if snapshot is not None and not force and snapshot.age() < self.ttl:
+            return snapshot
+        return asyncio.run(self.refresh_with_client(netuid, force))
+
+    async def get_async(self, client, netuid: int, force: bool = False) -> MetagraphSnapshot:
+        """get() for callers that already hold a Subtensor connection."""
+        snapshot = self.load(netuid)
+        if snapshot is not None and not force and snapshot.age() < self.ttl:
+            return snapshot
+        return await self.refresh(client, netuid, force)
+
+    async def refresh_with_client(self, netuid: int, force: bool = False) -> MetagraphSnapshot:
+        async with bittensor.Subtensor(self.network) as client:
+            return await self.refresh(client, netuid, force)
+
+    async def refresh(self, client, netuid: int, force: bool = False) -> MetagraphSnapshot:
+        previous = self.load(netuid)
+        head = await client.block()
+        if previous is not None and previous.block == head and not force:
+            self._write_meta(previous.directory, dict(previous.meta, fetched_at=time.time()))
+            return self.load(netuid)
+
+        view = await client.at(head)
+        known = sorted({c.decode() for c in previous.coldkeys.tolist()}) if previous is not None else []
+        metagraph, balances = await asyncio.gather(
+            view.subnets.metagraph(netuid, commitments=False),
+            view.balances.balances(known) if known else _empty(),
+        )
+        if metagraph is None:
+            raise ValueError(f"Subnet {netuid} does not exist on {self.network}")
+        new_coldkeys = sorted({n.coldkey for n in metagraph.neurons} - set(balances))
+        if new_coldkeys:
+            balances.update(await view.balances.balances(new_coldkeys))
+
+        neurons = metagraph.neurons
+        columns = {
+            "uids": [n.uid for n in neurons],
+            "hotkeys": [n.hotkey.encode() for n in neurons],
+            "coldkeys": [n.coldkey.encode() for n in neurons],
+            "alpha_stake": [n.alpha_stake.rao for n in neurons],
+            "tao_stake": [n.tao_stake.rao for n in neurons],
+            "total_stake": [n.total_stake.rao for n in neurons],
+            "balances": [balances[n.coldkey].rao for n in neurons],
+        }
+        arrays = {name: np.array(columns[name], dtype=dtype) for name, dtype in ARRAYS.items()}
+        meta = {
+            "network": self.network,
+            "netuid": netuid,
+            "block": head,
+            "fetched_at": time.time(),
+            "new_coldkeys": len(new_coldkeys),
+        }
+        self._publish(netuid, arrays, meta, previous)
+        return self.load(netuid)
+
+    def _publish(self, netuid: int, arrays: Dict[str, np.ndarray], meta: Dict, previous) -> None:
+        """Write v<block>.<pid>.<n>/ (hard-linking unchanged arrays), swap the `current` link, prune old versions."""
+        subnet_dir = self.subnet_dir(netuid)
+        subnet_dir.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(dir=subnet_dir, prefix=".v"))
+        try:
+            changed = []
+            for name, array in arrays.items():
+                if previous is not None and _same(previous.arrays[name], array):
+                    os.link(previous.directory / f"{name}.npy", tmp_dir / f"{name}.npy")
+                else:
+                    np.save(tmp_dir / f"{name}.npy", array)
+                    changed.append(name)
+            self._write_meta(tmp_dir, dict(meta, changed=changed))
+
+            # A unique name per publish: a forced refresh at the same block never touches the directory
+            # `current` still points to until the link has been swapped
+            version_dir = _unique_dir(subnet_dir, f"v{meta['block']}")
+            os.rename(tmp_dir, version_dir)
+            link = subnet_dir / f".current.{os.getpid()}"
+            if link.is_symlink():
+                link.unlink()
+            os.symlink(version_dir.name, link)
+            os.replace(link, subnet_dir / "current")
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        # Only now drop old snapshots, keeping the newest KEEP_VERSIONS (a forced refresh at the same block
+        # counts as newer). Readers that resolved `current` just before the swap still find the previous one,
+        # and processes holding older mmaps keep reading them after the unlink
+        versions = sorted(
+            (p for p in subnet_dir.glob("v*") if p.is_dir()), key=lambda p: (_version_block(p), p.stat().st_mtime_ns)
+        )
+        for old in versions[:-KEEP_VERSIONS]:
+            if old != version_dir:
+                shutil.rmtree(old, ignore_errors=True)
+
+    @staticmethod
+    def _write_meta(directory: Path, meta: Dict) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".meta.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, directory / "meta.json")
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def _version_block(directory: Path) -> int:
+    """v<block> or v<block>.<pid>.<n> -> block"""
+    return int(directory.name[1:].split(".")[0])
+
+
+_publish_counter = itertools.count()
+
+
+def _unique_dir(parent: Path, stem: str) -> Path:
+    """<stem>.<pid>.<n>, with n increasing within the process so a pruned name is never reused by it"""
+    while True:
+        candidate = parent / f"{stem}.{os.getpid()}.{next(_publish_counter)}"
+        if not candidate.exists():
+            return candidate
+
+
+def _same(old: np.ndarray, new: np.ndarray) -> bool:
+    return old.dtype == new.dtype and old.shape == new.shape and bool(np.array_equal(old, new))
+
+
+async def _empty() -> Dict:
+    return {}
+
+
+# ---------------------------
+# CLI
+# ---------------------------
+def lookup(snapshot: MetagraphSnapshot, hotkeys: List[str], coldkeys: List[str]) -> Dict:
+    return {
+        "block": snapshot.block,
+        "age_seconds": round(snapshot.age(), 3),
+        "hotkeys": {hk: {"uid": snapshot.uid(hk), "stake": snapshot.stake(hk)} for hk in hotkeys},
+        "coldkeys": {ck: {"balance": snapshot.balance(ck)} for ck in coldkeys},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cache a subnet's metagraph, stakes and balances locally and answer lookups from it",
+        epilog="""Examples:
+  # Refresh if older than one block and print a summary
+  %(prog)s -n 98
+
+  # Stake of a hotkey and balance of a coldkey, from the cache when fresh
+  %(prog)s -n 98 --hotkey 5F... --coldkey 5G... --json
+
+  # Keep the snapshot fresh for dashboards
+  %(prog)s -n 98 --watch --network test
+        """,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("-n", "--netuid", type=int, required=True, help="Subnet to cache")
+    parser.add_argument("--network", default="finney", help="Network name or ws:// endpoint (default: %(default)s)")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="Snapshot directory (default: %(default)s)")
+    parser.add_argument(
+        "--ttl", type=float, default=DEFAULT_TTL, help="Max snapshot age in seconds (default: %(default)s)"
+    )
+    parser.add_argument("--hotkey", action="append", default=[], help="Hotkey to look up, repeatable")
+    parser.add_argument("--coldkey", action="append", default=[], help="Coldkey to look up, repeatable")
+    parser.add_argument("--force", action="store_true", help="Refresh even if the snapshot is fresh")
+    parser.add_argument("--watch", action="store_true", help="Refresh every --ttl seconds until interrupted")
+    parser.add_argument("--json", action="store_true", help="Print lookups as JSON")
+
+    args = parser.parse_args()
+    cache = SnapshotCache(args.network, Path(args.cache_dir), args.ttl)
+
+    try:
+        if args.watch:
+            while True:
+                start = time.perf_counter()
+                snapshot = cache.get(args.netuid, args.force)
+                print(
+                    f"🔄 block {snapshot.block}: {len(snapshot)} uids, "
+                    f"changed: {', '.join(snapshot.meta.get('changed', [])) or 'none'} "
+                    f"({time.perf_counter() - start:.2f}s)"
+                )
+                time.sleep(max(0.0, args.ttl - snapshot.age()))
+
+        snapshot = cache.get(args.netuid, args.force)
+    except KeyboardInterrupt:
+        return
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.hotkey or args.coldkey:
+        result = lookup(snapshot, args.hotkey, args.coldkey)
+        if args.json:
+            print(json.dumps(result, indent=2))
+            return
+        for hotkey, row in result["hotkeys"].items():
+            print(f"{hotkey}: uid={row['uid']} stake={row['stake']}")
+        for coldkey, row in result["coldkeys"].items():
+            print(f"{coldkey}: balance={row['balance']}")
+        return
+
+    print(f"📊 netuid {snapshot.netuid} at block {snapshot.block} ({snapshot.age():.1f}s old): {len(snapshot)} uids")
+    print(f"   total stake: {int(snapshot.total_stake.sum()) / RAO_PER_TAO:,.4f}")
+    print(f"   snapshot: {snapshot.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# git_mirror/__main__.py
+"""
+Mirror every repository of a GitHub organization or GitLab group (including subgroups).
+
+Usage: python -m git_mirror [--forge github|gitlab] [--owner NAME] [-j 8] [--force] [--resume] ...
+Defaults for forge, owner, token and clone directory come from git_mirror/.env (see .env.example).
+"""
+
+import argparse
+import os
+
+from .forges import FORGES
+from .gitops import LARGE_MODES
+from .scheduler import DEFAULT_JOBS
+from .scheduler import STATE_FILE
+from .scheduler import mirror_repos
+from .scheduler import report
+from .settings import MirrorSettings
+
+# ETag/Last-Modified cache of API pages, so unchanged listings cost only 304s
+API_CACHE_FILE = ".api_cache.json"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Clone or update all repositories of a GitHub org or GitLab group")
+    parser.add_argument("--forge", choices=sorted(FORGES), help="Forge provider (default: FORGE from .env)")
+    parser.add_argument("--owner", help="GitHub organization or GitLab group id/path (default: OWNER from .env)")
+    parser.add_argument("--clone-dir", help="Target directory (default: CLONE_DIR from .env)")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=DEFAULT_JOBS, help="Parallel git clone/fetch jobs (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help=f"Sync every repo, even if unchanged according to {STATE_FILE}"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=f"Skip repos whose last sync succeeded (see {STATE_FILE}), even if changed on the forge",
+    )
+    parser.add_argument("--no-api-cache", action="store_true", help=f"Do not use {API_CACHE_FILE} for the repo listing")
+    parser.add_argument("--depth", type=int, help="Shallow clone with this many commits")
+    parser.add_argument("--filter", dest="filter_spec", help="Partial clone filter, e.g. blob:none")
+    parser.add_argument("--reference", dest="reference_dir", help="Directory of bare mirrors shared across runs")
+    parser.add_argument(
+        "--large-threshold-mb", type=int, help="Repos larger than this (API size) use --large-mode automatically"
+    )
+    parser.add_argument(
+        "--large-mode",
+        choices=sorted(LARGE_MODES),
+        default="partial",
+        help="Clone mode for large repos: partial (blob:none) or shallow (depth 1) (default: %(default)s)",
+    )
+    return parser, parser.parse_args()
+
+
+def main():
+    parser, args = parse_args()
+    settings = MirrorSettings()
+    forge_name = args.forge or settings.FORGE
+    owner = args.owner or settings.OWNER
+    clone_dir = args.clone_dir or settings.CLONE_DIR
+    if not owner:
+        parser.error("--owner or OWNER in .env is required")
+    if not clone_dir:
+        parser.error("--clone-dir or CLONE_DIR in .env is required")
+    clone_dir = os.path.abspath(clone_dir)
+
+    forge_kwargs = {"api_url": settings.API_URL}
+    if forge_name == "gitlab":
+        # Project sizes are only requested when needed for size-based routing
+        forge_kwargs["statistics"] = args.large_threshold_mb is not None
+    forge = FORGES[forge_name](owner, settings.TOKEN, **forge_kwargs)
+
+    # Streamed: cloning starts as soon as the first API page arrives
+    repos = forge.iter_repos(None if args.no_api_cache else os.path.join(clone_dir, API_CACHE_FILE))
+    results, skipped, resumed = mirror_repos(
+        repos,
+        clone_dir,
+        jobs=args.jobs,
+        force=args.force,
+        resume=args.resume,
+        depth=args.depth,
+        filter_spec=args.filter_spec,
+        reference_dir=os.path.abspath(args.reference_dir) if args.reference_dir else None,
+        large_threshold_mb=args.large_threshold_mb,
+        large_mode=args.large_mode,
+    )
+    report(results, skipped, resumed)
+
+
+if __name__ == "__main__":
+    main()
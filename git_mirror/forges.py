@@ -0,0 +1,277 @@
+# git_mirror/forges.py
+"""
+Forge providers: list the repositories to mirror.
+
+- Forge is the plug-in interface: a provider turns one API listing into RemoteRepo records.
+- GitHubForge lists an organization, GitLabForge a group including its subgroups.
+- Pages are fetched with asyncio over one pooled httpx.AsyncClient (HTTP/2 if h2 is installed):
+  page 1 first, then the remaining pages concurrently once the page count is known.
+- iter_repos streams repos page by page as they arrive, so the scheduler can start cloning
+  before the listing is complete.
+- ETag/Last-Modified of every page are kept with its body in a JSON cache; reruns send
+  conditional requests and reuse the cached body on 304.
+"""
+
+import asyncio
+from dataclasses import dataclass
+import json
+import os
+import queue
+import re
+import tempfile
+import threading
+from typing import AsyncIterator
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from urllib.parse import quote
+
+import httpx
+
+PER_PAGE = 100
+DEFAULT_CONCURRENCY = 8
+
+
+@dataclass
+class RemoteRepo:
+    name: str  # relative directory under CLONE_DIR
+    clone_url: str
+    size_kb: Optional[int]
+    updated_at: Optional[str]  # GitHub pushed_at / GitLab last_activity_at
+
+
+class ConditionalCache:
+    """url -> {"etag", "last_modified", "body", "page_count"} persisted as JSON."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        if path:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def request_headers(self, url: str) -> Dict[str, str]:
+        entry = self.entries.get(url) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, response: httpx.Response, body, page_count: Optional[int]) -> None:
+        self.entries[url] = {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "body": body,
+            "page_count": page_count,
+        }
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".api_cache.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def _has_http2() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class Forge:
+    """
+    Provider interface. Subclasses define the API base URL, auth headers, the paged listing URL,
+    how the page count is read from a response, and how one item becomes a RemoteRepo.
+    """
+
+    default_api_url = ""
+
+    def __init__(self, owner: str, token: str, *, api_url: Optional[str] = None, concurrency=DEFAULT_CONCURRENCY):
+        self.owner = owner
+        self.token = token
+        self.api_url = api_url or self.default_api_url
+        self.concurrency = concurrency
+
+    # ---------------------------
+    # Provider hooks
+    # ---------------------------
+    def headers(self) -> Dict[str, str]:
+        raise NotImplementedError
+
+    def page_url(self, page: int) -> str:
+        raise NotImplementedError
+
+    def page_count(self, response: httpx.Response) -> Optional[int]:
+        raise NotImplementedError
+
+    def to_repo(self, item: Dict) -> RemoteRepo:
+        raise NotImplementedError
+
+    async def prepare(self, client: httpx.AsyncClient, cache: ConditionalCache) -> None:
+        """Optional extra lookups before listing (e.g. the GitLab group path)."""
+
+    # ---------------------------
+    # Listing
+    # ---------------------------
+    async def fetch(self, client: httpx.AsyncClient, cache: ConditionalCache, url: str) -> Tuple[object, Optional[int]]:
+        """Return (json body, page count) for one URL, from the cache on 304 Not Modified."""
+        response = await client.get(url, headers=cache.request_headers(url))
+        if response.status_code == 304:
+            entry = cache.entries[url]
+            return entry["body"], entry.get("page_count")
+        response.raise_for_status()
+        body = response.json()
+        count = self.page_count(response)
+        cache.store(url, response, body, count)
+        return body, count
+
+    async def iter_pages_async(self, cache_path: Optional[str] = None) -> AsyncIterator[Tuple[int, List[RemoteRepo]]]:
+        """Yield (page number, repos) as soon as each page arrives (page 1 first, then the rest in completion order)."""
+        cache = ConditionalCache(cache_path)
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(
+            base_url=self.api_url, headers=self.headers(), limits=limits, timeout=30, http2=_has_http2()
+        ) as client:
+            await self.prepare(client, cache)
+            first, count = await self.fetch(client, cache, self.page_url(1))
+            yield 1, [self.to_repo(item) for item in first]
+            count = count or 1
+            last = first
+
+            async def numbered(page):
+                body, _ = await self.fetch(client, cache, self.page_url(page))
+                return page, body
+
+            for future in asyncio.as_completed([numbered(p) for p in range(2, count + 1)]):
+                page, body = await future
+                if page == count:
+                    last = body
+                yield page, [self.to_repo(item) for item in body]
+
+            # A cached page 1 can hide repos added since (or no count was sent); keep going while pages are full
+            while len(last) == PER_PAGE:
+                count += 1
+                last, _ = await self.fetch(client, cache, self.page_url(count))
+                yield count, [self.to_repo(item) for item in last]
+
+        cache.save()
+
+    async def list_repos_async(self, cache_path: Optional[str] = None) -> List[RemoteRepo]:
+        pages = sorted([(number, repos) async for number, repos in self.iter_pages_async(cache_path)])
+        return [repo for _, repos in pages for repo in repos]
+
+    def list_repos(self, cache_path: Optional[str] = None) -> List[RemoteRepo]:
+        return asyncio.run(self.list_repos_async(cache_path))
+
+    def iter_repos(self, cache_path: Optional[str] = None) -> Iterator[RemoteRepo]:
+        """
+        Stream repos to a synchronous consumer while the listing runs on an event loop in a background
+        thread, so cloning starts with page 1 instead of after the last page. Listing errors are re-raised.
+        """
+        pages: queue.Queue = queue.Queue()
+        done = object()
+
+        async def produce():
+            async for _, repos in self.iter_pages_async(cache_path):
+                pages.put(repos)
+
+        def run():
+            try:
+                asyncio.run(produce())
+            except BaseException as e:
+                pages.put(e)
+            pages.put(done)
+
+        thread = threading.Thread(target=run, name="forge-listing", daemon=True)
+        thread.start()
+        while (page := pages.get()) is not done:
+            if isinstance(page, BaseException):
+                raise page
+            yield from page
+        thread.join()
+
+
+class GitHubForge(Forge):
+    """All repositories of a GitHub organization."""
+
+    default_api_url = "https://api.github.com"
+    _last_page_re = re.compile(r'[?&]page=(\d+)[^>]*>;\s*rel="last"')
+
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"token {self.token}", "Accept": "application/vnd.github.v3+json"}
+
+    def page_url(self, page: int) -> str:
+        return f"/orgs/{self.owner}/repos?type=all&per_page={PER_PAGE}&page={page}"
+
+    def page_count(self, response: httpx.Response) -> Optional[int]:
+        match = self._last_page_re.search(response.headers.get("link") or "")
+        return int(match.group(1)) if match else None
+
+    def to_repo(self, item: Dict) -> RemoteRepo:
+        return RemoteRepo(
+            name=item["name"], clone_url=item["ssh_url"], size_kb=item.get("size"), updated_at=item.get("pushed_at")
+        )
+
+
+class GitLabForge(Forge):
+    """All projects of a GitLab group, including subgroups (cloned into matching subdirectories)."""
+
+    default_api_url = "https://gitlab.com"
+
+    def __init__(self, *args, statistics: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.statistics = statistics
+        self.group_path = None
+
+    def headers(self) -> Dict[str, str]:
+        return {"PRIVATE-TOKEN": self.token}
+
+    def _group_url(self) -> str:
+        return f"/api/v4/groups/{quote(str(self.owner), safe='')}"
+
+    async def prepare(self, client: httpx.AsyncClient, cache: ConditionalCache) -> None:
+        # Subgroup projects are placed relative to the top group's full path
+        group, _ = await self.fetch(client, cache, self._group_url() + "?with_projects=false")
+        self.group_path = group["full_path"]
+
+    def page_url(self, page: int) -> str:
+        query = f"include_subgroups=true&per_page={PER_PAGE}&page={page}"
+        if self.statistics:
+            query += "&statistics=true"
+        return f"{self._group_url()}/projects?{query}"
+
+    def page_count(self, response: httpx.Response) -> Optional[int]:
+        # GitLab omits X-Total-Pages for very large collections
+        return int(response.headers.get("x-total-pages") or 0) or None
+
+    def to_repo(self, item: Dict) -> RemoteRepo:
+        full_path = item["path_with_namespace"]
+        prefix = f"{self.group_path}/"
+        name = full_path[len(prefix) :] if self.group_path and full_path.startswith(prefix) else item["path"]
+        size = (item.get("statistics") or {}).get("repository_size")
+        return RemoteRepo(
+            name=name,
+            clone_url=item["ssh_url_to_repo"],
+            size_kb=size // 1024 if size is not None else None,
+            updated_at=item.get("last_activity_at"),
+        )
+
+
+FORGES = {"github": GitHubForge, "gitlab": GitLabForge}
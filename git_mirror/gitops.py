@@ -0,0 +1,80 @@
+# git_mirror/gitops.py
+"""
+git operations for one repository: clone a missing repo, or fetch and fast-forward an existing one.
+
+- --depth/--filter are passed through; repos above a size threshold get a cheaper clone mode automatically.
+- With a reference directory, a bare mirror per repo is kept there and borrowed via --reference-if-able,
+  so reclones download only new objects.
+"""
+
+import os
+import subprocess
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from .forges import RemoteRepo
+
+# Cheaper clone mode applied automatically to repos above --large-threshold-mb
+LARGE_MODES = {"partial": ["--filter=blob:none"], "shallow": ["--depth", "1"]}
+
+
+def run_git(args: List[str]) -> Tuple[int, str]:
+    result = subprocess.run(["git"] + args, capture_output=True, text=True)
+    return result.returncode, (result.stderr or result.stdout).strip()
+
+
+def clone_options(size_kb, depth=None, filter_spec=None, large_threshold_mb=None, large_mode="partial") -> List[str]:
+    """git clone flags for one repo; repos larger than the threshold get the cheaper large_mode."""
+    options = []
+    if depth:
+        options += ["--depth", str(depth)]
+    if filter_spec:
+        options += [f"--filter={filter_spec}"]
+    if not options and large_threshold_mb is not None and size_kb and size_kb > large_threshold_mb * 1024:
+        options += LARGE_MODES[large_mode]
+    return options
+
+
+def reference_options(name: str, url: str, reference_dir: Optional[str]) -> List[str]:
+    """Keep a bare mirror per repo in reference_dir and borrow its objects, so reruns download only new objects."""
+    if not reference_dir:
+        return []
+    mirror = os.path.join(reference_dir, f"{name}.git")
+    if os.path.isdir(mirror):
+        code, message = run_git(["-C", mirror, "fetch", "--prune", "--quiet"])
+    else:
+        os.makedirs(os.path.dirname(mirror), exist_ok=True)
+        code, message = run_git(["clone", "--mirror", "--quiet", url, mirror])
+    if code != 0:
+        print(f"Warning: reference mirror for {name} not updated: {message}")
+    # --reference-if-able tolerates a missing mirror instead of failing the clone
+    return ["--reference-if-able", mirror]
+
+
+def sync_repo(
+    repo: RemoteRepo,
+    clone_dir: str,
+    depth=None,
+    filter_spec=None,
+    reference_dir=None,
+    large_threshold_mb=None,
+    large_mode="partial",
+) -> Tuple[str, str]:
+    """Clone a missing repo, or fetch and fast-forward an existing one. Returns (status, message)."""
+    path = os.path.join(clone_dir, repo.name)
+
+    if os.path.isdir(os.path.join(path, ".git")):
+        # Shallow clones stay shallow; partial clones keep their filter from the repo config
+        fetch = ["-C", path, "fetch", "--all", "--prune", "--quiet"]
+        if os.path.exists(os.path.join(path, ".git", "shallow")):
+            fetch += ["--depth", str(depth or 1)]
+        code, message = run_git(fetch)
+        if code == 0:
+            code, message = run_git(["-C", path, "merge", "--ff-only", "--quiet", "@{upstream}"])
+        return ("updated" if code == 0 else "failed"), message
+
+    options = clone_options(repo.size_kb, depth, filter_spec, large_threshold_mb, large_mode)
+    options += reference_options(repo.name, repo.clone_url, reference_dir)
+    code, message = run_git(["clone", "--quiet"] + options + [repo.clone_url, path])
+    return ("cloned" if code == 0 else "failed"), message
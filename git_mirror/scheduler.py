@@ -0,0 +1,136 @@
+# git_mirror/scheduler.py
+"""
+Shared scheduler for clone/fetch work across forges.
+
+- Repos are synced concurrently on a thread pool (git does the heavy lifting in subprocesses).
+- A state file in CLONE_DIR records each repo's forge timestamp (pushed_at / last_activity_at) and
+  last status; repos whose timestamp is unchanged since a successful sync are skipped without running git.
+- The state file is rewritten atomically after every result, so an interrupted run loses nothing;
+  --resume skips repos whose last sync succeeded, regardless of their forge timestamp.
+- Repos are scheduled as they stream in from the forge listing, so cloning overlaps pagination.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import tempfile
+import threading
+from typing import Dict
+from typing import Iterable
+from typing import Tuple
+
+from .forges import RemoteRepo
+from .gitops import sync_repo
+
+STATE_FILE = ".mirror_state.json"
+DEFAULT_JOBS = 8
+
+
+class MirrorState:
+    """name -> {"updated_at", "status"} persisted as JSON."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def is_current(self, repo: RemoteRepo, clone_dir: str) -> bool:
+        entry = self.entries.get(repo.name)
+        return bool(
+            entry
+            and repo.updated_at
+            and entry.get("updated_at") == repo.updated_at
+            and entry.get("status") != "failed"
+            and os.path.isdir(os.path.join(clone_dir, repo.name))
+        )
+
+    def succeeded(self, repo: RemoteRepo, clone_dir: str) -> bool:
+        entry = self.entries.get(repo.name)
+        return bool(
+            entry and entry.get("status") in ("cloned", "updated") and os.path.isdir(os.path.join(clone_dir, repo.name))
+        )
+
+    def record(self, repo: RemoteRepo, status: str) -> None:
+        with self._lock:
+            self.entries[repo.name] = {"updated_at": repo.updated_at, "status": status}
+            self.save()
+
+    def save(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".mirror_state.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def mirror_repos(
+    repos: Iterable[RemoteRepo], clone_dir: str, jobs=DEFAULT_JOBS, force=False, resume=False, **sync_kwargs
+) -> Tuple[Dict[str, Tuple[str, str]], int, int]:
+    """
+    Sync repos into clone_dir. repos may be a stream (Forge.iter_repos): each repo is queued on the pool
+    as soon as it arrives. With resume, repos whose last sync succeeded are skipped even if their forge
+    timestamp changed, to finish an interrupted run quickly. sync_kwargs are passed to sync_repo
+    (depth, filter_spec, reference_dir, large_threshold_mb, large_mode).
+    Returns ({name: (status, message)}, repos skipped as unchanged, repos skipped by resume).
+    """
+    os.makedirs(clone_dir, exist_ok=True)
+    if sync_kwargs.get("reference_dir"):
+        os.makedirs(sync_kwargs["reference_dir"], exist_ok=True)
+    state = MirrorState(os.path.join(clone_dir, STATE_FILE))
+
+    skipped = 0
+    resumed = 0
+    results = {}
+    lock = threading.Lock()
+
+    def worker(repo):
+        try:
+            status, message = sync_repo(repo, clone_dir, **sync_kwargs)
+        except Exception as e:
+            status, message = "failed", str(e)
+        state.record(repo, status)
+        with lock:
+            results[repo.name] = (status, message)
+            print(f"{status:<8} {repo.name}")
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        try:
+            futures = []
+            for repo in repos:
+                if not force and state.is_current(repo, clone_dir):
+                    skipped += 1
+                elif resume and not force and state.succeeded(repo, clone_dir):
+                    resumed += 1
+                else:
+                    futures.append(executor.submit(worker, repo))
+            for future in futures:
+                future.result()
+        except KeyboardInterrupt:
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+
+    return results, skipped, resumed
+
+
+def report(results: Dict[str, Tuple[str, str]], skipped=0, resumed=0) -> None:
+    counts = {}
+    for status, _ in results.values():
+        counts[status] = counts.get(status, 0) + 1
+    print("\nSummary:")
+    for status in ("cloned", "updated", "failed"):
+        print(f"   {status.capitalize():<9} {counts.get(status, 0)}")
+    print(f"   Unchanged {skipped}")
+    if resumed:
+        print(f"   Resumed   {resumed}")
+    for name, (status, message) in sorted(results.items()):
+        if status == "failed":
+            print(f"   ❌ {name}: {message}")
@@ -0,0 +1,20 @@
+# git_mirror/settings.py
+from pathlib import Path
+from typing import Optional
+
+from pydantic_settings import BaseSettings
+
+
+class MirrorSettings(BaseSettings):
+    ENVIRONMENT_NAME: str = "dev"
+    FORGE: str = "github"  # github | gitlab
+    TOKEN: str
+    # OWNER and CLONE_DIR may instead be given as --owner / --clone-dir
+    OWNER: Optional[str] = None  # GitHub organization name or GitLab group id/path
+    CLONE_DIR: Optional[str] = None
+    API_URL: Optional[str] = None  # defaults to the public forge API
+
+    class Config:
+        # Next to this file (see .env.example), whatever the working directory of `python -m git_mirror`
+        env_file = Path(__file__).parent / ".env"
+        env_file_encoding = "utf-8"
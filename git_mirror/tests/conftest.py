@@ -0,0 +1,38 @@
+# git_mirror/tests/conftest.py
+import subprocess
+
+import pytest
+
+from git_mirror.forges import RemoteRepo
+
+
+def git(*args, cwd=None) -> str:
+    result = subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.strip()
+
+
+@pytest.fixture
+def make_remote(tmp_path):
+    """Factory: a bare repo with a few commits, served as a file:// URL (so --depth/--filter apply)."""
+
+    def make(name: str, commits: int = 3) -> RemoteRepo:
+        work = tmp_path / "work" / name
+        work.mkdir(parents=True)
+        git("init", "-q", "-b", "main", cwd=work)
+        for i in range(commits):
+            (work / "file.txt").write_text(f"{name} revision {i}\n" * 100)
+            git("add", "file.txt", cwd=work)
+            git("commit", "-q", "-m", f"commit {i}", cwd=work)
+        bare = tmp_path / "remotes" / f"{name}.git"
+        git("clone", "-q", "--bare", str(work), str(bare))
+        git("config", "uploadpack.allowFilter", "true", cwd=bare)
+        return RemoteRepo(name=name, clone_url=bare.as_uri(), size_kb=None, updated_at="t1")
+
+    make.work_dir = lambda name: tmp_path / "work" / name
+    return make
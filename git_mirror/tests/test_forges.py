@@ -0,0 +1,103 @@
+# git_mirror/tests/test_forges.py
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+import json
+import threading
+import time
+from urllib.parse import parse_qs
+from urllib.parse import urlparse
+
+import pytest
+
+from git_mirror.forges import PER_PAGE
+from git_mirror.forges import GitHubForge
+
+PAGES = 3
+REPOS = 2 * PER_PAGE + 5
+
+
+class StubGitHub(ThreadingHTTPServer):
+    """Paginated /orgs/<org>/repos with Link headers and ETags; counts requests, 304s and concurrency."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(0.05)  # long enough for concurrent page requests to overlap
+            page = int(parse_qs(urlparse(self.path).query)["page"][0])
+            etag = f'"page-{page}"'
+            if self.headers.get("If-None-Match") == etag:
+                with server.lock:
+                    server.not_modified += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            first = (page - 1) * PER_PAGE
+            items = [
+                {"name": f"repo{i}", "ssh_url": f"git@example.com:org/repo{i}.git", "size": i, "pushed_at": "t"}
+                for i in range(first, min(first + PER_PAGE, REPOS))
+            ]
+            body = json.dumps(items).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.send_header("Link", f'<{server.url}/orgs/org/repos?per_page={PER_PAGE}&page={PAGES}>; rel="last"')
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+@pytest.fixture
+def stub():
+    server = StubGitHub()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_pages_fetched_concurrently_and_reused_on_304(stub, tmp_path):
+    cache_path = str(tmp_path / ".api_cache.json")
+
+    first = GitHubForge("org", "token", api_url=stub.url).list_repos(cache_path)
+    assert [repo.name for repo in first] == [f"repo{i}" for i in range(REPOS)]
+    assert stub.requests == PAGES
+    assert stub.max_in_flight > 1  # pages 2..N were requested together
+
+    stub.requests = 0
+    second = GitHubForge("org", "token", api_url=stub.url).list_repos(cache_path)
+    assert stub.requests == PAGES
+    assert stub.not_modified == PAGES
+    assert second == first
+
+
+def test_iter_repos_streams_every_repo(stub):
+    repos = list(GitHubForge("org", "token", api_url=stub.url).iter_repos())
+    assert sorted(repo.name for repo in repos) == sorted(f"repo{i}" for i in range(REPOS))
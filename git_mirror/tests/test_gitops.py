@@ -0,0 +1,52 @@
+# git_mirror/tests/test_gitops.py
+from git_mirror.gitops import LARGE_MODES
+from git_mirror.gitops import clone_options
+from git_mirror.gitops import sync_repo
+from git_mirror.tests.conftest import git
+
+
+def test_depth_gives_a_shallow_clone(make_remote, tmp_path):
+    repo = make_remote("shallow")
+    status, message = sync_repo(repo, str(tmp_path / "clones"), depth=1)
+    assert status == "cloned", message
+    clone = tmp_path / "clones" / "shallow"
+    assert (clone / ".git" / "shallow").exists()
+    assert git("rev-list", "--count", "HEAD", cwd=clone) == "1"
+
+
+def test_blob_none_sets_partial_clone_filter(make_remote, tmp_path):
+    repo = make_remote("partial")
+    status, message = sync_repo(repo, str(tmp_path / "clones"), filter_spec="blob:none")
+    assert status == "cloned", message
+    clone = tmp_path / "clones" / "partial"
+    assert git("config", "remote.origin.partialclonefilter", cwd=clone) == "blob:none"
+
+
+def test_reference_writes_alternates(make_remote, tmp_path):
+    repo = make_remote("referenced")
+    reference_dir = tmp_path / "reference"
+    status, message = sync_repo(repo, str(tmp_path / "clones"), reference_dir=str(reference_dir))
+    assert status == "cloned", message
+    alternates = tmp_path / "clones" / "referenced" / ".git" / "objects" / "info" / "alternates"
+    assert (reference_dir / "referenced.git").is_dir()
+    assert str(reference_dir / "referenced.git") in alternates.read_text()
+
+
+def test_size_threshold_routes_to_large_mode(make_remote, tmp_path):
+    assert clone_options(2048, large_threshold_mb=1, large_mode="shallow") == LARGE_MODES["shallow"]
+    assert clone_options(2048, large_threshold_mb=1, large_mode="partial") == LARGE_MODES["partial"]
+    assert clone_options(512, large_threshold_mb=1, large_mode="shallow") == []
+    assert clone_options(None, large_threshold_mb=1) == []
+    # Explicit --depth/--filter win over the automatic mode
+    assert clone_options(2048, depth=5, large_threshold_mb=1, large_mode="partial") == ["--depth", "5"]
+
+    large = make_remote("large")
+    large.size_kb = 2048
+    small = make_remote("small")
+    small.size_kb = 10
+    clones = tmp_path / "clones"
+    for repo in (large, small):
+        status, message = sync_repo(repo, str(clones), large_threshold_mb=1, large_mode="shallow")
+        assert status == "cloned", message
+    assert (clones / "large" / ".git" / "shallow").exists()
+    assert not (clones / "small" / ".git" / "shallow").exists()
@@ -0,0 +1,75 @@
+# git_mirror/tests/test_scheduler.py
+import threading
+import time
+
+from git_mirror import scheduler
+from git_mirror.forges import RemoteRepo
+from git_mirror.scheduler import mirror_repos
+from git_mirror.tests.conftest import git
+
+
+def test_repos_sync_concurrently(make_remote, tmp_path, monkeypatch):
+    repos = [make_remote(f"repo{i}") for i in range(4)]
+    lock = threading.Lock()
+    in_flight = {"now": 0, "max": 0}
+    real_sync = scheduler.sync_repo
+
+    def tracking_sync(*args, **kwargs):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        try:
+            time.sleep(0.1)
+            return real_sync(*args, **kwargs)
+        finally:
+            with lock:
+                in_flight["now"] -= 1
+
+    monkeypatch.setattr(scheduler, "sync_repo", tracking_sync)
+    results, skipped, resumed = mirror_repos(iter(repos), str(tmp_path / "clones"), jobs=4)
+
+    assert {name: status for name, (status, _) in results.items()} == {repo.name: "cloned" for repo in repos}
+    assert in_flight["max"] > 1
+
+
+def test_rerun_fetches_new_commits(make_remote, tmp_path):
+    repo = make_remote("project")
+    clone_dir = str(tmp_path / "clones")
+    results, _, _ = mirror_repos([repo], clone_dir)
+    assert results["project"][0] == "cloned"
+
+    # Unchanged forge timestamp: no git at all
+    results, skipped, _ = mirror_repos([repo], clone_dir)
+    assert (results, skipped) == ({}, 1)
+
+    work = make_remote.work_dir("project")
+    (work / "new.txt").write_text("new\n")
+    git("add", "new.txt", cwd=work)
+    git("commit", "-q", "-m", "new commit", cwd=work)
+    git("push", "-q", repo.clone_url, "main", cwd=work)
+    repo.updated_at = "t2"
+
+    results, skipped, _ = mirror_repos([repo], clone_dir)
+    assert results["project"][0] == "updated", results["project"][1]
+    assert skipped == 0
+    clone = tmp_path / "clones" / "project"
+    assert git("rev-parse", "HEAD", cwd=clone) == git("rev-parse", "HEAD", cwd=work)
+
+
+def test_resume_skips_repos_that_already_succeeded(make_remote, tmp_path):
+    good = make_remote("good")
+    broken = RemoteRepo(name="broken", clone_url=(tmp_path / "missing.git").as_uri(), size_kb=None, updated_at="t1")
+    clone_dir = str(tmp_path / "clones")
+    results, _, _ = mirror_repos([good, broken], clone_dir)
+    assert results["good"][0] == "cloned"
+    assert results["broken"][0] == "failed"
+
+    # Both changed upstream since: resume retries only the failure
+    good.updated_at = broken.updated_at = "t2"
+    results, skipped, resumed = mirror_repos([good, broken], clone_dir, resume=True)
+    assert set(results) == {"broken"}
+    assert (skipped, resumed) == (0, 1)
+
+    results, _, resumed = mirror_repos([good], clone_dir)
+    assert results["good"][0] == "updated"
+    assert resumed == 0